@@ -1,9 +1,25 @@
+from django import forms
 from django.contrib import admin
-from .models import Course, CourseOffering, StudentEnrollment, Assignment, StudentAssignment
+from search.admin import FullTextSearchAdminMixin
+from .models import Course, CourseOffering, ScheduleSlot, StudentEnrollment, Assignment, StudentAssignment, GradeScale
+from .prerequisites import creates_cycle
+
+
+class CourseAdminForm(forms.ModelForm):
+    class Meta:
+        model = Course
+        fields = '__all__'
+    
+    def clean_prerequisites(self):
+        prerequisites = self.cleaned_data['prerequisites']
+        if self.instance.pk and creates_cycle((self.instance.pk, course.pk) for course in prerequisites):
+            raise forms.ValidationError('These prerequisites would create a prerequisite cycle.')
+        return prerequisites
 
 
 @admin.register(Course)
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
+    form = CourseAdminForm
     list_display = ('course_code', 'course_name', 'department', 'course_type', 'credit_hours', 'is_active')
     list_filter = ('department', 'course_type', 'is_active')
     search_fields = ('course_code', 'course_name', 'description')
@@ -27,12 +43,19 @@ class CourseAdmin(admin.ModelAdmin):
     )
 
 
+class ScheduleSlotInline(admin.TabularInline):
+    model = ScheduleSlot
+    extra = 0
+    fields = ('day', 'start_time', 'end_time', 'room')
+
+
 @admin.register(CourseOffering)
 class CourseOfferingAdmin(admin.ModelAdmin):
     list_display = ('course', 'instructor', 'semester', 'year', 'section', 'current_enrollment', 'max_enrollment', 'is_active')
     list_filter = ('semester', 'year', 'is_active')
     search_fields = ('course__course_code', 'course__course_name', 'instructor__faculty_id')
     readonly_fields = ('id', 'created_at', 'updated_at')
+    inlines = [ScheduleSlotInline]
 
 
 @admin.register(StudentEnrollment)
@@ -51,6 +74,12 @@ class AssignmentAdmin(admin.ModelAdmin):
     readonly_fields = ('id', 'created_at', 'updated_at')
 
 
+@admin.register(GradeScale)
+class GradeScaleAdmin(admin.ModelAdmin):
+    list_display = ('name', 'is_default', 'updated_at')
+    readonly_fields = ('id', 'created_at', 'updated_at')
+
+
 @admin.register(StudentAssignment)
 class StudentAssignmentAdmin(admin.ModelAdmin):
     list_display = ('student', 'assignment', 'status', 'marks_obtained', 'submission_date', 'graded_on')
@@ -0,0 +1,118 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from students.models import Student
+from university_erp.responsecache import bump_generations
+from .models import CourseOffering, StudentEnrollment
+from .prerequisites import missing_prerequisites
+from .signals import enrollments_bulk_created
+
+BULK_CREATE_BATCH_SIZE = 1000
+
+
+class EnrollmentError(Exception):
+    """An enrollment change the offering cannot accept"""
+
+
+def adjust_enrollment_counts(counts):
+    """Atomically add counts[offering_id] to each offering's current_enrollment in one UPDATE"""
+    counts = {pk: delta for pk, delta in counts.items() if delta}
+    if not counts:
+        return
+    delta = Case(
+        *[When(pk=pk, then=Value(n)) for pk, n in counts.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    CourseOffering.objects.filter(pk__in=counts).update(current_enrollment=F('current_enrollment') + delta)
+    bump_generations(CourseOffering)
+
+
+@transaction.atomic
+def update_enrollment(enrollment_id, **changes):
+    """
+    Apply changes to one enrollment, keeping current_enrollment in step when
+    its status moves into or out of 'enrolled'. Moving into 'enrolled' locks
+    the offering with SELECT ... FOR UPDATE and needs a free seat, as
+    bulk_enroll does.
+    """
+    enrollment = StudentEnrollment.objects.select_for_update().get(pk=enrollment_id)
+    delta = (changes.get('status', enrollment.status) == 'enrolled') - (enrollment.status == 'enrolled')
+    if delta > 0:
+        offering = CourseOffering.objects.select_for_update().get(pk=enrollment.course_offering_id)
+        if not offering.is_active:
+            raise EnrollmentError('Course offering is inactive')
+        if offering.current_enrollment >= offering.max_enrollment:
+            raise EnrollmentError('Course offering is full')
+    for field, value in changes.items():
+        setattr(enrollment, field, value)
+    enrollment.save()
+    adjust_enrollment_counts({enrollment.course_offering_id: delta})
+    return enrollment
+
+
+def bulk_enroll(items):
+    """
+    Enroll many (student, course_offering) pairs at once.
+
+    Every check is set-based: one query each for students, locked offerings,
+    existing enrollments and prerequisites missing from the closure table.
+    Offerings are locked with SELECT ... FOR UPDATE so concurrent batches
+    cannot oversell seats. Returns one result dict per input item, in input order.
+    """
+    results = [{'index': index, 'student': item['student'], 'course_offering': item['course_offering'],
+                'status': 'rejected', 'error': None} for index, item in enumerate(items)]
+    student_ids = {item['student'] for item in items}
+    offering_ids = {item['course_offering'] for item in items}
+
+    with transaction.atomic():
+        offerings = {
+            row['pk']: row for row in CourseOffering.objects.select_for_update()
+            .filter(pk__in=offering_ids, is_active=True)
+            .order_by('pk')
+            .values('pk', 'course_id', 'max_enrollment', 'current_enrollment')
+        }
+        known_students = set(Student.objects.filter(pk__in=student_ids).values_list('pk', flat=True))
+        existing = set(
+            StudentEnrollment.objects.filter(student_id__in=student_ids, course_offering_id__in=offering_ids)
+            .values_list('student_id', 'course_offering_id')
+        )
+
+        missing = missing_prerequisites(student_ids, {offering['course_id'] for offering in offerings.values()})
+
+        seats = {pk: offering['max_enrollment'] - offering['current_enrollment'] for pk, offering in offerings.items()}
+        seen = set()
+        accepted = []
+        for result in results:
+            pair = (result['student'], result['course_offering'])
+            offering = offerings.get(pair[1])
+            if pair in seen:
+                result['error'] = 'Duplicate item in request'
+            elif pair[0] not in known_students:
+                result['error'] = 'Student not found'
+            elif offering is None:
+                result['error'] = 'Course offering not found or inactive'
+            elif pair in existing:
+                result['error'] = 'Student already enrolled'
+            elif (pair[0], offering['course_id']) in missing:
+                result['error'] = 'Prerequisites not completed'
+            elif seats[pair[1]] <= 0:
+                result['error'] = 'Course offering is full'
+            else:
+                seats[pair[1]] -= 1
+                result['status'] = 'enrolled'
+                accepted.append(StudentEnrollment(student_id=pair[0], course_offering_id=pair[1]))
+            seen.add(pair)
+
+        created = StudentEnrollment.objects.bulk_create(accepted, batch_size=BULK_CREATE_BATCH_SIZE)
+        adjust_enrollment_counts(Counter(enrollment.course_offering_id for enrollment in created))
+        if created:
+            transaction.on_commit(lambda: enrollments_bulk_created.send(sender=StudentEnrollment, enrollments=created))
+
+    enrollment_ids = iter(enrollment.pk for enrollment in created)
+    for result in results:
+        if result['status'] == 'enrolled':
+            result['id'] = next(enrollment_ids)
+    return results
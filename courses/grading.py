@@ -0,0 +1,345 @@
+import csv
+import hashlib
+import io
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max, Subquery
+from django.utils import timezone
+
+from students.gpa import recompute_students
+from students.models import Student
+from .enrollment import adjust_enrollment_counts
+from .models import Assignment, CourseOffering, GradeScale, StudentAssignment, StudentEnrollment
+from .signals import enrollments_bulk_updated
+
+BULK_BATCH_SIZE = 1000
+GRADED_FIELDS = ['marks_obtained', 'feedback', 'status', 'graded_by', 'graded_on', 'updated_at']
+INACTIVE_ENROLLMENT_STATUSES = ['dropped', 'withdrawn']
+CLOSED_ENROLLMENT_STATUSES = ['completed', 'failed']
+MISSING_POLICIES = ['zero', 'exclude', 'incomplete']
+INCOMPLETE_GRADE = 'I'
+
+# (minimum percentage, letter grade, grade points), highest band first
+GRADE_SCALE = [
+    (Decimal('90'), 'A', Decimal('4.00')),
+    (Decimal('85'), 'B+', Decimal('3.50')),
+    (Decimal('80'), 'B', Decimal('3.00')),
+    (Decimal('75'), 'C+', Decimal('2.50')),
+    (Decimal('70'), 'C', Decimal('2.00')),
+    (Decimal('65'), 'D+', Decimal('1.50')),
+    (Decimal('60'), 'D', Decimal('1.00')),
+    (Decimal('0'), 'F', Decimal('0.00')),
+]
+
+
+def letter_grade(percentage, scale=GRADE_SCALE):
+    """Return (letter, grade points) for a percentage on the given scale"""
+    for minimum, letter, points in scale:
+        if percentage >= minimum:
+            return letter, points
+    return scale[-1][1], scale[-1][2]
+
+
+def grade_scale(name=None):
+    """Bands of the named GradeScale, else the tenant's default scale, else GRADE_SCALE"""
+    scales = GradeScale.objects.filter(name=name) if name else GradeScale.objects.filter(is_default=True)
+    scale = scales.first()
+    if scale is None:
+        if name:
+            raise GradeScale.DoesNotExist(f'Grade scale {name!r} does not exist')
+        return GRADE_SCALE
+    return [(Decimal(str(minimum)), letter, Decimal(str(points))) for minimum, letter, points in scale.bands]
+
+
+class Gradebook:
+    """
+    One offering's students x assignments marks matrix and the final grades it
+    yields. Missing marks are NaN; missing_policy decides what they count for:
+    'zero' scores them as 0, 'exclude' drops them from the weighting, and
+    'incomplete' withholds the final grade while any are outstanding.
+    """
+
+    def __init__(self, offering_id, enrollments, assignments, marks, scale=GRADE_SCALE, missing_policy='zero'):
+        self.offering_id = offering_id
+        self.enrollments = enrollments
+        self.assignments = assignments
+        self.marks = marks
+        self.scale = scale
+        self.missing_policy = missing_policy
+        self.percentages = self._percentages()
+        self.grades = [self._grade(percentage) for percentage in self.percentages]
+
+    def _percentages(self):
+        totals = np.array([assignment['total_marks'] for assignment in self.assignments], dtype=np.float64)
+        weights = np.array([assignment['weight_percentage'] for assignment in self.assignments], dtype=np.float64)
+        missing = np.isnan(self.marks)
+        earned = np.where(missing, 0.0, self.marks / np.where(totals > 0, totals, np.nan)) * weights
+        if self.missing_policy == 'exclude':
+            counted = (~missing * weights).sum(axis=1)
+        else:
+            counted = np.full(len(self.enrollments), weights.sum())
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percentages = np.nansum(earned, axis=1) * 100 / counted
+        percentages[counted <= 0] = np.nan
+        if self.missing_policy == 'incomplete':
+            percentages[missing.any(axis=1)] = np.nan
+        return percentages
+
+    def _grade(self, percentage):
+        if np.isnan(percentage):
+            if self.missing_policy == 'incomplete' and self.assignments:
+                return None, INCOMPLETE_GRADE, None
+            return None, '', None
+        percentage = Decimal(f'{percentage:.2f}')
+        return (percentage, *letter_grade(percentage, self.scale))
+
+    def columns(self):
+        """Compact columnar form: parallel student and assignment arrays plus a row-per-student marks matrix"""
+        return {
+            'offering': self.offering_id,
+            'students': [enrollment['student_id'] for enrollment in self.enrollments],
+            'student_ids': [enrollment['student_code'] for enrollment in self.enrollments],
+            'names': [enrollment['name'] for enrollment in self.enrollments],
+            'assignments': [assignment['id'] for assignment in self.assignments],
+            'titles': [assignment['title'] for assignment in self.assignments],
+            'total_marks': [assignment['total_marks'] for assignment in self.assignments],
+            'weights': [assignment['weight_percentage'] for assignment in self.assignments],
+            'marks': [[None if np.isnan(value) else value for value in row] for row in self.marks.tolist()],
+        }
+    
+    def results(self):
+        return [
+            {'enrollment': enrollment['id'], 'student': enrollment['student_id'],
+             'student_id': enrollment['student_code'], 'status': enrollment['status'], 'percentage': percentage,
+             'final_grade': letter, 'grade_points': points}
+            for enrollment, (percentage, letter, points) in zip(self.enrollments, self.grades)
+        ]
+
+
+def compute_gradebooks(offering_ids, student_ids=None, scale=GRADE_SCALE, missing_policy='zero'):
+    """
+    Gradebooks for many offerings from three queries: the offerings' active
+    assignments, their active enrollments and every recorded mark, pivoted
+    into one NumPy matrix per offering
+    """
+    if missing_policy not in MISSING_POLICIES:
+        raise ValueError(f'Unknown missing-work policy {missing_policy!r}')
+    assignments = defaultdict(list)
+    for assignment_id, offering_id, title, total_marks, weight in (
+        Assignment.objects.filter(course_offering_id__in=offering_ids, is_active=True)
+        .order_by('due_date', 'title').values_list('id', 'course_offering_id', 'title', 'total_marks', 'weight_percentage')
+    ):
+        assignments[offering_id].append({'id': assignment_id, 'title': title, 'total_marks': total_marks,
+                                         'weight_percentage': weight})
+
+    enrollments = StudentEnrollment.objects.filter(course_offering_id__in=offering_ids).exclude(
+        status__in=INACTIVE_ENROLLMENT_STATUSES)
+    marks = StudentAssignment.objects.filter(assignment__course_offering_id__in=offering_ids,
+                                             assignment__is_active=True, marks_obtained__isnull=False)
+    if student_ids is not None:
+        enrollments = enrollments.filter(student_id__in=student_ids)
+        marks = marks.filter(student_id__in=student_ids)
+    rosters = defaultdict(list)
+    for enrollment_id, offering_id, student_id, student_code, first_name, last_name, status in enrollments.order_by(
+        'student__student_id'
+    ).values_list('id', 'course_offering_id', 'student_id', 'student__student_id', 'student__first_name',
+                  'student__last_name', 'status'):
+        rosters[offering_id].append({'id': enrollment_id, 'student_id': student_id, 'student_code': student_code,
+                                     'name': f'{first_name} {last_name}', 'status': status})
+
+    cells = defaultdict(list)
+    for offering_id, student_id, assignment_id, value in marks.values_list(
+        'assignment__course_offering_id', 'student_id', 'assignment_id', 'marks_obtained'
+    ):
+        cells[offering_id].append((student_id, assignment_id, value))
+
+    gradebooks = {}
+    for offering_id in offering_ids:
+        roster, columns = rosters.get(offering_id, []), assignments.get(offering_id, [])
+        rows = {enrollment['student_id']: index for index, enrollment in enumerate(roster)}
+        cols = {assignment['id']: index for index, assignment in enumerate(columns)}
+        matrix = np.full((len(roster), len(columns)), np.nan)
+        placed = [(rows[student_id], cols[assignment_id], value) for student_id, assignment_id, value
+                  in cells.get(offering_id, ()) if student_id in rows]
+        if placed:
+            row_index, col_index, values = zip(*placed)
+            matrix[list(row_index), list(col_index)] = np.array(values, dtype=np.float64)
+        gradebooks[offering_id] = Gradebook(offering_id, roster, columns, matrix, scale, missing_policy)
+    return gradebooks
+
+
+def _per_offering(queryset, offering_path, aggregate):
+    return Subquery(queryset.order_by().values(offering_path).annotate(value=aggregate).values('value'))
+
+
+def gradebook_version(offering_id):
+    """
+    Version stamp of an offering's gradebook, from one query over the row
+    counts and latest changes of its assignments, marks and active roster,
+    including edits to the rostered students' names and ids
+    """
+    assignments = Assignment.objects.filter(course_offering_id=offering_id)
+    submissions = StudentAssignment.objects.filter(assignment__course_offering_id=offering_id)
+    enrollments = StudentEnrollment.objects.filter(course_offering_id=offering_id).exclude(
+        status__in=INACTIVE_ENROLLMENT_STATUSES)
+    stamp = CourseOffering.objects.filter(pk=offering_id).values_list(
+        _per_offering(assignments, 'course_offering', Count('pk')),
+        _per_offering(assignments, 'course_offering', Max('updated_at')),
+        _per_offering(submissions, 'assignment__course_offering', Count('pk')),
+        _per_offering(submissions, 'assignment__course_offering', Max('updated_at')),
+        _per_offering(enrollments, 'course_offering', Count('pk')),
+        _per_offering(enrollments, 'course_offering', Max('enrollment_date')),
+        _per_offering(enrollments, 'course_offering', Max('student__updated_at')),
+    ).first()
+    return hashlib.sha1(repr((offering_id, stamp)).encode()).hexdigest()
+
+
+def save_final_grades(gradebooks, complete=False):
+    """
+    Write every gradebook's final grades with one bulk_update. With complete,
+    graded enrollments also move to 'completed', or 'failed' on zero grade
+    points, so they count towards GPA; enrollments already closed that way
+    are kept in step with their new grade either way. A closed enrollment
+    without a computable grade keeps the one it has, and enrollments leaving
+    'enrolled' give their seat back.
+    """
+    results = {result['enrollment']: result for gradebook in gradebooks for result in gradebook.results()}
+    enrollments, students, seats = [], set(), Counter()
+    with transaction.atomic():
+        # Decide on the statuses as they are now, not as the gradebooks read them
+        current = (StudentEnrollment.objects.select_for_update().filter(pk__in=results)
+                   .exclude(status__in=INACTIVE_ENROLLMENT_STATUSES)
+                   .values_list('pk', 'status', 'course_offering_id'))
+        for pk, status, offering_id in current:
+            result = results[pk]
+            closed = status in CLOSED_ENROLLMENT_STATUSES
+            if result['grade_points'] is None and closed:
+                continue
+            if result['grade_points'] is not None and (complete or closed):
+                new_status = 'failed' if result['grade_points'] == 0 else 'completed'
+            else:
+                new_status = status
+            enrollments.append(StudentEnrollment(pk=pk, final_grade=result['final_grade'],
+                                                 grade_points=result['grade_points'], status=new_status))
+            students.add(result['student'])
+            seats[offering_id] += (new_status == 'enrolled') - (status == 'enrolled')
+        StudentEnrollment.objects.bulk_update(enrollments, ['final_grade', 'grade_points', 'status'],
+                                              batch_size=BULK_BATCH_SIZE)
+        adjust_enrollment_counts(seats)
+        # bulk_update skips the post_save receivers that keep GPA current
+        transaction.on_commit(lambda: recompute_students(students))
+        offering_ids = [gradebook.offering_id for gradebook in gradebooks]
+        transaction.on_commit(lambda: enrollments_bulk_updated.send(sender=StudentEnrollment, offering_ids=offering_ids))
+    return len(enrollments)
+
+
+def roll_up_final_grades(offering, student_ids):
+    """Recompute the given students' final grades in offering, leaving ungraded work out of the weighting"""
+    gradebook = compute_gradebooks([offering.pk], student_ids=student_ids, missing_policy='exclude')[offering.pk]
+    save_final_grades([gradebook])
+    return [
+        {key: result[key] for key in ('student', 'percentage', 'final_grade', 'grade_points')}
+        for result in gradebook.results() if result['percentage'] is not None
+    ]
+
+
+def read_grade_sheet(fileobj):
+    """Rows of an uploaded CSV grade sheet (student or student_id, marks_obtained, feedback) as dicts"""
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    return [{key.strip(): value.strip() for key, value in row.items() if key and value not in (None, '')}
+            for row in csv.DictReader(text)]
+
+
+def apply_grade_sheet(assignment, rows, grader, roll_up=False):
+    """
+    Apply a whole grade sheet for one assignment, all or nothing.
+
+    Students are resolved by UUID or student_id code and must hold an active
+    enrollment in the assignment's offering; marks must lie within
+    total_marks. When any row fails, nothing is written and the returned
+    summary lists the row errors. Otherwise changed submissions are written
+    with one bulk_update, missing ones with one bulk_create, and the summary
+    lists every change against its previous marks.
+    """
+    codes = {row['student_id'] for row in rows if row.get('student_id')}
+    by_code = dict(Student.objects.filter(student_id__in=codes).values_list('student_id', 'pk'))
+    student_pks = [row.get('student') or by_code.get(row.get('student_id')) for row in rows]
+    enrolled = dict(
+        StudentEnrollment.objects.filter(course_offering_id=assignment.course_offering_id,
+                                         student_id__in=[pk for pk in student_pks if pk])
+        .exclude(status__in=INACTIVE_ENROLLMENT_STATUSES)
+        .values_list('student_id', 'student__student_id')
+    )
+
+    errors = []
+    seen = set()
+    for index, (row, student_pk) in enumerate(zip(rows, student_pks)):
+        if student_pk is None:
+            message = 'Student not found'
+        elif student_pk in seen:
+            message = 'Duplicate student in grade sheet'
+        elif student_pk not in enrolled:
+            message = 'Student is not enrolled in this course offering'
+        elif not 0 <= row['marks_obtained'] <= assignment.total_marks:
+            message = f'Marks must be between 0 and {assignment.total_marks}'
+        else:
+            message = None
+        if message:
+            errors.append({'row': index + 1, 'student': row.get('student') or row.get('student_id'), 'error': message})
+        seen.add(student_pk)
+    if errors:
+        return {'applied': False, 'errors': errors}
+
+    graded_on = timezone.now()
+    changes, updated, created = [], [], []
+    with transaction.atomic():
+        existing = {
+            submission.student_id: submission
+            for submission in StudentAssignment.objects.select_for_update().filter(
+                assignment=assignment, student_id__in=student_pks)
+        }
+        for row, student_pk in zip(rows, student_pks):
+            submission = existing.get(student_pk)
+            feedback = row.get('feedback')
+            if submission is None:
+                submission = StudentAssignment(student_id=student_pk, assignment=assignment, feedback=feedback or '')
+                previous, change = None, 'created'
+                created.append(submission)
+            else:
+                previous, change = submission.marks_obtained, 'updated'
+                if (previous == row['marks_obtained'] and submission.status == 'graded'
+                        and (feedback is None or feedback == submission.feedback)):
+                    continue
+                if feedback is not None:
+                    submission.feedback = feedback
+                updated.append(submission)
+            submission.marks_obtained = row['marks_obtained']
+            submission.status = 'graded'
+            submission.graded_by = grader
+            submission.graded_on = graded_on
+            # bulk_update does not apply auto_now, and gradebook versions depend on it
+            submission.updated_at = graded_on
+            changes.append({'student': student_pk, 'student_id': enrolled[student_pk],
+                            'previous_marks': previous, 'marks_obtained': row['marks_obtained'],
+                            'change': change})
+
+        StudentAssignment.objects.bulk_update(updated, GRADED_FIELDS, batch_size=BULK_BATCH_SIZE)
+        StudentAssignment.objects.bulk_create(created, batch_size=BULK_BATCH_SIZE)
+        final_grades = roll_up_final_grades(assignment.course_offering, student_pks) if roll_up else None
+
+    summary = {
+        'applied': True,
+        'assignment': assignment.pk,
+        'total_marks': assignment.total_marks,
+        'rows': len(rows),
+        'created': len(created),
+        'updated': len(updated),
+        'unchanged': len(rows) - len(created) - len(updated),
+        'changes': changes,
+    }
+    if final_grades is not None:
+        summary['final_grades'] = final_grades
+    return summary
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from courses.solver import TimetableSolver, synthetic_problem
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the timetable solver on synthetic terms (no database access)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sections', type=int, nargs='+', default=[500, 2000, 10000])
+        parser.add_argument('--time-budget', type=float, default=30)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        for sections in options['sections']:
+            problem = synthetic_problem(sections, seed=options['seed'])
+            solution = TimetableSolver(problem, time_budget=options['time_budget'], seed=options['seed']).solve()
+            stats = solution.stats
+            self.stdout.write(
+                f"{sections} sections: student conflicts {stats['constructed_student_conflicts']} -> "
+                f"{stats['student_conflicts']}, instructor clashes {stats['instructor_clashes']}, "
+                f"unassigned rooms {stats['unassigned_rooms']}, {stats['iterations']} moves in {stats['seconds']}s"
+            )
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.grading import MISSING_POLICIES, compute_gradebooks, grade_scale, save_final_grades
+from courses.models import CourseOffering, GradeScale
+
+
+class Command(BaseCommand):
+    help = ('Compute final grades for every active offering of a term from weighted assignment marks '
+            '(run per tenant via tenant_command, or all_tenants_command for every tenant)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semester', required=True, choices=[choice for choice, _ in CourseOffering.SEMESTER_CHOICES])
+        parser.add_argument('--year', type=int, required=True)
+        parser.add_argument('--scale', help='Grade scale name (default: the tenant default scale)')
+        parser.add_argument('--missing', choices=MISSING_POLICIES, default='zero',
+                            help='How ungraded assignments count towards the final grade')
+        parser.add_argument('--complete', action='store_true',
+                            help='Also mark graded enrollments completed or failed so they count towards GPA')
+        parser.add_argument('--batch-size', type=int, default=200, help='Offerings per gradebook query')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            scale = grade_scale(options['scale'])
+        except GradeScale.DoesNotExist as exc:
+            raise CommandError(str(exc))
+
+        offering_ids = list(CourseOffering.objects.filter(
+            semester=options['semester'], year=options['year'], is_active=True).order_by('pk').values_list('pk', flat=True))
+        saved = 0
+        for start in range(0, len(offering_ids), options['batch_size']):
+            batch = offering_ids[start:start + options['batch_size']]
+            gradebooks = compute_gradebooks(batch, scale=scale, missing_policy=options['missing']).values()
+            if options['dry_run']:
+                saved += sum(len(gradebook.enrollments) for gradebook in gradebooks)
+            else:
+                saved += save_final_grades(gradebooks, complete=options['complete'])
+            self.stdout.write(f'{min(start + len(batch), len(offering_ids))}/{len(offering_ids)} offerings graded')
+
+        verb = 'would be graded' if options['dry_run'] else 'graded'
+        self.stdout.write(self.style.SUCCESS(f'{saved} enrollments {verb} across {len(offering_ids)} offerings'))
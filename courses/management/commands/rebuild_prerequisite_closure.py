@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from courses.prerequisites import rebuild_closure
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the course prerequisite closure table (run per tenant via tenant_command)'
+
+    def handle(self, *args, **options):
+        rows = rebuild_closure()
+        self.stdout.write(self.style.SUCCESS(f'Prerequisite closure rebuilt: {rows} rows'))
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+        ('students', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentenrollment',
+            index=models.Index(fields=['-enrollment_date'], name='enrollment_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentenrollment',
+            index=models.Index(fields=['course_offering', '-enrollment_date'], name='enrollment_offering_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentenrollment',
+            index=models.Index(fields=['student', '-enrollment_date'], name='enrollment_student_date_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:31
+
+import django.db.models.deletion
+import uuid
+from collections import defaultdict, deque
+
+from django.db import migrations, models
+
+
+def build_closure(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    CoursePrerequisiteClosure = apps.get_model('courses', 'CoursePrerequisiteClosure')
+    edges = defaultdict(list)
+    for course_id, prerequisite_id in Course.prerequisites.through.objects.values_list(
+        'from_course_id', 'to_course_id'
+    ):
+        edges[course_id].append(prerequisite_id)
+    rows = []
+    for course_id in edges:
+        depths = {}
+        queue = deque((prerequisite_id, 1) for prerequisite_id in edges[course_id])
+        while queue:
+            prerequisite_id, depth = queue.popleft()
+            if prerequisite_id in depths or prerequisite_id == course_id:
+                continue
+            depths[prerequisite_id] = depth
+            queue.extend((next_id, depth + 1) for next_id in edges.get(prerequisite_id, ()))
+        rows.extend(
+            CoursePrerequisiteClosure(course_id=course_id, prerequisite_id=prerequisite_id, depth=depth)
+            for prerequisite_id, depth in depths.items()
+        )
+    CoursePrerequisiteClosure.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_studentenrollment_enrollment_date_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoursePrerequisiteClosure',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('depth', models.IntegerField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prerequisite_closure', to='courses.course')),
+                ('prerequisite', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='required_by', to='courses.course')),
+            ],
+            options={
+                'verbose_name': 'Course Prerequisite Closure',
+                'verbose_name_plural': 'Course Prerequisite Closure',
+                'indexes': [models.Index(fields=['prerequisite', 'course'], name='closure_prerequisite_idx')],
+                'unique_together': {('course', 'prerequisite')},
+            },
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:40
+
+import datetime
+import django.db.models.deletion
+import json
+import uuid
+from django.db import migrations, models
+
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def _parse_day(value):
+    if isinstance(value, int) and 0 <= value < 7:
+        return value
+    value = str(value).strip().lower()
+    for index, name in enumerate(DAYS):
+        if value and name.startswith(value):
+            return index
+    return None
+
+
+def _parse_time(value):
+    try:
+        return datetime.time.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+
+
+def migrate_schedules(apps, schema_editor):
+    """Turn the old free-text JSON schedules into slots where they can be parsed"""
+    CourseOffering = apps.get_model('courses', 'CourseOffering')
+    ScheduleSlot = apps.get_model('courses', 'ScheduleSlot')
+    slots = []
+    for offering_id, classroom, schedule in CourseOffering.objects.exclude(schedule='').values_list(
+        'id', 'classroom', 'schedule'
+    ):
+        try:
+            entries = json.loads(schedule)
+        except ValueError:
+            continue
+        if isinstance(entries, dict):
+            entries = [entries]
+        if not isinstance(entries, list):
+            continue
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            day = _parse_day(entry.get('day', ''))
+            start = _parse_time(entry.get('start', entry.get('start_time', '')))
+            end = _parse_time(entry.get('end', entry.get('end_time', '')))
+            if day is None or start is None or end is None or start >= end:
+                continue
+            slots.append(ScheduleSlot(offering_id=offering_id, day=day, start_time=start, end_time=end,
+                                      room=str(entry.get('room') or classroom)[:50]))
+    ScheduleSlot.objects.bulk_create(slots, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_course_prerequisite_closure'),
+        ('faculty', '0002_facultyleave_leave_applied_on_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleSlot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('day', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('room', models.CharField(blank=True, max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Schedule Slot',
+                'verbose_name_plural': 'Schedule Slots',
+                'ordering': ['day', 'start_time'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='courseoffering',
+            index=models.Index(fields=['year', 'semester'], name='offering_term_idx'),
+        ),
+        migrations.AddField(
+            model_name='scheduleslot',
+            name='offering',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='courses.courseoffering'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduleslot',
+            index=models.Index(fields=['room', 'day', 'start_time'], name='slot_room_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduleslot',
+            constraint=models.CheckConstraint(condition=models.Q(('start_time__lt', models.F('end_time'))), name='slot_start_before_end'),
+        ),
+        migrations.RunPython(migrate_schedules, migrations.RunPython.noop),
+    ]
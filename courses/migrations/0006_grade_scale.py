@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:54
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_timetable_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeScale',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('bands', models.JSONField(help_text='[[minimum percentage, letter, grade points], ...], highest band first')),
+                ('is_default', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Grade Scale',
+                'verbose_name_plural': 'Grade Scales',
+            },
+        ),
+    ]
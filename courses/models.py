@@ -1,7 +1,11 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import User
 import uuid
 
+from search.documents import search_document
+
 
 class Course(models.Model):
     COURSE_TYPES = [
@@ -30,14 +34,50 @@ class Course(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = models.GeneratedField(
+        expression=search_document(
+            ('A', ['course_code', 'course_name']), ('B', ['description']),
+            ('C', ['learning_objectives', 'syllabus']),
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     
     def __str__(self):
         return f"{self.course_code} - {self.course_name}"
     
+    def all_prerequisites(self):
+        """Direct and indirect prerequisites, nearest first"""
+        return Course.objects.filter(required_by__course=self).order_by('required_by__depth', 'course_code')
+    
     class Meta:
         verbose_name = 'Course'
         verbose_name_plural = 'Courses'
         ordering = ['course_code']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='course_search_idx'),
+        ]
+
+
+class CoursePrerequisiteClosure(models.Model):
+    """
+    Transitive closure of Course.prerequisites, maintained from m2m_changed and Course deletes
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='prerequisite_closure')
+    prerequisite = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='required_by')
+    depth = models.IntegerField()
+    
+    def __str__(self):
+        return f"{self.course_id} requires {self.prerequisite_id} (depth {self.depth})"
+    
+    class Meta:
+        verbose_name = 'Course Prerequisite Closure'
+        verbose_name_plural = 'Course Prerequisite Closure'
+        unique_together = ['course', 'prerequisite']
+        indexes = [
+            models.Index(fields=['prerequisite', 'course'], name='closure_prerequisite_idx'),
+        ]
 
 
 class CourseOffering(models.Model):
@@ -56,7 +96,7 @@ class CourseOffering(models.Model):
     max_enrollment = models.IntegerField()
     current_enrollment = models.IntegerField(default=0)
     classroom = models.CharField(max_length=50, blank=True)
-    schedule = models.TextField(blank=True)  # JSON format for time slots
+    schedule = models.TextField(blank=True)  # Legacy free-text schedule; meetings live in ScheduleSlot
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -68,6 +108,47 @@ class CourseOffering(models.Model):
         verbose_name = 'Course Offering'
         verbose_name_plural = 'Course Offerings'
         unique_together = ['course', 'semester', 'year', 'section']
+        indexes = [
+            models.Index(fields=['year', 'semester'], name='offering_term_idx'),
+        ]
+
+
+class ScheduleSlot(models.Model):
+    """
+    One weekly meeting of a course offering
+    """
+    DAY_CHOICES = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    offering = models.ForeignKey(CourseOffering, on_delete=models.CASCADE, related_name='slots')
+    day = models.PositiveSmallIntegerField(choices=DAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    room = models.CharField(max_length=50, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.offering} - {self.get_day_display()} {self.start_time:%H:%M}-{self.end_time:%H:%M}"
+    
+    class Meta:
+        verbose_name = 'Schedule Slot'
+        verbose_name_plural = 'Schedule Slots'
+        ordering = ['day', 'start_time']
+        indexes = [
+            models.Index(fields=['room', 'day', 'start_time'], name='slot_room_day_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=models.Q(start_time__lt=models.F('end_time')), name='slot_start_before_end'),
+        ]
 
 
 class StudentEnrollment(models.Model):
@@ -95,6 +176,11 @@ class StudentEnrollment(models.Model):
         verbose_name = 'Student Enrollment'
         verbose_name_plural = 'Student Enrollments'
         unique_together = ['student', 'course_offering']
+        indexes = [
+            models.Index(fields=['-enrollment_date'], name='enrollment_date_idx'),
+            models.Index(fields=['course_offering', '-enrollment_date'], name='enrollment_offering_date_idx'),
+            models.Index(fields=['student', '-enrollment_date'], name='enrollment_student_date_idx'),
+        ]
 
 
 class Assignment(models.Model):
@@ -128,6 +214,25 @@ class Assignment(models.Model):
         verbose_name_plural = 'Assignments'
 
 
+class GradeScale(models.Model):
+    """
+    Percentage bands mapped to letter grades and grade points
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=50, unique=True)
+    bands = models.JSONField(help_text="[[minimum percentage, letter, grade points], ...], highest band first")
+    is_default = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return self.name
+    
+    class Meta:
+        verbose_name = 'Grade Scale'
+        verbose_name_plural = 'Grade Scales'
+
+
 class StudentAssignment(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -148,6 +253,7 @@ class StudentAssignment(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     graded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     graded_on = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.student.student_id} - {self.assignment.title}"
@@ -155,4 +261,39 @@ class StudentAssignment(models.Model):
     class Meta:
         verbose_name = 'Student Assignment'
         verbose_name_plural = 'Student Assignments'
-        unique_together = ['student', 'assignment']
\ No newline at end of file
+        unique_together = ['student', 'assignment']
+
+
+class TimetableJob(models.Model):
+    """
+    A background run of the timetable solver for one term
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+        ('applied', 'Applied'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    semester = models.CharField(max_length=10, choices=CourseOffering.SEMESTER_CHOICES)
+    year = models.IntegerField()
+    time_budget = models.PositiveIntegerField(null=True, blank=True, help_text="Seconds the solver may spend searching")
+    parameters = models.JSONField(default=dict, blank=True)  # patterns, rooms and term dates
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    stats = models.JSONField(default=dict, blank=True)
+    proposed_slots = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Timetable {self.semester} {self.year} ({self.status})"
+    
+    class Meta:
+        verbose_name = 'Timetable Job'
+        verbose_name_plural = 'Timetable Jobs'
+        ordering = ['-created_at']
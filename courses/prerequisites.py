@@ -0,0 +1,109 @@
+from collections import defaultdict, deque
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Course, CourseOffering, CoursePrerequisiteClosure, StudentEnrollment
+
+PrerequisiteEdge = Course.prerequisites.through
+
+
+def _load_edges():
+    edges = defaultdict(list)
+    for course_id, prerequisite_id in PrerequisiteEdge.objects.values_list('from_course_id', 'to_course_id'):
+        edges[course_id].append(prerequisite_id)
+    return edges
+
+
+def _closure_rows(course_id, edges):
+    depths = {}
+    queue = deque((prerequisite_id, 1) for prerequisite_id in edges.get(course_id, ()))
+    while queue:
+        prerequisite_id, depth = queue.popleft()
+        if prerequisite_id in depths or prerequisite_id == course_id:
+            continue
+        depths[prerequisite_id] = depth
+        queue.extend((next_id, depth + 1) for next_id in edges.get(prerequisite_id, ()))
+    return [CoursePrerequisiteClosure(course_id=course_id, prerequisite_id=prerequisite_id, depth=depth)
+            for prerequisite_id, depth in depths.items()]
+
+
+def rebuild_closure(course_ids=None):
+    """
+    Recompute closure rows for course_ids and every course depending on them,
+    or for the whole tenant when course_ids is None
+    """
+    edges = _load_edges()
+    with transaction.atomic():
+        if course_ids is None:
+            targets = set(edges)
+            CoursePrerequisiteClosure.objects.all().delete()
+        else:
+            targets = set(course_ids)
+            targets.update(CoursePrerequisiteClosure.objects.filter(prerequisite_id__in=targets)
+                           .values_list('course_id', flat=True))
+            CoursePrerequisiteClosure.objects.filter(course_id__in=targets).delete()
+        rows = [row for course_id in targets for row in _closure_rows(course_id, edges)]
+        CoursePrerequisiteClosure.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def creates_cycle(pairs):
+    """True if adding any (course_id, prerequisite_id) edge in pairs would close a cycle"""
+    pairs = list(pairs)
+    if not pairs:
+        return False
+    if any(course_id == prerequisite_id for course_id, prerequisite_id in pairs):
+        return True
+    reverse_paths = reduce(or_, (Q(course_id=prerequisite_id, prerequisite_id=course_id)
+                                 for course_id, prerequisite_id in pairs))
+    return CoursePrerequisiteClosure.objects.filter(reverse_paths).exists()
+
+
+def missing_prerequisites(student_ids, course_ids):
+    """
+    Map (student_id, course_id) -> set of prerequisite course ids the student
+    has not completed, joining the closure against completed enrollments.
+    Pairs with nothing missing are omitted.
+    """
+    required = defaultdict(set)
+    for course_id, prerequisite_id in CoursePrerequisiteClosure.objects.filter(
+            course_id__in=course_ids).values_list('course_id', 'prerequisite_id'):
+        required[course_id].add(prerequisite_id)
+    if not required:
+        return {}
+
+    completed = defaultdict(set)
+    for student_id, course_id, prerequisite_id in (
+            StudentEnrollment.objects
+            .filter(student_id__in=student_ids, status='completed',
+                    course_offering__course__required_by__course_id__in=required)
+            .values_list('student_id', 'course_offering__course__required_by__course_id', 'course_offering__course_id')
+            .distinct()):
+        completed[(student_id, course_id)].add(prerequisite_id)
+
+    missing = {}
+    for student_id in student_ids:
+        for course_id, prerequisites in required.items():
+            outstanding = prerequisites - completed[(student_id, course_id)]
+            if outstanding:
+                missing[(student_id, course_id)] = outstanding
+    return missing
+
+
+def check_eligibility(student_ids, offering_ids):
+    """Eligibility of every student for every offering, as a list of result dicts"""
+    offerings = dict(CourseOffering.objects.filter(pk__in=offering_ids).values_list('pk', 'course_id'))
+    missing = missing_prerequisites(student_ids, set(offerings.values()))
+    return [
+        {
+            'student': student_id,
+            'course_offering': offering_id,
+            'eligible': (student_id, course_id) not in missing,
+            'missing_prerequisites': sorted(missing.get((student_id, course_id), ()), key=str),
+        }
+        for offering_id, course_id in offerings.items()
+        for student_id in student_ids
+    ]
@@ -1,5 +1,12 @@
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Course, CourseOffering, StudentEnrollment, Assignment, StudentAssignment
+from .enrollment import EnrollmentError, bulk_enroll, update_enrollment
+from .models import (Course, CourseOffering, ScheduleSlot, StudentEnrollment, Assignment, StudentAssignment, TimetableJob,
+                     GradeScale)
+from .grading import MISSING_POLICIES
+from .prerequisites import creates_cycle
+from .timetable import clashing_slots
 
 
 class CourseSerializer(serializers.ModelSerializer):
@@ -12,6 +19,99 @@ class CourseSerializer(serializers.ModelSerializer):
                  'learning_objectives', 'assessment_methods', 'textbooks', 'reference_books',
                  'is_active', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def validate_prerequisites(self, value):
+        if self.instance and creates_cycle((self.instance.pk, course.pk) for course in value):
+            raise serializers.ValidationError('These prerequisites would create a prerequisite cycle.')
+        return value
+
+
+class ScheduleSlotSerializer(serializers.ModelSerializer):
+    day_name = serializers.CharField(source='get_day_display', read_only=True)
+    
+    class Meta:
+        model = ScheduleSlot
+        fields = ['id', 'offering', 'day', 'day_name', 'start_time', 'end_time', 'room', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def validate(self, attrs):
+        offering = attrs.get('offering', getattr(self.instance, 'offering', None))
+        day = attrs.get('day', getattr(self.instance, 'day', None))
+        start_time = attrs.get('start_time', getattr(self.instance, 'start_time', None))
+        end_time = attrs.get('end_time', getattr(self.instance, 'end_time', None))
+        if start_time >= end_time:
+            raise serializers.ValidationError({'end_time': 'End time must be after start time.'})
+        room = attrs.get('room', getattr(self.instance, 'room', ''))
+        if not room:
+            room = attrs['room'] = offering.classroom
+        clashes = clashing_slots(offering, day, start_time, end_time, room, exclude=self.instance)
+        if clashes:
+            raise serializers.ValidationError({'non_field_errors': [f'Clashes with {slot}.' for slot in clashes]})
+        return attrs
+
+
+class TimetableSlotSerializer(serializers.Serializer):
+    offering = serializers.UUIDField()
+    day = serializers.ChoiceField(choices=ScheduleSlot.DAY_CHOICES)
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    room = serializers.CharField(max_length=50, required=False, allow_blank=True)
+    
+    def validate(self, attrs):
+        if attrs['start_time'] >= attrs['end_time']:
+            raise serializers.ValidationError({'end_time': 'End time must be after start time.'})
+        return attrs
+
+
+class TimetableValidationSerializer(serializers.Serializer):
+    semester = serializers.ChoiceField(choices=CourseOffering.SEMESTER_CHOICES)
+    year = serializers.IntegerField()
+    slots = serializers.ListField(child=TimetableSlotSerializer(), required=False, max_length=50000)
+
+
+class TimetablePatternSerializer(serializers.Serializer):
+    days = serializers.ListField(child=serializers.ChoiceField(choices=ScheduleSlot.DAY_CHOICES), allow_empty=False)
+    start = serializers.TimeField()
+    end = serializers.TimeField()
+    
+    def validate(self, attrs):
+        if attrs['start'] >= attrs['end']:
+            raise serializers.ValidationError({'end': 'End time must be after start time.'})
+        return attrs
+
+
+class TimetableRoomSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=50)
+    capacity = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+
+
+class TimetableJobSerializer(serializers.ModelSerializer):
+    patterns = TimetablePatternSerializer(many=True, required=False, write_only=True)
+    rooms = TimetableRoomSerializer(many=True, required=False, write_only=True)
+    term_start = serializers.DateField(required=False, write_only=True)
+    term_end = serializers.DateField(required=False, write_only=True)
+    
+    class Meta:
+        model = TimetableJob
+        fields = ['id', 'semester', 'year', 'time_budget', 'patterns', 'rooms', 'term_start', 'term_end',
+                 'parameters', 'status', 'stats', 'proposed_slots', 'error', 'created_by', 'finished_at',
+                 'created_at', 'updated_at']
+        read_only_fields = ['id', 'parameters', 'status', 'stats', 'proposed_slots', 'error', 'created_by',
+                           'finished_at', 'created_at', 'updated_at']
+    
+    def create(self, validated_data):
+        parameters = {}
+        if 'patterns' in validated_data:
+            parameters['patterns'] = [
+                {'days': pattern['days'], 'start': pattern['start'].strftime('%H:%M'), 'end': pattern['end'].strftime('%H:%M')}
+                for pattern in validated_data.pop('patterns')
+            ]
+        if 'rooms' in validated_data:
+            parameters['rooms'] = validated_data.pop('rooms')
+        for key in ('term_start', 'term_end'):
+            if key in validated_data:
+                parameters[key] = validated_data.pop(key).isoformat()
+        return super().create({**validated_data, 'parameters': parameters})
 
 
 class CourseOfferingSerializer(serializers.ModelSerializer):
@@ -19,15 +119,20 @@ class CourseOfferingSerializer(serializers.ModelSerializer):
     course_name = serializers.CharField(source='course.course_name', read_only=True)
     instructor_name = serializers.CharField(source='instructor.first_name', read_only=True)
     enrollment_percentage = serializers.SerializerMethodField()
+    slots = ScheduleSlotSerializer(many=True, read_only=True)
     
     class Meta:
         model = CourseOffering
         fields = ['id', 'course', 'course_code', 'course_name', 'instructor', 'instructor_name',
                  'semester', 'year', 'section', 'max_enrollment', 'current_enrollment',
-                 'enrollment_percentage', 'classroom', 'schedule', 'is_active', 'created_at', 'updated_at']
+                 'enrollment_percentage', 'classroom', 'schedule', 'slots', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_enrollment_percentage(self, obj):
+        # Prefer the rolled-up fill rate, which counts enrollments rather than trusting current_enrollment
+        statistics = getattr(obj, 'statistics', None)
+        if statistics is not None:
+            return float(statistics.fill_rate)
         if obj.max_enrollment > 0:
             return round((obj.current_enrollment / obj.max_enrollment) * 100, 2)
         return 0
@@ -45,6 +150,53 @@ class StudentEnrollmentSerializer(serializers.ModelSerializer):
                  'course_name', 'enrollment_date', 'status', 'final_grade', 'grade_points',
                  'attendance_percentage']
         read_only_fields = ['id', 'enrollment_date']
+    
+    def validate(self, attrs):
+        if self.instance is None:
+            if attrs.get('status', 'enrolled') != 'enrolled':
+                raise serializers.ValidationError({'status': 'New enrollments start as enrolled.'})
+        else:
+            for field in ('student', 'course_offering'):
+                if field in attrs and attrs[field] != getattr(self.instance, field):
+                    raise serializers.ValidationError({field: 'Cannot be changed; drop and re-enroll instead.'})
+        return attrs
+    
+    def create(self, validated_data):
+        # Single enrollments take the same locked, capacity- and prerequisite-checked path as bulk ones
+        with transaction.atomic():
+            result = bulk_enroll([{'student': validated_data['student'].pk,
+                                   'course_offering': validated_data['course_offering'].pk}])[0]
+            if result['status'] != 'enrolled':
+                raise serializers.ValidationError({'non_field_errors': [result['error']]})
+            enrollment = StudentEnrollment.objects.get(pk=result['id'])
+            extra = {field: value for field, value in validated_data.items()
+                     if field not in ('student', 'course_offering', 'status')}
+            if extra:
+                for field, value in extra.items():
+                    setattr(enrollment, field, value)
+                enrollment.save(update_fields=list(extra))
+            return enrollment
+    
+    def update(self, instance, validated_data):
+        changes = {field: value for field, value in validated_data.items() if field not in ('student', 'course_offering')}
+        try:
+            return update_enrollment(instance.pk, **changes)
+        except EnrollmentError as error:
+            raise serializers.ValidationError({'status': str(error)})
+
+
+class BulkEnrollmentItemSerializer(serializers.Serializer):
+    student = serializers.UUIDField()
+    course_offering = serializers.UUIDField()
+
+
+class BulkEnrollmentSerializer(serializers.Serializer):
+    enrollments = serializers.ListField(child=BulkEnrollmentItemSerializer(), allow_empty=False, max_length=10000)
+
+
+class EligibilityCheckSerializer(serializers.Serializer):
+    students = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=5000)
+    offerings = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=500)
 
 
 class AssignmentSerializer(serializers.ModelSerializer):
@@ -59,6 +211,68 @@ class AssignmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class GradeSheetRowSerializer(serializers.Serializer):
+    student = serializers.UUIDField(required=False)
+    student_id = serializers.CharField(max_length=20, required=False)
+    marks_obtained = serializers.DecimalField(max_digits=5, decimal_places=2)
+    feedback = serializers.CharField(required=False, allow_blank=True)
+    
+    def validate(self, attrs):
+        if not attrs.get('student') and not attrs.get('student_id'):
+            raise serializers.ValidationError('Either student or student_id is required.')
+        return attrs
+
+
+class GradeSheetSerializer(serializers.Serializer):
+    grades = serializers.ListField(child=GradeSheetRowSerializer(), allow_empty=False, max_length=5000)
+    roll_up = serializers.BooleanField(default=False)
+
+
+class GradeScaleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GradeScale
+        fields = ['id', 'name', 'bands', 'is_default', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def validate_bands(self, value):
+        if not isinstance(value, list) or not value:
+            raise serializers.ValidationError('Bands must be a non-empty list of [minimum, letter, grade points].')
+        minimums = []
+        for band in value:
+            if not isinstance(band, list) or len(band) != 3 or not isinstance(band[1], str) or not 0 < len(band[1]) <= 5:
+                raise serializers.ValidationError('Each band must be [minimum percentage, letter, grade points].')
+            try:
+                minimum, points = float(band[0]), float(band[2])
+            except (TypeError, ValueError):
+                raise serializers.ValidationError('Band minimums and grade points must be numbers.')
+            if not 0 <= minimum <= 100 or not 0 <= points < 100:
+                raise serializers.ValidationError('Band minimums must lie within 0-100 and grade points below 100.')
+            minimums.append(minimum)
+        if minimums != sorted(minimums, reverse=True) or len(set(minimums)) != len(minimums):
+            raise serializers.ValidationError('Bands must be listed highest minimum first, without repeats.')
+        if minimums[-1] != 0:
+            raise serializers.ValidationError('The lowest band must start at 0.')
+        return value
+    
+    def save(self, **kwargs):
+        scale = super().save(**kwargs)
+        if scale.is_default:
+            GradeScale.objects.filter(is_default=True).exclude(pk=scale.pk).update(
+                is_default=False, updated_at=timezone.now())
+        return scale
+
+
+class FinalGradeSerializer(serializers.Serializer):
+    scale = serializers.CharField(max_length=50, required=False)
+    missing = serializers.ChoiceField(choices=MISSING_POLICIES, default='zero')
+    complete = serializers.BooleanField(default=False)
+    
+    def validate_scale(self, value):
+        if not GradeScale.objects.filter(name=value).exists():
+            raise serializers.ValidationError(f'Grade scale {value!r} does not exist.')
+        return value
+
+
 class StudentAssignmentSerializer(serializers.ModelSerializer):
     student_name = serializers.CharField(source='student.first_name', read_only=True)
     student_id = serializers.CharField(source='student.student_id', read_only=True)
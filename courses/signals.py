@@ -0,0 +1,39 @@
+from django.db.models.signals import m2m_changed, post_delete, pre_delete
+from django.dispatch import Signal, receiver
+
+from university_erp.responsecache import track_generations
+from .models import Assignment, Course, CourseOffering, GradeScale, ScheduleSlot, StudentAssignment, TimetableJob
+from .prerequisites import rebuild_closure
+
+# Sent after StudentEnrollment rows are written with bulk_create, which skips post_save
+enrollments_bulk_created = Signal()
+
+# Sent after StudentEnrollment grades or statuses are rewritten with bulk_update
+enrollments_bulk_updated = Signal()
+
+track_generations(Course, Course.prerequisites.through, CourseOffering, ScheduleSlot, GradeScale, TimetableJob, Assignment,
+                  StudentAssignment)
+
+
+@receiver(m2m_changed, sender=Course.prerequisites.through)
+def maintain_prerequisite_closure(sender, instance, action, reverse, pk_set, **kwargs):
+    # Cycles are rejected by CourseSerializer and CourseAdminForm before the edges are written
+    if action == 'pre_clear' and reverse:
+        instance._closure_dependents = set(
+            sender.objects.filter(to_course=instance).values_list('from_course_id', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        rebuild_closure(pk_set if reverse else {instance.pk})
+    elif action == 'post_clear':
+        rebuild_closure(getattr(instance, '_closure_dependents', set()) if reverse else {instance.pk})
+
+
+@receiver(pre_delete, sender=Course)
+def remember_closure_dependents(sender, instance, **kwargs):
+    # Deleting a course cascades through its edges without m2m_changed; its dependents lose those paths
+    instance._closure_dependents = set(instance.required_by.values_list('course_id', flat=True))
+
+
+@receiver(post_delete, sender=Course)
+def rebuild_closure_of_dependents(sender, instance, **kwargs):
+    if instance._closure_dependents:
+        rebuild_closure(instance._closure_dependents)
@@ -0,0 +1,443 @@
+import datetime
+import math
+import time
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+
+from faculty.models import FacultyLeave
+from students.gpa import TERM_NUMBERS
+from .models import CourseOffering, ScheduleSlot, StudentEnrollment
+
+# Objective weights: one unit is one student who would have two classes at once
+INSTRUCTOR_CLASH_WEIGHT = 1000.0
+ROOM_OVERLOAD_WEIGHT = 200.0
+LEAVE_WEIGHT = 50.0
+HISTORY_YEARS = 3
+
+# Approximate term dates, used to weigh approved leave when none are supplied
+TERM_DATES = {
+    'spring': ((2, 1), (5, 31)),
+    'summer': ((6, 15), (8, 15)),
+    'fall': ((9, 1), (12, 31)),
+}
+
+
+def default_patterns(days=None):
+    """
+    Meeting patterns over the teaching days: 50 minutes on the 1st/3rd/5th day,
+    and 75 minutes on the 1st/3rd or 2nd/4th days, between 08:00 and 17:00
+    """
+    days = days if days is not None else getattr(settings, 'TIMETABLE_TEACHING_DAYS', [6, 0, 1, 2, 3])
+    patterns = []
+    for hour in range(8, 16):
+        patterns.append(tuple((day, hour * 60, hour * 60 + 50) for day in days[0:5:2]))
+    for pair in (days[0:3:2], days[1:4:2]):
+        for start in range(8 * 60, 16 * 60, 90):
+            patterns.append(tuple((day, start, start + 75) for day in pair))
+    return patterns
+
+
+def parse_patterns(items):
+    """Turn [{'days': [0, 2], 'start': '09:00', 'end': '10:15'}, ...] into meeting tuples"""
+    patterns = []
+    for item in items:
+        start = datetime.time.fromisoformat(item['start'])
+        end = datetime.time.fromisoformat(item['end'])
+        patterns.append(tuple((int(day), start.hour * 60 + start.minute, end.hour * 60 + end.minute)
+                              for day in item['days']))
+    return patterns
+
+
+def _pattern_geometry(patterns):
+    """
+    Overlap matrix (P+1 x P+1) and segment cover (P+1 x K) of the patterns. The
+    week is cut into elementary segments at every pattern boundary so room load
+    is exact; the extra last row stands for "not yet placed" and overlaps nothing.
+    """
+    bounds = sorted({day * 1440 + minute for pattern in patterns for day, start, end in pattern
+                     for minute in (start, end)})
+    cover = np.zeros((len(patterns) + 1, max(len(bounds) - 1, 1)), dtype=np.int32)
+    for index, pattern in enumerate(patterns):
+        for day, start, end in pattern:
+            first = bounds.index(day * 1440 + start)
+            last = bounds.index(day * 1440 + end)
+            cover[index, first:last] = 1
+    overlap = (cover @ cover.T > 0).astype(np.float64)
+    return overlap, cover
+
+
+def within_group_pairs(groups, items):
+    """
+    Every (a, b) pair of items sharing a group, with a < b, computed without a
+    Python loop: after sorting by group, items k apart that share a group pair up.
+    """
+    order = np.lexsort((items, groups))
+    groups, items = groups[order], items[order]
+    firsts, seconds = [], []
+    longest = np.bincount(np.unique(groups, return_inverse=True)[1]).max() if len(groups) else 0
+    for k in range(1, longest):
+        same = groups[k:] == groups[:-k]
+        a, b = items[:-k][same], items[k:][same]
+        keep = a != b
+        firsts.append(np.minimum(a, b)[keep])
+        seconds.append(np.maximum(a, b)[keep])
+    if not firsts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(firsts), np.concatenate(seconds)
+
+
+def _count_pairs(a, b, size):
+    keys, counts = np.unique(a.astype(np.int64) * size + b, return_counts=True)
+    return keys // size, keys % size, counts.astype(np.float64)
+
+
+def _expand_course_pairs(course_a, course_b, weights, offering_courses, course_count):
+    """Spread course-level co-enrollment evenly over every pair of their sections"""
+    order = np.argsort(offering_courses, kind='stable')
+    sections = np.bincount(offering_courses, minlength=course_count)
+    starts = np.concatenate(([0], np.cumsum(sections)[:-1]))
+    per_pair = sections[course_a] * sections[course_b]
+    keep = per_pair > 0
+    course_a, course_b, weights, per_pair = course_a[keep], course_b[keep], weights[keep], per_pair[keep]
+    pair = np.repeat(np.arange(len(per_pair)), per_pair)
+    offset = np.arange(per_pair.sum()) - np.repeat(np.cumsum(per_pair) - per_pair, per_pair)
+    width = sections[course_b][pair]
+    first = order[starts[course_a][pair] + offset // width]
+    second = order[starts[course_b][pair] + offset % width]
+    return first, second, (weights / per_pair)[pair]
+
+
+def _csr(size, first, second, weights):
+    """Symmetric CSR adjacency (indptr, indices, weights), summing duplicate edges"""
+    rows = np.concatenate((first, second)).astype(np.int64)
+    cols = np.concatenate((second, first)).astype(np.int64)
+    keys, inverse = np.unique(rows * size + cols, return_inverse=True)
+    summed = np.bincount(inverse, weights=np.concatenate((weights, weights)))
+    rows, cols = keys // size, keys % size
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=size))))
+    return indptr, cols, summed
+
+
+class TimetableProblem:
+    """
+    A term's offerings as arrays, ready for TimetableSolver.
+
+    Student conflicts are a symmetric sparse matrix of how many students two
+    offerings share: counted directly from current enrollments, and estimated
+    from historical co-enrollment of their courses spread over the sections.
+    Instructor double-bookings are folded into the same matrix as heavy edges.
+    """
+
+    def __init__(self, offering_ids, courses, instructors, sizes, patterns, rooms=(), classrooms=None,
+                 enrollment_pairs=None, course_pairs=None, unavailability=None):
+        self.offering_ids = list(offering_ids)
+        self.size = len(self.offering_ids)
+        self.courses = np.asarray(courses, dtype=np.int64)
+        self.instructors = np.asarray(instructors, dtype=np.int64)
+        self.sizes = np.asarray(sizes, dtype=np.float64)
+        self.patterns = list(patterns)
+        self.rooms = list(rooms)
+        self.classrooms = list(classrooms) if classrooms is not None else [''] * self.size
+        self.overlap, self.cover = _pattern_geometry(self.patterns)
+
+        edges = []
+        if enrollment_pairs is not None:
+            edges.append(_count_pairs(*enrollment_pairs, self.size))
+        if course_pairs is not None:
+            course_count = int(self.courses.max()) + 1 if self.size else 1
+            course_a, course_b, counts = _count_pairs(*course_pairs, course_count)
+            edges.append(_expand_course_pairs(course_a, course_b, counts, self.courses, course_count))
+        student_edges = tuple(np.concatenate([edge[part] for edge in edges]) if edges else np.zeros(0)
+                              for part in range(3))
+        self.student_matrix = _csr(self.size, *student_edges)
+
+        self.instructor_pairs = within_group_pairs(self.instructors, np.arange(self.size))
+        self.matrix = _csr(
+            self.size,
+            np.concatenate((student_edges[0], self.instructor_pairs[0])),
+            np.concatenate((student_edges[1], self.instructor_pairs[1])),
+            np.concatenate((student_edges[2], np.full(len(self.instructor_pairs[0]), INSTRUCTOR_CLASH_WEIGHT))),
+        )
+
+        self.penalty = np.zeros((self.size, len(self.patterns) + 1))
+        if unavailability is not None:
+            self.penalty[:, :-1] = unavailability
+
+
+def _weekday_counts(start, end):
+    counts = np.zeros(7)
+    if start <= end:
+        days = (end - start).days + 1
+        counts += days // 7
+        for offset in range(days % 7):
+            counts[(start.weekday() + offset) % 7] += 1
+    return counts
+
+
+def leave_unavailability(offering_instructors, patterns, leaves, term_start, term_end):
+    """
+    Share of each pattern's term meetings that fall inside approved leave, per
+    offering, weighted by LEAVE_WEIGHT. A leave covering the whole term costs
+    every pattern alike; a short one steers the offering off those weekdays.
+    """
+    term_counts = _weekday_counts(term_start, term_end)
+    meeting_days = np.zeros((len(patterns), 7))
+    for index, pattern in enumerate(patterns):
+        for day, _, _ in pattern:
+            meeting_days[index, day] += 1
+    meetings = meeting_days @ term_counts
+    by_instructor = defaultdict(lambda: np.zeros(7))
+    for instructor, start, end in leaves:
+        by_instructor[instructor] += _weekday_counts(max(start, term_start), min(end, term_end))
+    penalty = np.zeros((len(offering_instructors), len(patterns)))
+    for index, instructor in enumerate(offering_instructors):
+        if instructor in by_instructor:
+            missed = meeting_days @ np.minimum(by_instructor[instructor], term_counts)
+            penalty[index] = LEAVE_WEIGHT * missed / np.maximum(meetings, 1)
+    return penalty
+
+
+class TimetableSolver:
+    """
+    Greedy construction in order of conflict degree, then local search that
+    moves one offering at a time to its cheapest pattern until the time budget
+    runs out. Each move prices every pattern at once from the offering's row of
+    the conflict matrix, plus leave and room-load penalties.
+    """
+
+    def __init__(self, problem, time_budget=None, seed=None):
+        self.problem = problem
+        self.time_budget = time_budget if time_budget is not None else getattr(
+            settings, 'TIMETABLE_SOLVER_TIME_BUDGET', 60)
+        self.rng = np.random.default_rng(seed)
+        self.unplaced = len(problem.patterns)
+        self.assignment = np.full(problem.size, self.unplaced, dtype=np.int64)
+        self.room_count = len(problem.rooms) if problem.rooms else math.inf
+        self.load = np.zeros(problem.cover.shape[1], dtype=np.int32)
+        self.iterations = 0
+        self.constructed_conflicts = 0.0
+        # Leave that costs every pattern alike cannot be improved on, so it does not make an offering a candidate
+        self.avoidable_penalty = problem.penalty - problem.penalty[:, :-1].min(axis=1, keepdims=True)
+
+    def _move_costs(self, index):
+        problem = self.problem
+        indptr, indices, weights = problem.matrix
+        start, end = indptr[index], indptr[index + 1]
+        per_pattern = np.bincount(self.assignment[indices[start:end]], weights=weights[start:end],
+                                  minlength=self.unplaced + 1)
+        costs = problem.overlap @ per_pattern + problem.penalty[index]
+        if self.room_count != math.inf:
+            base = self.load - problem.cover[self.assignment[index]]
+            costs += ROOM_OVERLOAD_WEIGHT * np.maximum(base + problem.cover - self.room_count, 0).sum(axis=1)
+        costs[self.unplaced] = np.inf
+        return costs
+
+    def _move(self, index, pattern):
+        cover = self.problem.cover
+        self.load += cover[pattern] - cover[self.assignment[index]]
+        self.assignment[index] = pattern
+
+    def offering_costs(self):
+        """Current conflict cost, and avoidable leave cost, carried by each offering"""
+        problem = self.problem
+        indptr, indices, weights = problem.matrix
+        rows = np.repeat(np.arange(problem.size), np.diff(indptr))
+        clashes = problem.overlap[self.assignment[rows], self.assignment[indices]] * weights
+        costs = np.bincount(rows, weights=clashes, minlength=problem.size)
+        costs += self.avoidable_penalty[np.arange(problem.size), self.assignment]
+        if self.room_count != math.inf:
+            overloaded = problem.cover @ (self.load > self.room_count)
+            costs += overloaded[self.assignment] > 0
+        return costs
+
+    def construct(self):
+        indptr, _, weights = self.problem.matrix
+        degree = np.bincount(np.repeat(np.arange(self.problem.size), np.diff(indptr)), weights=weights,
+                             minlength=self.problem.size)
+        for index in np.argsort(-degree, kind='stable'):
+            costs = self._move_costs(index)
+            best = np.flatnonzero(costs == costs.min())
+            self._move(index, self.rng.choice(best))
+
+    def improve(self, deadline):
+        temperature = 1.0
+        candidates = np.zeros(0, dtype=np.int64)
+        while time.monotonic() < deadline:
+            if self.iterations % 500 == 0:
+                candidates = np.flatnonzero(self.offering_costs() > 0)
+                if not len(candidates):
+                    break
+                temperature *= 0.95
+            index = candidates[self.rng.integers(len(candidates))]
+            costs = self._move_costs(index)
+            current = costs[self.assignment[index]]
+            costs[self.assignment[index]] = np.inf
+            best = np.flatnonzero(costs == costs.min())
+            pattern = best[self.rng.integers(len(best))]
+            delta = costs[pattern] - current
+            if delta <= 0 or self.rng.random() < math.exp(-delta / temperature):
+                self._move(index, pattern)
+            self.iterations += 1
+
+    def student_conflicts(self):
+        """Students, or expected students, with two of their classes at the same time"""
+        indptr, indices, weights = self.problem.student_matrix
+        rows = np.repeat(np.arange(self.problem.size), np.diff(indptr))
+        return float((self.problem.overlap[self.assignment[rows], self.assignment[indices]] * weights).sum()) / 2
+
+    def solve(self):
+        started = time.monotonic()
+        self.construct()
+        self.constructed_conflicts = self.student_conflicts()
+        self.improve(started + self.time_budget)
+        return TimetableSolution(self, time.monotonic() - started)
+
+
+class TimetableSolution:
+    """Solver result: a pattern and a room per offering, plus objective statistics"""
+
+    def __init__(self, solver, elapsed):
+        problem = solver.problem
+        self.problem = problem
+        self.assignment = solver.assignment.copy()
+        self.rooms = self._assign_rooms()
+        first, second = problem.instructor_pairs
+        self.stats = {
+            'offerings': problem.size,
+            'patterns': len(problem.patterns),
+            'constructed_student_conflicts': round(solver.constructed_conflicts, 2),
+            'student_conflicts': round(solver.student_conflicts(), 2),
+            'instructor_clashes': int(problem.overlap[self.assignment[first], self.assignment[second]].sum()),
+            'leave_penalty': round(float(problem.penalty[np.arange(problem.size), self.assignment].sum()), 2),
+            'unassigned_rooms': sum(1 for room in self.rooms if room is None) if problem.rooms else 0,
+            'iterations': solver.iterations,
+            'seconds': round(elapsed, 3),
+        }
+
+    def _assign_rooms(self):
+        """Largest sections first, each into the smallest free room that fits, keeping the current room if possible"""
+        problem = self.problem
+        if not problem.rooms:
+            return list(problem.classrooms)
+        names = [name for name, _ in problem.rooms]
+        capacity = np.array([math.inf if cap is None else cap for _, cap in problem.rooms], dtype=np.float64)
+        busy = np.zeros((len(names), problem.cover.shape[1]), dtype=bool)
+        position = {name: index for index, name in enumerate(names)}
+        rooms = [None] * problem.size
+        for index in np.argsort(-problem.sizes, kind='stable'):
+            segments = problem.cover[self.assignment[index]].astype(bool)
+            free = (capacity >= problem.sizes[index]) & ~busy[:, segments].any(axis=1)
+            if not free.any():
+                continue
+            current = position.get(problem.classrooms[index])
+            if current is not None and free[current]:
+                room = current
+            else:
+                candidates = np.flatnonzero(free)
+                room = candidates[np.argmin(capacity[candidates])]
+            busy[room] |= segments
+            rooms[index] = names[room]
+        return rooms
+
+    def slots(self):
+        """Proposed ScheduleSlot rows as JSON-ready dicts"""
+        proposed = []
+        for index, pattern in enumerate(self.assignment):
+            for day, start, end in self.problem.patterns[pattern]:
+                proposed.append({
+                    'offering': str(self.problem.offering_ids[index]),
+                    'day': day,
+                    'start_time': f'{start // 60:02d}:{start % 60:02d}',
+                    'end_time': f'{end // 60:02d}:{end % 60:02d}',
+                    'room': self.rooms[index] or '',
+                })
+        return proposed
+
+
+def term_dates(semester, year):
+    start, end = TERM_DATES[semester]
+    return datetime.date(year, *start), datetime.date(year, *end)
+
+
+def load_problem(semester, year, patterns=None, rooms=None, term_start=None, term_end=None):
+    """
+    Build a TimetableProblem for a term from the database: its active offerings,
+    current enrollments, co-enrollment over the previous HISTORY_YEARS, approved
+    faculty leave overlapping the term and the known rooms
+    """
+    patterns = patterns or default_patterns()
+    default_start, default_end = term_dates(semester, year)
+    term_start, term_end = term_start or default_start, term_end or default_end
+    offerings = list(
+        CourseOffering.objects.filter(semester=semester, year=year, is_active=True)
+        .order_by('course_id', 'section').values_list('id', 'course_id', 'instructor_id', 'max_enrollment', 'classroom')
+    )
+    positions = {row[0]: index for index, row in enumerate(offerings)}
+    course_index, instructor_index = {}, {}
+    courses = [course_index.setdefault(row[1], len(course_index)) for row in offerings]
+    instructors = [instructor_index.setdefault(row[2], len(instructor_index)) for row in offerings]
+
+    student_index = {}
+    enrolled = StudentEnrollment.objects.filter(course_offering_id__in=list(positions), status='enrolled')
+    current = np.array([(student_index.setdefault(student_id, len(student_index)), positions[offering_id])
+                        for student_id, offering_id in enrolled.values_list('student_id', 'course_offering_id')],
+                       dtype=np.int64).reshape(-1, 2)
+
+    earlier_terms = [name for name, number in TERM_NUMBERS.items() if number < TERM_NUMBERS[semester]]
+    history = StudentEnrollment.objects.filter(
+        Q(course_offering__year__lt=year) | Q(course_offering__year=year, course_offering__semester__in=earlier_terms),
+        course_offering__year__gte=year - HISTORY_YEARS,
+        course_offering__course_id__in=list(course_index),
+    ).values_list('student_id', 'course_offering__year', 'course_offering__semester', 'course_offering__course_id')
+    group_index = {}
+    past = np.array([(group_index.setdefault((student_id, term_year, term), len(group_index)), course_index[course_id])
+                     for student_id, term_year, term, course_id in history.iterator(chunk_size=10000)],
+                    dtype=np.int64).reshape(-1, 2)
+
+    leaves = FacultyLeave.objects.filter(
+        status='approved', faculty_id__in=list(instructor_index), start_date__lte=term_end, end_date__gte=term_start,
+    ).values_list('faculty_id', 'start_date', 'end_date')
+    unavailability = leave_unavailability(
+        instructors, patterns,
+        [(instructor_index[faculty_id], start, end) for faculty_id, start, end in leaves],
+        term_start, term_end,
+    )
+
+    if rooms is None:
+        known = set(CourseOffering.objects.exclude(classroom='').values_list('classroom', flat=True))
+        known.update(ScheduleSlot.objects.exclude(room='').values_list('room', flat=True))
+        rooms = [(name, None) for name in sorted(known)]
+
+    return TimetableProblem(
+        [row[0] for row in offerings], courses, instructors, [row[3] for row in offerings], patterns,
+        rooms=rooms, classrooms=[row[4] for row in offerings],
+        enrollment_pairs=within_group_pairs(current[:, 0], current[:, 1]),
+        course_pairs=within_group_pairs(past[:, 0], past[:, 1]),
+        unavailability=unavailability,
+    )
+
+
+def synthetic_problem(sections, seed=0, courses_per_student=5, section_size=35, patterns=None):
+    """
+    A random term for benchmarking: three sections per course, an instructor per
+    two sections, a room per three sections and one past term of co-enrollment
+    where every student takes courses_per_student related courses
+    """
+    rng = np.random.default_rng(seed)
+    patterns = patterns or default_patterns()
+    course_count = max(sections // 3, 1)
+    courses = np.arange(sections) % course_count
+    instructors = rng.permutation(sections) // 2
+    students = sections * section_size // courses_per_student
+    # Students draw courses near a home course so co-enrollment has structure, as in real programmes
+    home = rng.integers(course_count, size=students)
+    picks = (home[:, None] + rng.integers(-25, 25, size=(students, courses_per_student))) % course_count
+    groups = np.repeat(np.arange(students), courses_per_student)
+    rooms = [(f'R{index}', None) for index in range(max(sections // 3, 1))]
+    return TimetableProblem(
+        list(range(sections)), courses, instructors, np.full(sections, section_size), patterns, rooms=rooms,
+        course_pairs=within_group_pairs(groups, picks.ravel()),
+    )
@@ -0,0 +1,47 @@
+import datetime
+
+from celery import shared_task
+from django.utils import timezone
+from django_tenants.utils import schema_context
+
+from .models import TimetableJob
+from .solver import TimetableSolver, load_problem, parse_patterns
+
+
+def _date(value):
+    return datetime.date.fromisoformat(value) if value else None
+
+
+def run_timetable_job(job):
+    """Solve the job's term and store the proposed slots; nothing is applied until the job is approved"""
+    job.status = 'running'
+    job.save(update_fields=['status', 'updated_at'])
+    parameters = job.parameters
+    rooms = parameters.get('rooms')
+    try:
+        problem = load_problem(
+            job.semester, job.year,
+            patterns=parse_patterns(parameters['patterns']) if parameters.get('patterns') else None,
+            rooms=[(room['name'], room.get('capacity')) for room in rooms] if rooms else None,
+            term_start=_date(parameters.get('term_start')),
+            term_end=_date(parameters.get('term_end')),
+        )
+        solution = TimetableSolver(problem, time_budget=job.time_budget).solve()
+    except Exception as error:
+        job.status = 'failed'
+        job.error = str(error)
+    else:
+        job.status = 'completed'
+        job.stats = solution.stats
+        job.proposed_slots = solution.slots()
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+@shared_task
+def solve_timetable(schema_name, job_id):
+    with schema_context(schema_name):
+        job = TimetableJob.objects.get(pk=job_id)
+        run_timetable_job(job)
+        return job.status
@@ -0,0 +1,143 @@
+import uuid
+from collections import defaultdict
+from itertools import combinations, groupby
+from operator import itemgetter
+
+from django.db import transaction
+from django.db.models import Q
+
+from university_erp.responsecache import bump_generations
+from .models import CourseOffering, ScheduleSlot, StudentEnrollment
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _overlapping_pairs(intervals):
+    """Yield each pair of overlapping (start, end, item) intervals; input must be sorted by start"""
+    active = []
+    for start, end, item in intervals:
+        active = [entry for entry in active if entry[1] > start]
+        for entry in active:
+            yield entry[2], item
+        active.append((start, end, item))
+
+
+def _week_mask(day, start_time, end_time):
+    """Bitmask of the minutes of the week a slot occupies, so two schedules clash iff their masks intersect"""
+    start = day * MINUTES_PER_DAY + start_time.hour * 60 + start_time.minute
+    end = day * MINUTES_PER_DAY + end_time.hour * 60 + end_time.minute + bool(end_time.second or end_time.microsecond)
+    return ((1 << (end - start)) - 1) << start
+
+
+def _sweep(slots, key):
+    """Group slots by (key, day) and report every pair that overlaps within a group"""
+    groups = defaultdict(list)
+    for slot in slots:
+        if slot[key]:
+            groups[slot[key], slot['day']].append((slot['start_time'], slot['end_time'], slot))
+    conflicts = []
+    for (value, day), intervals in groups.items():
+        intervals.sort(key=lambda interval: interval[:2])
+        for first, second in _overlapping_pairs(intervals):
+            conflicts.append({
+                key: value,
+                'day': day,
+                'offerings': [first['offering_id'], second['offering_id']],
+                'slots': [first['id'], second['id']],
+                'times': [[first['start_time'], first['end_time']], [second['start_time'], second['end_time']]],
+            })
+    return conflicts
+
+
+def term_slots(semester, year):
+    """Return the slots of a term's active offerings as dicts"""
+    return list(
+        ScheduleSlot.objects.filter(offering__semester=semester, offering__year=year, offering__is_active=True)
+        .values('id', 'offering_id', 'day', 'start_time', 'end_time', 'room')
+    )
+
+
+def validate_timetable(semester, year, proposed=None):
+    """
+    Check a term's timetable for room, instructor and student clashes.
+
+    proposed, a list of slot dicts keyed by offering id, replaces the stored
+    slots of every offering it mentions so a draft timetable can be checked
+    before it is saved. Rooms and instructors are checked with a sweep over each
+    (room, day) and (instructor, day) group; student clashes compare per-offering
+    weekly minute bitmasks, to the minute.
+    """
+    offerings = {
+        offering_id: (instructor_id, classroom)
+        for offering_id, instructor_id, classroom in CourseOffering.objects.filter(
+            semester=semester, year=year, is_active=True
+        ).values_list('id', 'instructor_id', 'classroom')
+    }
+    slots = term_slots(semester, year)
+    if proposed:
+        replaced = {slot['offering'] for slot in proposed}
+        slots = [slot for slot in slots if slot['offering_id'] not in replaced]
+        slots.extend({
+            'id': None,
+            'offering_id': slot['offering'],
+            'day': slot['day'],
+            'start_time': slot['start_time'],
+            'end_time': slot['end_time'],
+            'room': slot.get('room') or offerings[slot['offering']][1],
+        } for slot in proposed if slot['offering'] in offerings)
+    for slot in slots:
+        slot['instructor'] = offerings[slot['offering_id']][0]
+
+    weeks = defaultdict(int)
+    for slot in slots:
+        weeks[slot['offering_id']] |= _week_mask(slot['day'], slot['start_time'], slot['end_time'])
+
+    # Ordered by student so each student's offerings arrive together without a dict of students
+    enrollments = StudentEnrollment.objects.filter(
+        course_offering__semester=semester, course_offering__year=year, course_offering__is_active=True,
+        status='enrolled',
+    ).order_by('student_id').values_list('student_id', 'course_offering_id')
+    student_conflicts = []
+    for student_id, rows in groupby(enrollments.iterator(chunk_size=10000), key=itemgetter(0)):
+        offering_ids = sorted(offering_id for _, offering_id in rows)
+        for first, second in combinations(offering_ids, 2):
+            if weeks[first] & weeks[second]:
+                student_conflicts.append({'student': student_id, 'offerings': [first, second]})
+
+    return {
+        'semester': semester,
+        'year': year,
+        'offering_count': len(offerings),
+        'slot_count': len(slots),
+        'room_conflicts': _sweep(slots, 'room'),
+        'instructor_conflicts': _sweep(slots, 'instructor'),
+        'student_conflicts': student_conflicts,
+    }
+
+
+def clashing_slots(offering, day, start_time, end_time, room, exclude=None):
+    """Stored slots of the same term that would share a room or instructor with this one"""
+    clash = Q(offering__instructor_id=offering.instructor_id)
+    if room:
+        clash |= Q(room=room)
+    slots = ScheduleSlot.objects.filter(
+        clash, offering__semester=offering.semester, offering__year=offering.year, offering__is_active=True,
+        day=day, start_time__lt=end_time, end_time__gt=start_time,
+    )
+    if exclude is not None:
+        slots = slots.exclude(pk=exclude.pk)
+    return slots.select_related('offering__course')
+
+
+@transaction.atomic
+def replace_slots(proposed):
+    """Replace the stored slots of every offering in proposed (JSON slot dicts) with the proposed ones"""
+    offering_ids = set(CourseOffering.objects.filter(
+        pk__in={slot['offering'] for slot in proposed}).values_list('pk', flat=True))
+    ScheduleSlot.objects.filter(offering_id__in=offering_ids).delete()
+    bump_generations(ScheduleSlot)
+    return ScheduleSlot.objects.bulk_create([
+        ScheduleSlot(offering_id=slot['offering'], day=slot['day'], start_time=slot['start_time'],
+                     end_time=slot['end_time'], room=slot['room'])
+        for slot in proposed if uuid.UUID(slot['offering']) in offering_ids
+    ], batch_size=1000)
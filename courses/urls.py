@@ -1,11 +1,15 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CourseViewSet, CourseOfferingViewSet, StudentEnrollmentViewSet, AssignmentViewSet, StudentAssignmentViewSet
+from .views import (CourseViewSet, CourseOfferingViewSet, ScheduleSlotViewSet, TimetableJobViewSet, StudentEnrollmentViewSet,
+                    GradeScaleViewSet, AssignmentViewSet, StudentAssignmentViewSet)
 
 router = DefaultRouter()
 router.register(r'courses', CourseViewSet)
 router.register(r'offerings', CourseOfferingViewSet)
+router.register(r'schedule-slots', ScheduleSlotViewSet)
+router.register(r'timetable-jobs', TimetableJobViewSet)
 router.register(r'enrollments', StudentEnrollmentViewSet)
+router.register(r'grade-scales', GradeScaleViewSet)
 router.register(r'assignments', AssignmentViewSet)
 router.register(r'student-assignments', StudentAssignmentViewSet)
 
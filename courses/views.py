@@ -1,17 +1,44 @@
-from rest_framework import viewsets, permissions, status
+from rest_framework import mixins, viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.contrib.auth.models import User
 from django.db.models import Avg, Count
+from django.db import connection, transaction
 from django.utils import timezone
-from .models import Course, CourseOffering, StudentEnrollment, Assignment, StudentAssignment
-from .serializers import (CourseSerializer, CourseOfferingSerializer, StudentEnrollmentSerializer,
-                         AssignmentSerializer, StudentAssignmentSerializer)
+from django.utils.http import parse_etags, quote_etag
+from dashboard.models import OfferingStatistics
+from dashboard.rollups import refresh_offerings
+from dashboard.serializers import OfferingStatisticsSerializer
+from faculty.models import Faculty
+from students.models import Department, Student
+from university_erp.mixins import (ConditionalRequestMixin, KeysetPaginationMixin, QueryPlan, QueryPlanMixin,
+                                   ResponseCacheMixin, StreamingExportMixin)
+from .models import (Course, CourseOffering, ScheduleSlot, StudentEnrollment, Assignment, StudentAssignment, TimetableJob,
+                     GradeScale)
+from .enrollment import adjust_enrollment_counts, bulk_enroll
+from .grading import (apply_grade_sheet, compute_gradebooks, gradebook_version, grade_scale, read_grade_sheet,
+                      save_final_grades)
+from .prerequisites import check_eligibility
+from .serializers import (CourseSerializer, CourseOfferingSerializer, ScheduleSlotSerializer, TimetableValidationSerializer,
+                         TimetableJobSerializer, StudentEnrollmentSerializer, BulkEnrollmentSerializer,
+                         EligibilityCheckSerializer, AssignmentSerializer, GradeSheetSerializer,
+                         GradeScaleSerializer, FinalGradeSerializer, StudentAssignmentSerializer)
+from .tasks import solve_timetable
+from .timetable import replace_slots, validate_timetable
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(ConditionalRequestMixin, ResponseCacheMixin, StreamingExportMixin, KeysetPaginationMixin,
+                    QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['department'], prefetch_related=['prerequisites'])
+    cache_models = [Course, Course.prerequisites.through, Department]
+    cursor_ordering = ('course_code',)
+    action_query_plans = {
+        'offerings': QueryPlan(select_related=['course', 'instructor', 'statistics'], prefetch_related=['slots']),
+        'all_prerequisites': QueryPlan(select_related=['department'], prefetch_related=['prerequisites']),
+    }
     
     def get_queryset(self):
         queryset = Course.objects.all()
@@ -32,15 +59,32 @@ class CourseViewSet(viewsets.ModelViewSet):
     def offerings(self, request, pk=None):
         """Get course offerings"""
         course = self.get_object()
-        offerings = CourseOffering.objects.filter(course=course)
+        offerings = self.plan_queryset(CourseOffering.objects.filter(course=course))
         serializer = CourseOfferingSerializer(offerings, many=True)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def all_prerequisites(self, request, pk=None):
+        """Get direct and indirect prerequisites"""
+        course = self.get_object()
+        serializer = CourseSerializer(self.plan_queryset(course.all_prerequisites()), many=True)
+        return Response(serializer.data)
 
 
-class CourseOfferingViewSet(viewsets.ModelViewSet):
+class CourseOfferingViewSet(ConditionalRequestMixin, ResponseCacheMixin, StreamingExportMixin, QueryPlanMixin,
+                            viewsets.ModelViewSet):
     queryset = CourseOffering.objects.all()
     serializer_class = CourseOfferingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['course', 'instructor', 'statistics'], prefetch_related=['slots'])
+    cache_models = [CourseOffering, Course, Faculty, ScheduleSlot, OfferingStatistics]
+    action_query_plans = {
+        'enrollments': QueryPlan(select_related=['student', 'course_offering__course']),
+        'assignments': QueryPlan(select_related=['course_offering__course']),
+        'statistics': QueryPlan(),
+        'gradebook': QueryPlan(),
+        'final_grades': QueryPlan(),
+    }
     
     def get_queryset(self):
         queryset = CourseOffering.objects.all()
@@ -61,7 +105,7 @@ class CourseOfferingViewSet(viewsets.ModelViewSet):
     def enrollments(self, request, pk=None):
         """Get course enrollments"""
         offering = self.get_object()
-        enrollments = StudentEnrollment.objects.filter(course_offering=offering)
+        enrollments = self.plan_queryset(StudentEnrollment.objects.filter(course_offering=offering))
         serializer = StudentEnrollmentSerializer(enrollments, many=True)
         return Response(serializer.data)
     
@@ -69,15 +113,128 @@ class CourseOfferingViewSet(viewsets.ModelViewSet):
     def assignments(self, request, pk=None):
         """Get course assignments"""
         offering = self.get_object()
-        assignments = Assignment.objects.filter(course_offering=offering)
+        assignments = self.plan_queryset(Assignment.objects.filter(course_offering=offering))
         serializer = AssignmentSerializer(assignments, many=True)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'])
+    def eligibility(self, request):
+        """Check which students meet all prerequisites of which offerings"""
+        serializer = EligibilityCheckSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = check_eligibility(serializer.validated_data['students'], serializer.validated_data['offerings'])
+        return Response(results)
+    
+    @action(detail=False, methods=['get', 'post'])
+    def timetable_conflicts(self, request):
+        """Check a term's timetable, optionally with proposed slots, for room, instructor and student clashes"""
+        data = request.query_params if request.method == 'GET' else request.data
+        serializer = TimetableValidationSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        return Response(validate_timetable(serializer.validated_data['semester'], serializer.validated_data['year'],
+                                           serializer.validated_data.get('slots')))
+    
+    @action(detail=True, methods=['get'])
+    def statistics(self, request, pk=None):
+        """Get offering enrollment statistics from the rollup table, rolling it up on first read"""
+        offering = self.get_object()
+        try:
+            statistics = offering.statistics
+        except OfferingStatistics.DoesNotExist:
+            refresh_offerings([offering.pk])
+            statistics = OfferingStatistics.objects.get(offering=offering)
+        return Response(OfferingStatisticsSerializer(statistics).data)
+    
+    @action(detail=True, methods=['get'])
+    def gradebook(self, request, pk=None):
+        """Every student's marks on every assignment as one columnar payload, with an ETag for revalidation"""
+        offering = self.get_object()
+        # Weak, and per format: the JSON and CSV renderings of one version are not byte-identical
+        etag = quote_etag(f'{gradebook_version(offering.pk)}.{request.accepted_renderer.format}')
+        # Weak comparison, as for GET in RFC 9110: W/"x" matches "x"
+        if etag in (tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))):
+            response = Response(status=304)
+        else:
+            response = Response(compute_gradebooks([offering.pk])[offering.pk].columns())
+        response['ETag'] = f'W/{etag}'
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    @action(detail=True, methods=['get', 'post'])
+    def final_grades(self, request, pk=None):
+        """Compute final grades from weighted assignment marks; GET previews them, POST writes them"""
+        offering = self.get_object()
+        data = request.query_params if request.method == 'GET' else request.data
+        serializer = FinalGradeSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        gradebook = compute_gradebooks([offering.pk], scale=grade_scale(serializer.validated_data.get('scale')),
+                                       missing_policy=serializer.validated_data['missing'])[offering.pk]
+        if request.method == 'POST':
+            save_final_grades([gradebook], complete=serializer.validated_data['complete'])
+        return Response({
+            'offering': offering.pk,
+            'missing': gradebook.missing_policy,
+            'assignments': gradebook.assignments,
+            'saved': request.method == 'POST',
+            'results': gradebook.results(),
+        })
 
 
-class StudentEnrollmentViewSet(viewsets.ModelViewSet):
+class ScheduleSlotViewSet(ConditionalRequestMixin, StreamingExportMixin, QueryPlanMixin, viewsets.ModelViewSet):
+    queryset = ScheduleSlot.objects.all()
+    serializer_class = ScheduleSlotSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        queryset = ScheduleSlot.objects.all()
+        offering = self.request.query_params.get('offering')
+        room = self.request.query_params.get('room')
+        day = self.request.query_params.get('day')
+        
+        if offering:
+            queryset = queryset.filter(offering_id=offering)
+        if room:
+            queryset = queryset.filter(room=room)
+        if day:
+            queryset = queryset.filter(day=day)
+            
+        return queryset
+
+
+class GradeScaleViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
+    queryset = GradeScale.objects.all()
+    serializer_class = GradeScaleSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+
+class TimetableJobViewSet(ConditionalRequestMixin, mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = TimetableJob.objects.all()
+    serializer_class = TimetableJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def perform_create(self, serializer):
+        job = serializer.save(created_by=self.request.user)
+        schema_name = connection.schema_name
+        transaction.on_commit(lambda: solve_timetable.delay(schema_name, str(job.pk)))
+    
+    @action(detail=True, methods=['post'])
+    def apply(self, request, pk=None):
+        """Replace the term's schedule slots with the solver's proposal"""
+        job = self.get_object()
+        if job.status != 'completed':
+            return Response({'error': 'Only completed timetable jobs can be applied'}, status=400)
+        replace_slots(job.proposed_slots)
+        job.status = 'applied'
+        job.save(update_fields=['status', 'updated_at'])
+        return Response(self.get_serializer(job).data)
+
+
+class StudentEnrollmentViewSet(StreamingExportMixin, KeysetPaginationMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = StudentEnrollment.objects.all()
     serializer_class = StudentEnrollmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['student', 'course_offering__course'])
+    cursor_ordering = ('-enrollment_date',)
     
     def get_queryset(self):
         queryset = StudentEnrollment.objects.all()
@@ -93,12 +250,38 @@ class StudentEnrollmentViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(status=status)
             
         return queryset
+    
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # Re-read the status under a row lock so a concurrent status change cannot be counted twice
+        current = StudentEnrollment.objects.select_for_update().values_list('status', flat=True).get(pk=instance.pk)
+        if current == 'enrolled':
+            adjust_enrollment_counts({instance.course_offering_id: -1})
+        instance.delete()
+    
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """Enroll many students in many offerings with per-item results"""
+        serializer = BulkEnrollmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = bulk_enroll(serializer.validated_data['enrollments'])
+        enrolled = sum(1 for result in results if result['status'] == 'enrolled')
+        return Response({
+            'enrolled': enrolled,
+            'rejected': len(results) - enrolled,
+            'results': results,
+        })
 
 
-class AssignmentViewSet(viewsets.ModelViewSet):
+class AssignmentViewSet(ConditionalRequestMixin, StreamingExportMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Assignment.objects.all()
     serializer_class = AssignmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['course_offering__course'])
+    cache_models = [Assignment, CourseOffering, Course]
+    action_query_plans = {
+        'submissions': QueryPlan(select_related=['student', 'assignment', 'graded_by']),
+    }
     
     def get_queryset(self):
         queryset = Assignment.objects.all()
@@ -116,15 +299,34 @@ class AssignmentViewSet(viewsets.ModelViewSet):
     def submissions(self, request, pk=None):
         """Get assignment submissions"""
         assignment = self.get_object()
-        submissions = StudentAssignment.objects.filter(assignment=assignment)
+        submissions = self.plan_queryset(StudentAssignment.objects.filter(assignment=assignment))
         serializer = StudentAssignmentSerializer(submissions, many=True)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['post'], url_path='grades/bulk')
+    def bulk_grade(self, request, pk=None):
+        """Grade an assignment from one JSON or CSV grade sheet, all or nothing"""
+        assignment = self.get_object()
+        upload = request.FILES.get('file')
+        if upload is not None:
+            data = {'grades': read_grade_sheet(upload), 'roll_up': request.data.get('roll_up', False)}
+        else:
+            data = request.data
+        serializer = GradeSheetSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        summary = apply_grade_sheet(assignment, serializer.validated_data['grades'], request.user,
+                                    roll_up=serializer.validated_data['roll_up'])
+        return Response(summary, status=200 if summary['applied'] else 400)
 
 
-class StudentAssignmentViewSet(viewsets.ModelViewSet):
+class StudentAssignmentViewSet(ConditionalRequestMixin, StreamingExportMixin, KeysetPaginationMixin, QueryPlanMixin,
+                               viewsets.ModelViewSet):
     queryset = StudentAssignment.objects.all()
     serializer_class = StudentAssignmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['student', 'assignment', 'graded_by'])
+    cache_models = [StudentAssignment, Student, Assignment, User]
+    cursor_ordering = ('id',)
     
     def get_queryset(self):
         queryset = StudentAssignment.objects.all()
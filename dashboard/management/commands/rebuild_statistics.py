@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.rollups import BATCH_SIZE, rebuild_all
+
+
+class Command(BaseCommand):
+    help = 'Rebuild every department and offering statistics rollup (run per tenant via tenant_command)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        def progress(kind, done, total):
+            self.stdout.write(f'{done}/{total} {kind} rolled up')
+
+        counts = rebuild_all(batch_size=options['batch_size'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"Statistics rebuilt: {counts['departments']} departments, {counts['offerings']} offerings"))
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:00
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('courses', '0007_student_assignment_updated_at'),
+        ('students', '0002_student_import_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepartmentStatistics',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('total_students', models.IntegerField(default=0)),
+                ('active_students', models.IntegerField(default=0)),
+                ('students_by_status', models.JSONField(blank=True, default=dict)),
+                ('students_by_level', models.JSONField(blank=True, default=dict)),
+                ('average_gpa', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True)),
+                ('gpa_histogram', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('department', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='students.department')),
+            ],
+            options={
+                'verbose_name': 'Department Statistics',
+                'verbose_name_plural': 'Department Statistics',
+            },
+        ),
+        migrations.CreateModel(
+            name='OfferingStatistics',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('total_enrollments', models.IntegerField(default=0)),
+                ('active_enrollments', models.IntegerField(default=0)),
+                ('enrollments_by_status', models.JSONField(blank=True, default=dict)),
+                ('capacity', models.IntegerField(default=0)),
+                ('fill_rate', models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ('drop_rate', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('withdraw_rate', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('average_grade_points', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True)),
+                ('grade_points_histogram', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('offering', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='courses.courseoffering')),
+            ],
+            options={
+                'verbose_name': 'Offering Statistics',
+                'verbose_name_plural': 'Offering Statistics',
+            },
+        ),
+    ]
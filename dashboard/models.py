@@ -0,0 +1,51 @@
+from django.db import models
+import uuid
+
+
+class DepartmentStatistics(models.Model):
+    """
+    Rolled-up student aggregates for one department, kept current by signals
+    and rebuilt by the rebuild_statistics command
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    department = models.OneToOneField('students.Department', on_delete=models.CASCADE, related_name='statistics')
+    total_students = models.IntegerField(default=0)
+    active_students = models.IntegerField(default=0)
+    students_by_status = models.JSONField(default=dict, blank=True)
+    students_by_level = models.JSONField(default=dict, blank=True)
+    average_gpa = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True)
+    gpa_histogram = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Statistics for {self.department_id}"
+    
+    class Meta:
+        verbose_name = 'Department Statistics'
+        verbose_name_plural = 'Department Statistics'
+
+
+class OfferingStatistics(models.Model):
+    """
+    Rolled-up enrollment aggregates for one course offering, kept current by
+    signals and rebuilt by the rebuild_statistics command
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    offering = models.OneToOneField('courses.CourseOffering', on_delete=models.CASCADE, related_name='statistics')
+    total_enrollments = models.IntegerField(default=0)
+    active_enrollments = models.IntegerField(default=0)
+    enrollments_by_status = models.JSONField(default=dict, blank=True)
+    capacity = models.IntegerField(default=0)
+    fill_rate = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+    drop_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    withdraw_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    average_grade_points = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True)
+    grade_points_histogram = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Statistics for {self.offering_id}"
+    
+    class Meta:
+        verbose_name = 'Offering Statistics'
+        verbose_name_plural = 'Offering Statistics'
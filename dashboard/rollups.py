@@ -0,0 +1,138 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db.models import Case, CharField, Count, Sum, Value, When
+
+from courses.models import CourseOffering, StudentEnrollment
+from students.models import Department, Student
+from university_erp.responsecache import bump_generations
+from .models import DepartmentStatistics, OfferingStatistics
+
+BATCH_SIZE = 500
+# Lower bounds of the half-point GPA / grade-point histogram buckets, highest first
+HISTOGRAM_BUCKETS = [Decimal('3.5'), Decimal('3.0'), Decimal('2.5'), Decimal('2.0'),
+                     Decimal('1.5'), Decimal('1.0'), Decimal('0.5'), Decimal('0.0')]
+INACTIVE_ENROLLMENT_STATUSES = ['dropped', 'withdrawn']
+TWO_PLACES = Decimal('0.01')
+
+
+def _bucket(field):
+    return Case(*[When(**{f'{field}__gte': bound, 'then': Value(str(bound))}) for bound in HISTOGRAM_BUCKETS],
+                default=Value(None), output_field=CharField())
+
+
+def _empty_histogram():
+    return {str(bound): 0 for bound in reversed(HISTOGRAM_BUCKETS)}
+
+
+def _percent(part, whole):
+    if not whole:
+        return Decimal('0.00')
+    return (Decimal(part) * 100 / Decimal(whole)).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+def _average(total, count):
+    if not count:
+        return None
+    return (Decimal(total) / count).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+def refresh_departments(department_ids):
+    """Recompute the statistics rows of the given departments from one grouped query over their students"""
+    department_ids = set(Department.objects.filter(pk__in=set(department_ids)).values_list('pk', flat=True))
+    if not department_ids:
+        return 0
+    totals = {pk: {'students_by_status': {}, 'students_by_level': {}, 'gpa_histogram': _empty_histogram(),
+                   'gpa_total': Decimal(0), 'gpa_count': 0} for pk in department_ids}
+    rows = (Student.objects.filter(department_id__in=department_ids).order_by()
+            .values('department_id', 'status', 'academic_level', bucket=_bucket('gpa'))
+            .annotate(count=Count('pk'), gpa_total=Sum('gpa'), gpa_count=Count('gpa')))
+    for row in rows:
+        department = totals[row['department_id']]
+        for key, value in (('students_by_status', row['status']), ('students_by_level', row['academic_level'])):
+            department[key][value] = department[key].get(value, 0) + row['count']
+        if row['bucket'] is not None:
+            department['gpa_histogram'][row['bucket']] += row['count']
+            department['gpa_total'] += row['gpa_total']
+            department['gpa_count'] += row['gpa_count']
+
+    DepartmentStatistics.objects.bulk_create(
+        [DepartmentStatistics(
+            department_id=pk,
+            total_students=sum(department['students_by_status'].values()),
+            active_students=department['students_by_status'].get('active', 0),
+            students_by_status=department['students_by_status'],
+            students_by_level=department['students_by_level'],
+            average_gpa=_average(department['gpa_total'], department['gpa_count']),
+            gpa_histogram=department['gpa_histogram'],
+        ) for pk, department in totals.items()],
+        update_conflicts=True,
+        unique_fields=['department'],
+        update_fields=['total_students', 'active_students', 'students_by_status', 'students_by_level',
+                       'average_gpa', 'gpa_histogram', 'updated_at'],
+    )
+    return len(totals)
+
+
+def refresh_offerings(offering_ids):
+    """Recompute the statistics rows of the given offerings from one grouped query over their enrollments"""
+    capacities = dict(CourseOffering.objects.filter(pk__in=set(offering_ids)).values_list('pk', 'max_enrollment'))
+    if not capacities:
+        return 0
+    totals = {pk: {'enrollments_by_status': {}, 'grade_points_histogram': _empty_histogram(),
+                   'points_total': Decimal(0), 'points_count': 0} for pk in capacities}
+    rows = (StudentEnrollment.objects.filter(course_offering_id__in=capacities).order_by()
+            .values('course_offering_id', 'status', bucket=_bucket('grade_points'))
+            .annotate(count=Count('pk'), points_total=Sum('grade_points'), points_count=Count('grade_points')))
+    for row in rows:
+        offering = totals[row['course_offering_id']]
+        offering['enrollments_by_status'][row['status']] = (
+            offering['enrollments_by_status'].get(row['status'], 0) + row['count'])
+        if row['bucket'] is not None:
+            offering['grade_points_histogram'][row['bucket']] += row['count']
+            offering['points_total'] += row['points_total']
+            offering['points_count'] += row['points_count']
+
+    statistics = []
+    for pk, offering in totals.items():
+        by_status = offering['enrollments_by_status']
+        total = sum(by_status.values())
+        active = total - sum(by_status.get(status, 0) for status in INACTIVE_ENROLLMENT_STATUSES)
+        statistics.append(OfferingStatistics(
+            offering_id=pk,
+            total_enrollments=total,
+            active_enrollments=active,
+            enrollments_by_status=by_status,
+            capacity=capacities[pk],
+            fill_rate=_percent(active, capacities[pk]),
+            drop_rate=_percent(by_status.get('dropped', 0), total),
+            withdraw_rate=_percent(by_status.get('withdrawn', 0), total),
+            average_grade_points=_average(offering['points_total'], offering['points_count']),
+            grade_points_histogram=offering['grade_points_histogram'],
+        ))
+    OfferingStatistics.objects.bulk_create(
+        statistics,
+        update_conflicts=True,
+        unique_fields=['offering'],
+        update_fields=['total_enrollments', 'active_enrollments', 'enrollments_by_status', 'capacity', 'fill_rate',
+                       'drop_rate', 'withdraw_rate', 'average_grade_points', 'grade_points_histogram', 'updated_at'],
+    )
+    bump_generations(OfferingStatistics)
+    return len(statistics)
+
+
+def rebuild_all(batch_size=BATCH_SIZE, progress=None):
+    """
+    Rebuild every department and offering statistics row in the current
+    tenant, batch_size keys per grouped query. progress(kind, done, total)
+    is called after each batch.
+    """
+    counts = {}
+    for kind, keys, refresh in (('departments', Department.objects.values_list('pk', flat=True), refresh_departments),
+                                ('offerings', CourseOffering.objects.values_list('pk', flat=True), refresh_offerings)):
+        keys = list(keys.order_by('pk'))
+        for start in range(0, len(keys), batch_size):
+            refresh(keys[start:start + batch_size])
+            if progress:
+                progress(kind, min(start + batch_size, len(keys)), len(keys))
+        counts[kind] = len(keys)
+    return counts
@@ -0,0 +1,17 @@
+from rest_framework import serializers
+from .models import DepartmentStatistics, OfferingStatistics
+
+
+class DepartmentStatisticsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DepartmentStatistics
+        fields = ['department', 'total_students', 'active_students', 'students_by_status', 'students_by_level',
+                 'average_gpa', 'gpa_histogram', 'updated_at']
+
+
+class OfferingStatisticsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OfferingStatistics
+        fields = ['offering', 'total_enrollments', 'active_enrollments', 'enrollments_by_status', 'capacity',
+                 'fill_rate', 'drop_rate', 'withdraw_rate', 'average_grade_points', 'grade_points_histogram',
+                 'updated_at']
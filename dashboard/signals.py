@@ -0,0 +1,97 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from courses.models import Course, CourseOffering, StudentEnrollment
+from courses.signals import enrollments_bulk_created, enrollments_bulk_updated
+from deanship.models import DeanshipDecision
+from faculty.models import Faculty, FacultyLeave
+from students.gpa import gpas_recomputed
+from students.models import Student
+from students.signals import students_bulk_created
+from university_erp.responsecache import track_generations
+from .models import OfferingStatistics
+from .rollups import refresh_departments, refresh_offerings
+from .summary import invalidate_summary
+
+SUMMARY_MODELS = [Student, Faculty, FacultyLeave, Course, CourseOffering, StudentEnrollment, DeanshipDecision]
+
+
+def invalidate_dashboard_summary(sender, **kwargs):
+    invalidate_summary()
+
+
+for model in SUMMARY_MODELS:
+    post_save.connect(invalidate_dashboard_summary, sender=model, dispatch_uid=f'dashboard_summary_save_{model.__name__}')
+    post_delete.connect(invalidate_dashboard_summary, sender=model, dispatch_uid=f'dashboard_summary_delete_{model.__name__}')
+
+enrollments_bulk_created.connect(invalidate_dashboard_summary, dispatch_uid='dashboard_summary_bulk_enrollments')
+students_bulk_created.connect(invalidate_dashboard_summary, dispatch_uid='dashboard_summary_bulk_students')
+
+track_generations(OfferingStatistics)
+
+
+def _student_rollup_inputs(student):
+    return (student.department_id, student.status, student.academic_level, student.gpa)
+
+
+def _offering_rollup_inputs(offering):
+    return offering.max_enrollment
+
+
+@receiver(post_init, sender=Student)
+def remember_student_rollup_inputs(sender, instance, **kwargs):
+    instance._rollup_inputs = _student_rollup_inputs(instance)
+
+
+@receiver(post_save, sender=Student)
+def refresh_department_statistics_on_save(sender, instance, created, **kwargs):
+    if created or instance._rollup_inputs != _student_rollup_inputs(instance):
+        # A transfer changes two departments' statistics
+        departments = {instance._rollup_inputs[0], instance.department_id} - {None}
+        instance._rollup_inputs = _student_rollup_inputs(instance)
+        transaction.on_commit(lambda: refresh_departments(departments))
+
+
+@receiver(post_delete, sender=Student)
+def refresh_department_statistics_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(lambda: refresh_departments([instance.department_id]))
+
+
+@receiver(students_bulk_created)
+def refresh_department_statistics_on_import(sender, students, **kwargs):
+    refresh_departments({student.department_id for student in students})
+
+
+@receiver(gpas_recomputed)
+def refresh_department_statistics_on_gpa(sender, student_ids, **kwargs):
+    departments = set(Student.objects.filter(pk__in=student_ids).values_list('department_id', flat=True))
+    transaction.on_commit(lambda: refresh_departments(departments))
+
+
+@receiver(post_init, sender=CourseOffering)
+def remember_offering_rollup_inputs(sender, instance, **kwargs):
+    instance._rollup_inputs = _offering_rollup_inputs(instance)
+
+
+@receiver(post_save, sender=CourseOffering)
+def refresh_offering_statistics_on_capacity(sender, instance, created, **kwargs):
+    if created or instance._rollup_inputs != _offering_rollup_inputs(instance):
+        instance._rollup_inputs = _offering_rollup_inputs(instance)
+        transaction.on_commit(lambda: refresh_offerings([instance.pk]))
+
+
+@receiver(post_save, sender=StudentEnrollment)
+@receiver(post_delete, sender=StudentEnrollment)
+def refresh_offering_statistics_on_enrollment(sender, instance, **kwargs):
+    transaction.on_commit(lambda: refresh_offerings([instance.course_offering_id]))
+
+
+@receiver(enrollments_bulk_created)
+def refresh_offering_statistics_on_bulk_enroll(sender, enrollments, **kwargs):
+    refresh_offerings({enrollment.course_offering_id for enrollment in enrollments})
+
+
+@receiver(enrollments_bulk_updated)
+def refresh_offering_statistics_on_bulk_update(sender, offering_ids, **kwargs):
+    refresh_offerings(offering_ids)
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import CharField, Count, Value
+from django.db.models.functions import Cast
+
+from courses.models import Course, CourseOffering, StudentEnrollment
+from deanship.models import DeanshipDecision
+from faculty.models import Faculty, FacultyLeave
+from students.models import Student
+
+
+def cache_key(schema_name=None):
+    return f"dashboard:summary:{schema_name or connection.schema_name}"
+
+
+def grouped_counts(metric, queryset, field):
+    """(metric, key, count) rows of queryset grouped by field, to be combined with union(all=True)"""
+    return (queryset.order_by()
+            .values(key=Cast(field, output_field=CharField()))
+            .annotate(metric=Value(metric, output_field=CharField()), count=Count('pk'))
+            .values_list('metric', 'key', 'count'))
+
+
+def compute_summary():
+    """Compute every dashboard counter for the current tenant in a single UNION ALL query"""
+    counts = grouped_counts('student_status', Student.objects.all(), 'status').union(
+        grouped_counts('student_level', Student.objects.all(), 'academic_level'),
+        grouped_counts('faculty_position', Faculty.objects.all(), 'position'),
+        grouped_counts('course_active', Course.objects.all(), 'is_active'),
+        grouped_counts('offering_active', CourseOffering.objects.all(), 'is_active'),
+        grouped_counts('enrollment_status', StudentEnrollment.objects.all(), 'status'),
+        grouped_counts('leave_status', FacultyLeave.objects.all(), 'status'),
+        grouped_counts('decision_status', DeanshipDecision.objects.all(), 'status'),
+        all=True,
+    )
+
+    grouped = {}
+    for metric, key, count in counts:
+        grouped.setdefault(metric, {})[key] = count
+
+    def active(metric):
+        # Booleans cast to text read 'true' on PostgreSQL
+        return sum(count for key, count in grouped.get(metric, {}).items() if key in ('true', '1', 'True'))
+
+    students_by_status = grouped.get('student_status', {})
+    faculty_by_position = grouped.get('faculty_position', {})
+    return {
+        'total_students': sum(students_by_status.values()),
+        'total_faculty': sum(faculty_by_position.values()),
+        'total_courses': sum(grouped.get('course_active', {}).values()),
+        'active_courses': active('course_active'),
+        'active_offerings': active('offering_active'),
+        'active_enrollments': grouped.get('enrollment_status', {}).get('enrolled', 0),
+        'pending_leaves': grouped.get('leave_status', {}).get('pending', 0),
+        'pending_decisions': grouped.get('decision_status', {}).get('pending', 0),
+        'students_by_status': students_by_status,
+        'students_by_level': grouped.get('student_level', {}),
+        'faculty_by_position': faculty_by_position,
+    }
+
+
+def get_summary():
+    key = cache_key()
+    summary = cache.get(key)
+    if summary is None:
+        summary = compute_summary()
+        cache.set(key, summary, getattr(settings, 'DASHBOARD_SUMMARY_CACHE_TTL', 60))
+    return summary
+
+
+def invalidate_summary():
+    cache.delete(cache_key())
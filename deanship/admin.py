@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Dean, DeanshipDecision, DeanshipMeeting, DepartmentBudget, DeanshipReport
+from search.admin import FullTextSearchAdminMixin
+from .ledger import sync_period_fields
+from .models import Dean, DeanshipDecision, DeanshipMeeting, DepartmentBudget, BudgetTransaction, DeanshipReport
 
 
 @admin.register(Dean)
@@ -24,10 +26,11 @@ class DeanAdmin(admin.ModelAdmin):
 
 
 @admin.register(DeanshipDecision)
-class DeanshipDecisionAdmin(admin.ModelAdmin):
+class DeanshipDecisionAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ('dean', 'title', 'decision_type', 'status', 'decision_date')
     list_filter = ('decision_type', 'status', 'decision_date')
     search_fields = ('title', 'description', 'dean__faculty__first_name', 'dean__faculty__last_name')
+    fulltext_related = ('dean__faculty',)
     readonly_fields = ('id', 'created_at', 'updated_at')
     
     fieldsets = (
@@ -48,10 +51,11 @@ class DeanshipDecisionAdmin(admin.ModelAdmin):
 
 
 @admin.register(DeanshipMeeting)
-class DeanshipMeetingAdmin(admin.ModelAdmin):
+class DeanshipMeetingAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ('dean', 'title', 'meeting_type', 'meeting_date', 'location', 'status')
     list_filter = ('meeting_type', 'status', 'meeting_date')
     search_fields = ('title', 'description', 'dean__faculty__first_name', 'dean__faculty__last_name')
+    fulltext_related = ('dean__faculty',)
     readonly_fields = ('id', 'created_at', 'updated_at')
     filter_horizontal = ('attendees',)
     
@@ -72,12 +76,28 @@ class DeanshipMeetingAdmin(admin.ModelAdmin):
     )
 
 
+class BudgetTransactionInline(admin.TabularInline):
+    model = BudgetTransaction
+    extra = 0
+    fields = ('posted_on', 'transaction_type', 'amount', 'balance_after', 'description', 'reference', 'created_by')
+    readonly_fields = fields
+    ordering = ('-posted_on',)
+    
+    # The ledger is append-only and written through deanship.ledger
+    def has_add_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(DepartmentBudget)
 class DepartmentBudgetAdmin(admin.ModelAdmin):
     list_display = ('dean', 'title', 'budget_type', 'fiscal_year', 'requested_amount', 'approved_amount', 'status')
     list_filter = ('budget_type', 'fiscal_year', 'status')
     search_fields = ('title', 'description', 'dean__faculty__first_name', 'dean__faculty__last_name')
-    readonly_fields = ('id', 'created_at', 'updated_at')
+    readonly_fields = ('id', 'spent_amount', 'created_at', 'updated_at')
+    inlines = [BudgetTransactionInline]
     
     fieldsets = (
         ('Budget Information', {
@@ -94,14 +114,21 @@ class DepartmentBudgetAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         })
     )
+    
+    def save_model(self, request, obj, form, change):
+        # The admin saves inside the request's transaction, so the ledger copies move with the budget
+        super().save_model(request, obj, form, change)
+        if change and {'dean', 'fiscal_year', 'budget_type'} & set(form.changed_data):
+            sync_period_fields(obj)
 
 
 @admin.register(DeanshipReport)
-class DeanshipReportAdmin(admin.ModelAdmin):
-    list_display = ('dean', 'title', 'report_type', 'report_period', 'submission_date')
-    list_filter = ('report_type', 'submission_date')
+class DeanshipReportAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
+    list_display = ('dean', 'title', 'report_type', 'report_period', 'statistics_status', 'submission_date')
+    list_filter = ('report_type', 'statistics_status', 'submission_date')
     search_fields = ('title', 'content', 'dean__faculty__first_name', 'dean__faculty__last_name')
-    readonly_fields = ('id', 'created_at', 'updated_at')
+    fulltext_related = ('dean__faculty',)
+    readonly_fields = ('id', 'statistics_status', 'statistics_error', 'statistics_generated_at', 'created_at', 'updated_at')
     
     fieldsets = (
         ('Report Information', {
@@ -110,6 +137,10 @@ class DeanshipReportAdmin(admin.ModelAdmin):
         ('Content', {
             'fields': ('content', 'statistics', 'achievements', 'challenges', 'recommendations')
         }),
+        ('Statistics Generation', {
+            'fields': ('statistics_status', 'statistics_error', 'statistics_generated_at'),
+            'classes': ('collapse',)
+        }),
         ('Attachments', {
             'fields': ('attachments',)
         }),
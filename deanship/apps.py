@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class DeanshipConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'deanship'
-    verbose_name = 'Deanship Management'
\ No newline at end of file
+    verbose_name = 'Deanship Management'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,118 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Avg, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from dashboard.models import OfferingStatistics
+from dashboard.summary import grouped_counts
+from faculty.models import FacultyLeave
+from students.gpa import TERM_NUMBERS
+from .models import DeanshipDecision, DeanshipMeeting, DepartmentBudget
+
+UPCOMING_MEETINGS = 5
+TREND_TERMS = 8
+OPEN_MEETING_STATUSES = ['scheduled', 'postponed']
+PENDING_BUDGET_STATUSES = ['pending_approval', 'under_review']
+
+
+def cache_key(dean_id, schema_name=None):
+    return f"deanship:dashboard:{schema_name or connection.schema_name}:{dean_id}"
+
+
+def _money(field, **condition):
+    return Coalesce(Sum(field, filter=Q(**condition) if condition else None), Value(0),
+                    output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def _budgets(dean_id):
+    """Requested, approved, spent and remaining amounts per (budget_type, fiscal_year) from one grouped query"""
+    rows = (DepartmentBudget.objects.filter(dean_id=dean_id).order_by()
+            .values('budget_type', 'fiscal_year')
+            .annotate(requested=_money('requested_amount'),
+                      pending=_money('requested_amount', status__in=PENDING_BUDGET_STATUSES),
+                      approved=_money('approved_amount', status='approved'),
+                      spent=_money('spent_amount', status='approved'))
+            .order_by('-fiscal_year', 'budget_type'))
+    budgets = [{**row, 'remaining': row['approved'] - row['spent']} for row in rows]
+    totals = {key: sum((row[key] for row in budgets), start=0) for key in ('requested', 'pending', 'approved', 'spent')}
+    totals['remaining'] = totals['approved'] - totals['spent']
+    return budgets, totals
+
+
+def _enrollment_trends(department_id):
+    """Enrollment totals per term for the department's offerings, read from the offering rollups"""
+    rows = (OfferingStatistics.objects.filter(offering__course__department_id=department_id).order_by()
+            .values('offering__year', 'offering__semester')
+            .annotate(enrollments=Sum('total_enrollments'), active=Sum('active_enrollments'),
+                      capacity=Sum('capacity'), average_fill_rate=Avg('fill_rate')))
+    trends = sorted(
+        ({'year': row['offering__year'], 'semester': row['offering__semester'], 'enrollments': row['enrollments'],
+          'active': row['active'], 'capacity': row['capacity'],
+          'average_fill_rate': round(row['average_fill_rate'] or Decimal(0), 2)} for row in rows),
+        key=lambda trend: (trend['year'], TERM_NUMBERS.get(trend['semester'], 0)),
+    )
+    return trends[-TREND_TERMS:]
+
+
+def compute_dashboard(dean):
+    """
+    Dean dashboard in four queries: one UNION ALL of every grouped count, one
+    conditional-aggregation query over budgets, the next meetings and the
+    department's per-term enrollment rollups
+    """
+    now = timezone.now()
+    decisions = DeanshipDecision.objects.filter(dean_id=dean.pk)
+    meetings = DeanshipMeeting.objects.filter(dean_id=dean.pk)
+    pending_leaves = FacultyLeave.objects.filter(faculty__department_id=dean.department_id, status='pending')
+    counts = grouped_counts('decision_status', decisions, 'status').union(
+        grouped_counts('decision_type', decisions, 'decision_type'),
+        grouped_counts('meeting_status', meetings, 'status'),
+        grouped_counts('meeting_upcoming', meetings.filter(meeting_date__gte=now, status__in=OPEN_MEETING_STATUSES),
+                       'status'),
+        grouped_counts('pending_leave_type', pending_leaves, 'leave_type'),
+        all=True,
+    )
+    grouped = {}
+    for metric, key, count in counts:
+        grouped.setdefault(metric, {})[key] = count
+
+    upcoming = list(
+        meetings.filter(meeting_date__gte=now, status__in=OPEN_MEETING_STATUSES).order_by('meeting_date')
+        .values('id', 'title', 'meeting_type', 'meeting_date', 'location', 'status')[:UPCOMING_MEETINGS]
+    )
+    budgets, budget_totals = _budgets(dean.pk)
+    decisions_by_status = grouped.get('decision_status', {})
+    return {
+        'total_decisions': sum(decisions_by_status.values()),
+        'pending_decisions': decisions_by_status.get('pending', 0),
+        'decisions_by_status': decisions_by_status,
+        'decisions_by_type': grouped.get('decision_type', {}),
+        'meetings_by_status': grouped.get('meeting_status', {}),
+        'upcoming_meetings': sum(grouped.get('meeting_upcoming', {}).values()),
+        'next_meetings': upcoming,
+        'total_budget': budget_totals['approved'],
+        'spent_budget': budget_totals['spent'],
+        'budget_totals': budget_totals,
+        'budgets': budgets,
+        'pending_leaves': sum(grouped.get('pending_leave_type', {}).values()),
+        'pending_leaves_by_type': grouped.get('pending_leave_type', {}),
+        'enrollment_trends': _enrollment_trends(dean.department_id),
+        'generated_at': now,
+    }
+
+
+def get_dashboard(dean):
+    key = cache_key(dean.pk)
+    dashboard = cache.get(key)
+    if dashboard is None:
+        dashboard = compute_dashboard(dean)
+        cache.set(key, dashboard, settings.DEAN_DASHBOARD_CACHE_TTL)
+    return dashboard
+
+
+def invalidate_dashboards(dean_ids):
+    cache.delete_many([cache_key(dean_id) for dean_id in dean_ids])
@@ -0,0 +1,105 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from university_erp.responsecache import bump_generations
+from .models import BudgetTransaction, DepartmentBudget
+
+ZERO = Decimal('0.00')
+
+
+class LedgerError(Exception):
+    """A transaction the budget cannot accept"""
+
+
+def _signed(transaction_type, amount):
+    return -amount if transaction_type == 'refund' else amount
+
+
+@transaction.atomic
+def post_transaction(budget_id, transaction_type, amount, user=None, description='', reference='',
+                     allow_overspend=False):
+    """
+    Append one ledger entry and move the budget's spent_amount by it.
+
+    The budget row is locked with SELECT ... FOR UPDATE, so concurrent postings
+    serialize and each entry's balance_after is exact. Spending needs an
+    approved budget and, unless allow_overspend, must stay within the
+    approved amount; refunds cannot take spending below zero.
+    """
+    budget = DepartmentBudget.objects.select_for_update().get(pk=budget_id)
+    delta = _signed(transaction_type, amount)
+    balance = budget.spent_amount + delta
+    if transaction_type == 'spend':
+        if budget.status != 'approved':
+            raise LedgerError('Only approved budgets can be spent against.')
+        remaining = (budget.approved_amount or ZERO) - budget.spent_amount
+        if not allow_overspend and amount > remaining:
+            raise LedgerError(f'Spend exceeds the remaining approved amount of {remaining}.')
+    if balance < 0:
+        raise LedgerError(f'Spending cannot fall below zero; {budget.spent_amount} has been spent.')
+
+    entry = BudgetTransaction.objects.create(
+        budget=budget, dean_id=budget.dean_id, fiscal_year=budget.fiscal_year, budget_type=budget.budget_type,
+        transaction_type=transaction_type, amount=delta, balance_after=balance,
+        description=description, reference=reference, created_by=user,
+    )
+    budget.spent_amount = balance
+    budget.save(update_fields=['spent_amount', 'updated_at'])
+    return entry
+
+
+def sync_period_fields(budget):
+    """
+    Copy the budget's dean, fiscal year and type onto its ledger entries,
+    which keep their own copies so period queries need no join
+    """
+    updated = (BudgetTransaction.objects.filter(budget=budget)
+               .exclude(dean_id=budget.dean_id, fiscal_year=budget.fiscal_year, budget_type=budget.budget_type)
+               .update(dean_id=budget.dean_id, fiscal_year=budget.fiscal_year, budget_type=budget.budget_type))
+    if updated:
+        bump_generations(BudgetTransaction)
+    return updated
+
+
+def _total(**condition):
+    return Coalesce(Sum('amount', filter=Q(**condition) if condition else None), Value(ZERO),
+                    output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def period_summary(transactions):
+    """
+    Spend, refund, adjustment and net totals of the given ledger entries per
+    (dean, fiscal_year, budget_type), one grouped query on the period index
+    """
+    return (transactions.order_by()
+            .values('dean_id', 'fiscal_year', 'budget_type')
+            .annotate(spent=_total(transaction_type='spend'), refunded=-_total(transaction_type='refund'),
+                      adjusted=_total(transaction_type='adjustment'), net=_total(), transactions=Count('pk'))
+            .order_by('dean_id', 'fiscal_year', 'budget_type'))
+
+
+def unreconciled_budgets(budgets):
+    """Budgets whose cached spent_amount differs from the sum of their ledger, with both figures"""
+    return (budgets.annotate(ledger_total=Coalesce(Sum('transactions__amount'), Value(ZERO),
+                                                   output_field=DecimalField(max_digits=14, decimal_places=2)))
+            .exclude(spent_amount=F('ledger_total'))
+            .values('pk', 'title', 'dean_id', 'fiscal_year', 'budget_type', 'spent_amount', 'ledger_total'))
+
+
+@transaction.atomic
+def reconcile(budgets, user=None):
+    """Post an adjustment bringing each unreconciled budget's ledger in line with its spent_amount"""
+    # Lock first: PostgreSQL refuses FOR UPDATE on the grouped reconciliation query itself
+    budget_ids = list(budgets.select_for_update().order_by('pk').values_list('pk', flat=True))
+    return BudgetTransaction.objects.bulk_create([
+        BudgetTransaction(
+            budget_id=row['pk'], dean_id=row['dean_id'], fiscal_year=row['fiscal_year'],
+            budget_type=row['budget_type'], transaction_type='adjustment',
+            amount=row['spent_amount'] - row['ledger_total'], balance_after=row['spent_amount'],
+            description='Reconciliation adjustment', created_by=user,
+        )
+        for row in unreconciled_budgets(DepartmentBudget.objects.filter(pk__in=budget_ids))
+    ])
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from deanship.models import Dean, DeanshipReport
+from deanship.reports import parse_period, reports_for_period
+from deanship.tasks import queue_report_statistics, run_report_statistics
+
+
+class Command(BaseCommand):
+    help = ('Create or refresh one report per active dean for a period and generate its statistics '
+            '(run per tenant via tenant_command)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', required=True, help="e.g. 2024, 2024-Q2, 2024-05, 'fall 2024'")
+        parser.add_argument('--type', dest='report_type', default='quarterly',
+                            choices=[choice for choice, _ in DeanshipReport.REPORT_TYPES])
+        parser.add_argument('--dean', help='Only this dean')
+        parser.add_argument('--sync', action='store_true',
+                            help='Generate in this process instead of queueing Celery tasks')
+
+    def handle(self, *args, **options):
+        try:
+            parse_period(options['period'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        deans = Dean.objects.filter(status='active')
+        if options['dean']:
+            deans = deans.filter(pk=options['dean'])
+
+        with transaction.atomic():
+            reports = reports_for_period(options['report_type'], options['period'], deans)
+            if not options['sync']:
+                queue_report_statistics([report.pk for report in reports])
+                self.stdout.write(self.style.SUCCESS(f'Queued statistics for {len(reports)} reports'))
+                return
+
+        failed = 0
+        for report in reports:
+            run_report_statistics(report)
+            if report.statistics_status == 'failed':
+                failed += 1
+                self.stderr.write(f'{report.title}: {report.statistics_error}')
+        self.stdout.write(self.style.SUCCESS(f'Generated statistics for {len(reports) - failed} of {len(reports)} reports'))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from deanship.ledger import period_summary, reconcile, unreconciled_budgets
+from deanship.models import BudgetTransaction, DepartmentBudget
+
+
+class Command(BaseCommand):
+    help = ('Close a fiscal period: report ledger totals per dean and budget type and check every budget\'s '
+            'spent_amount against its ledger (run per tenant via tenant_command)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fiscal-year', required=True)
+        parser.add_argument('--dean', help='Only this dean\'s budgets')
+        parser.add_argument('--fix', action='store_true',
+                            help='Post reconciliation adjustments for budgets whose ledger disagrees')
+
+    def handle(self, *args, **options):
+        budgets = DepartmentBudget.objects.filter(fiscal_year=options['fiscal_year'])
+        transactions = BudgetTransaction.objects.filter(fiscal_year=options['fiscal_year'])
+        if options['dean']:
+            budgets = budgets.filter(dean_id=options['dean'])
+            transactions = transactions.filter(dean_id=options['dean'])
+
+        for row in period_summary(transactions):
+            self.stdout.write(f"{row['dean_id']} {row['budget_type']}: spent {row['spent']}, refunded {row['refunded']}, "
+                              f"adjusted {row['adjusted']}, net {row['net']} over {row['transactions']} transactions")
+
+        mismatched = list(unreconciled_budgets(budgets))
+        for row in mismatched:
+            self.stderr.write(f"{row['title']} ({row['pk']}): spent_amount {row['spent_amount']}, "
+                              f"ledger {row['ledger_total']}")
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS(f"All {budgets.count()} budgets reconcile with the ledger"))
+        elif options['fix']:
+            entries = reconcile(budgets)
+            self.stdout.write(self.style.SUCCESS(f'Posted {len(entries)} reconciliation adjustments'))
+        else:
+            raise CommandError(f'{len(mismatched)} budgets do not reconcile; rerun with --fix to post adjustments.')
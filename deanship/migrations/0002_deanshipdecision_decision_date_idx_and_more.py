@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deanship', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deanshipdecision',
+            index=models.Index(fields=['-decision_date'], name='decision_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deanshipdecision',
+            index=models.Index(fields=['dean', '-decision_date'], name='decision_dean_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deanshipdecision',
+            index=models.Index(fields=['status', '-decision_date'], name='decision_status_date_idx'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:03
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+def open_ledgers(apps, schema_editor):
+    """Post each budget's existing spent_amount as an opening adjustment so ledger sums match it"""
+    DepartmentBudget = apps.get_model('deanship', 'DepartmentBudget')
+    BudgetTransaction = apps.get_model('deanship', 'BudgetTransaction')
+    BudgetTransaction.objects.bulk_create([
+        BudgetTransaction(budget_id=budget_id, dean_id=dean_id, fiscal_year=fiscal_year, budget_type=budget_type,
+                          transaction_type='adjustment', amount=spent, balance_after=spent,
+                          description='Opening balance', posted_on=updated_at)
+        for budget_id, dean_id, fiscal_year, budget_type, spent, updated_at in DepartmentBudget.objects.exclude(
+            spent_amount=0).values_list('id', 'dean_id', 'fiscal_year', 'budget_type', 'spent_amount', 'updated_at')
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deanship', '0002_deanshipdecision_decision_date_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BudgetTransaction',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('fiscal_year', models.CharField(max_length=10)),
+                ('budget_type', models.CharField(choices=[('operational', 'Operational Budget'), ('capital', 'Capital Expenditure'), ('research', 'Research Budget'), ('infrastructure', 'Infrastructure Budget'), ('staff', 'Staff Budget'), ('student_activities', 'Student Activities Budget')], max_length=20)),
+                ('transaction_type', models.CharField(choices=[('spend', 'Spend'), ('refund', 'Refund'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('balance_after', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('description', models.CharField(blank=True, max_length=200)),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('posted_on', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Budget Transaction',
+                'verbose_name_plural': 'Budget Transactions',
+                'ordering': ['-posted_on'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='departmentbudget',
+            index=models.Index(fields=['dean', 'fiscal_year', 'budget_type'], name='budget_dean_year_type_idx'),
+        ),
+        migrations.AddField(
+            model_name='budgettransaction',
+            name='budget',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='transactions', to='deanship.departmentbudget'),
+        ),
+        migrations.AddField(
+            model_name='budgettransaction',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='budgettransaction',
+            name='dean',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='deanship.dean'),
+        ),
+        migrations.AddIndex(
+            model_name='budgettransaction',
+            index=models.Index(fields=['dean', 'fiscal_year', 'budget_type', 'posted_on'], name='budget_txn_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='budgettransaction',
+            index=models.Index(fields=['budget', '-posted_on'], name='budget_txn_budget_idx'),
+        ),
+        migrations.RunPython(open_ledgers, migrations.RunPython.noop),
+    ]
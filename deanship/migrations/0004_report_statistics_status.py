@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deanship', '0003_budget_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deanshipreport',
+            name='statistics_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='deanshipreport',
+            name='statistics_generated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='deanshipreport',
+            name='statistics_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], max_length=20),
+        ),
+    ]
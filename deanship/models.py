@@ -1,7 +1,12 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 import uuid
 
+from search.documents import search_document
+
 
 class Dean(models.Model):
     STATUS_CHOICES = [
@@ -62,6 +67,13 @@ class DeanshipDecision(models.Model):
     remarks = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = models.GeneratedField(
+        expression=search_document(
+            ('A', ['title']), ('B', ['description']), ('C', ['affected_parties']),
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     
     def __str__(self):
         return f"{self.dean.department.name} - {self.title}"
@@ -70,6 +82,12 @@ class DeanshipDecision(models.Model):
         verbose_name = 'Deanship Decision'
         verbose_name_plural = 'Deanship Decisions'
         ordering = ['-decision_date']
+        indexes = [
+            models.Index(fields=['-decision_date'], name='decision_date_idx'),
+            models.Index(fields=['dean', '-decision_date'], name='decision_dean_date_idx'),
+            models.Index(fields=['status', '-decision_date'], name='decision_status_date_idx'),
+            GinIndex(fields=['search_vector'], name='decision_search_idx'),
+        ]
 
 
 class DeanshipMeeting(models.Model):
@@ -105,6 +123,13 @@ class DeanshipMeeting(models.Model):
     documents = models.FileField(upload_to='deanship/meetings/', null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = models.GeneratedField(
+        expression=search_document(
+            ('A', ['title']), ('B', ['description', 'agenda']), ('C', ['minutes', 'action_items']),
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     
     def __str__(self):
         return f"{self.meeting_type} - {self.title} ({self.meeting_date.strftime('%Y-%m-%d')})"
@@ -113,6 +138,9 @@ class DeanshipMeeting(models.Model):
         verbose_name = 'Deanship Meeting'
         verbose_name_plural = 'Deanship Meetings'
         ordering = ['-meeting_date']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='meeting_search_idx'),
+        ]
 
 
 class DepartmentBudget(models.Model):
@@ -157,6 +185,49 @@ class DepartmentBudget(models.Model):
         verbose_name = 'Department Budget'
         verbose_name_plural = 'Department Budgets'
         ordering = ['-fiscal_year']
+        indexes = [
+            models.Index(fields=['dean', 'fiscal_year', 'budget_type'], name='budget_dean_year_type_idx'),
+        ]
+
+
+class BudgetTransaction(models.Model):
+    """
+    Append-only ledger entry against a DepartmentBudget. amount is the signed
+    change to the budget's spent_amount; balance_after is spent_amount once
+    this entry is applied.
+    """
+    TRANSACTION_TYPES = [
+        ('spend', 'Spend'),
+        ('refund', 'Refund'),
+        ('adjustment', 'Adjustment'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    budget = models.ForeignKey(DepartmentBudget, on_delete=models.RESTRICT, related_name='transactions')
+    # Copied from the budget so period queries need no join
+    dean = models.ForeignKey(Dean, on_delete=models.CASCADE)
+    fiscal_year = models.CharField(max_length=10)
+    budget_type = models.CharField(max_length=20, choices=DepartmentBudget.BUDGET_TYPES)
+    transaction_type = models.CharField(max_length=20, choices=TRANSACTION_TYPES)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    balance_after = models.DecimalField(max_digits=12, decimal_places=2)
+    description = models.CharField(max_length=200, blank=True)
+    reference = models.CharField(max_length=100, blank=True)
+    posted_on = models.DateTimeField(default=timezone.now)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.budget.title} {self.transaction_type} {self.amount} ({self.posted_on:%Y-%m-%d})"
+    
+    class Meta:
+        verbose_name = 'Budget Transaction'
+        verbose_name_plural = 'Budget Transactions'
+        ordering = ['-posted_on']
+        indexes = [
+            models.Index(fields=['dean', 'fiscal_year', 'budget_type', 'posted_on'], name='budget_txn_period_idx'),
+            models.Index(fields=['budget', '-posted_on'], name='budget_txn_budget_idx'),
+        ]
 
 
 class DeanshipReport(models.Model):
@@ -168,6 +239,13 @@ class DeanshipReport(models.Model):
         ('performance', 'Performance Report'),
     ]
     
+    STATISTICS_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     dean = models.ForeignKey(Dean, on_delete=models.CASCADE)
     report_type = models.CharField(max_length=20, choices=REPORT_TYPES)
@@ -175,6 +253,9 @@ class DeanshipReport(models.Model):
     report_period = models.CharField(max_length=50)
     content = models.TextField()
     statistics = models.JSONField(default=dict, blank=True)
+    statistics_status = models.CharField(max_length=20, choices=STATISTICS_STATUS_CHOICES, blank=True)
+    statistics_error = models.TextField(blank=True)
+    statistics_generated_at = models.DateTimeField(null=True, blank=True)
     achievements = models.TextField(blank=True)
     challenges = models.TextField(blank=True)
     recommendations = models.TextField(blank=True)
@@ -183,6 +264,14 @@ class DeanshipReport(models.Model):
     submission_date = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = models.GeneratedField(
+        expression=search_document(
+            ('A', ['title']), ('B', ['report_period', 'content']),
+            ('C', ['achievements', 'challenges', 'recommendations']),
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     
     def __str__(self):
         return f"{self.dean.department.name} - {self.title} ({self.report_period})"
@@ -190,4 +279,7 @@ class DeanshipReport(models.Model):
     class Meta:
         verbose_name = 'Deanship Report'
         verbose_name_plural = 'Deanship Reports'
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='report_search_idx'),
+        ]
\ No newline at end of file
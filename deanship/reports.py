@@ -0,0 +1,222 @@
+import calendar
+import datetime
+import re
+from decimal import Decimal
+
+from django.db.models import Avg, Count, DateField, DurationField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least, TruncMonth
+from django.utils import timezone
+
+from courses.models import CourseOffering, StudentEnrollment
+from courses.solver import TERM_DATES, term_dates
+from dashboard.models import DepartmentStatistics
+from dashboard.rollups import refresh_departments
+from faculty.models import Faculty, FacultyLeave
+from .models import BudgetTransaction, Dean, DeanshipDecision, DeanshipReport, DepartmentBudget
+
+ZERO = Decimal('0.00')
+TWO_PLACES = Decimal('0.01')
+
+
+def parse_period(text):
+    """
+    (start, end) dates of a report_period: '2024', '2024-Q2', '2024-05',
+    'fall 2024' or an explicit '2024-01-01..2024-06-30'
+    """
+    text = text.strip().lower()
+    if match := re.fullmatch(r'(\d{4})-(\d{2})-(\d{2})\s*\.\.\s*(\d{4})-(\d{2})-(\d{2})', text):
+        start, end = datetime.date(*map(int, match.groups()[:3])), datetime.date(*map(int, match.groups()[3:]))
+    elif match := re.fullmatch(r'(\d{4})-q([1-4])', text):
+        year, quarter = int(match[1]), int(match[2])
+        start = datetime.date(year, 3 * quarter - 2, 1)
+        end = datetime.date(year, 3 * quarter, calendar.monthrange(year, 3 * quarter)[1])
+    elif match := re.fullmatch(r'(\d{4})-(\d{2})', text):
+        year, month = int(match[1]), int(match[2])
+        start, end = datetime.date(year, month, 1), datetime.date(year, month, calendar.monthrange(year, month)[1])
+    elif match := re.fullmatch(r'(\d{4})', text):
+        start, end = datetime.date(int(match[1]), 1, 1), datetime.date(int(match[1]), 12, 31)
+    elif match := re.fullmatch(rf"({'|'.join(TERM_DATES)})\s+(\d{{4}})", text):
+        start, end = term_dates(match[1], int(match[2]))
+    else:
+        raise ValueError(f'Unrecognised report period {text!r}')
+    if start > end:
+        raise ValueError(f'Report period {text!r} ends before it starts')
+    return start, end
+
+
+def _terms(start, end):
+    """(semester, year) of every term starting within start..end"""
+    return [(semester, year) for year in range(start.year, end.year + 1) for semester in TERM_DATES
+            if start <= term_dates(semester, year)[0] <= end]
+
+
+def _midnight(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def _plain(value):
+    """value with Decimals as floats and dates as ISO strings, ready for a JSONField"""
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def _rate(part, whole):
+    if not whole:
+        return ZERO
+    return (Decimal(part) * 100 / whole).quantize(TWO_PLACES)
+
+
+def _students(department_id):
+    statistics = DepartmentStatistics.objects.filter(department_id=department_id).first()
+    if statistics is None:
+        refresh_departments([department_id])
+        statistics = DepartmentStatistics.objects.get(department_id=department_id)
+    return {
+        'total': statistics.total_students,
+        'active': statistics.active_students,
+        'by_status': statistics.students_by_status,
+        'by_level': statistics.students_by_level,
+        'average_gpa': statistics.average_gpa,
+        'gpa_distribution': statistics.gpa_histogram,
+    }
+
+
+def _courses(department_id, start, end):
+    """Pass/fail outcomes per course for the department's offerings in the period's terms, one grouped query"""
+    terms = _terms(start, end)
+    if not terms:
+        return {'terms': [], 'offerings': 0, 'completed': 0, 'failed': 0, 'pass_rate': ZERO, 'by_course': []}
+    offerings = CourseOffering.objects.filter(
+        Q(*[Q(semester=semester, year=year) for semester, year in terms], _connector=Q.OR),
+        course__department_id=department_id)
+    rows = (StudentEnrollment.objects.filter(course_offering__in=offerings)
+            .order_by().values(course_code=F('course_offering__course__course_code'))
+            .annotate(enrolled=Count('pk'), completed=Count('pk', filter=Q(status='completed')),
+                      failed=Count('pk', filter=Q(status='failed')),
+                      withdrawn=Count('pk', filter=Q(status__in=['dropped', 'withdrawn'])))
+            .order_by('course_code'))
+    by_course = [{**row, 'pass_rate': _rate(row['completed'], row['completed'] + row['failed'])} for row in rows]
+    completed = sum(row['completed'] for row in by_course)
+    failed = sum(row['failed'] for row in by_course)
+    return {
+        'terms': [f'{semester} {year}' for semester, year in terms],
+        'offerings': offerings.count(),
+        'completed': completed,
+        'failed': failed,
+        'pass_rate': _rate(completed, completed + failed),
+        'by_course': by_course,
+    }
+
+
+def _leave(department_id, start, end):
+    """Leave days taken within the period by the department's faculty, by type and status"""
+    days = ExpressionWrapper(
+        Least(F('end_date'), Value(end, output_field=DateField()))
+        - Greatest(F('start_date'), Value(start, output_field=DateField())),
+        output_field=DurationField(),
+    )
+    rows = (FacultyLeave.objects.filter(faculty__department_id=department_id, start_date__lte=end, end_date__gte=start)
+            .order_by().values('leave_type', 'status')
+            .annotate(requests=Count('pk'), days=Sum(days)))
+    faculty_count = Faculty.objects.filter(department_id=department_id).count()
+    by_type, approved_days, requests = {}, 0, {}
+    for row in rows:
+        # Date ranges are inclusive, so each leave adds one day to end - start
+        row_days = row['days'].days + row['requests'] if row['days'] is not None else 0
+        requests[row['status']] = requests.get(row['status'], 0) + row['requests']
+        if row['status'] == 'approved':
+            by_type[row['leave_type']] = by_type.get(row['leave_type'], 0) + row_days
+            approved_days += row_days
+    available_days = faculty_count * ((end - start).days + 1)
+    return {
+        'faculty': faculty_count,
+        'requests_by_status': requests,
+        'approved_days_by_type': by_type,
+        'approved_days': approved_days,
+        'utilisation': _rate(approved_days, available_days),
+    }
+
+
+def _budget(dean_id, start, end):
+    """Approved amounts and the monthly ledger burn-down of the dean's budgets over the period"""
+    fiscal_years = Q()
+    for year in range(start.year, end.year + 1):
+        fiscal_years |= Q(fiscal_year=str(year)) | Q(fiscal_year__startswith=f'{year}-')
+    budgets = DepartmentBudget.objects.filter(fiscal_years, dean_id=dean_id, status='approved')
+    approved = budgets.aggregate(total=Coalesce(Sum('approved_amount'), Value(ZERO)))['total']
+    ledger = BudgetTransaction.objects.filter(budget__in=budgets)
+    opening = ledger.filter(posted_on__date__lt=start).aggregate(total=Coalesce(Sum('amount'), Value(ZERO)))['total']
+    spent, burn_down = opening, []
+    for row in (ledger.filter(posted_on__date__gte=start, posted_on__date__lte=end).order_by()
+                .values(month=TruncMonth('posted_on')).annotate(net=Sum('amount')).order_by('month')):
+        spent += row['net']
+        burn_down.append({'month': row['month'].strftime('%Y-%m'), 'spent': row['net'], 'cumulative_spent': spent,
+                          'remaining': approved - spent})
+    return {
+        'approved': approved,
+        'spent_before_period': opening,
+        'spent': spent,
+        'remaining': approved - spent,
+        'burn_rate': _rate(spent, approved),
+        'burn_down': burn_down,
+    }
+
+
+def _decisions(dean_id, start, end):
+    """Decisions made in the period by status and type, with the mean days to implementation"""
+    lead_time = ExpressionWrapper(F('implementation_date') - F('decision_date'), output_field=DurationField())
+    rows = (DeanshipDecision.objects.filter(dean_id=dean_id, decision_date__gte=_midnight(start),
+                                            decision_date__lt=_midnight(end + datetime.timedelta(days=1)))
+            .order_by().values('status', 'decision_type')
+            .annotate(count=Count('pk'), lead_time=Avg(lead_time, filter=Q(implementation_date__isnull=False)),
+                      implemented=Count('pk', filter=Q(implementation_date__isnull=False))))
+    by_status, by_type, implemented, lead_total = {}, {}, 0, datetime.timedelta()
+    for row in rows:
+        by_status[row['status']] = by_status.get(row['status'], 0) + row['count']
+        by_type[row['decision_type']] = by_type.get(row['decision_type'], 0) + row['count']
+        if row['lead_time'] is not None:
+            implemented += row['implemented']
+            lead_total += row['lead_time'] * row['implemented']
+    total = sum(by_status.values())
+    return {
+        'total': total,
+        'by_status': by_status,
+        'by_type': by_type,
+        'implemented': implemented,
+        'implementation_rate': _rate(implemented, total),
+        'mean_days_to_implement': round(lead_total.total_seconds() / 86400 / implemented, 1) if implemented else None,
+    }
+
+
+def compute_statistics(dean, report_period):
+    """Snapshot of a dean's department over report_period, built from grouped queries"""
+    start, end = parse_period(report_period)
+    return _plain({
+        'period': {'label': report_period, 'start': start, 'end': end},
+        'students': _students(dean.department_id),
+        'courses': _courses(dean.department_id, start, end),
+        'faculty_leave': _leave(dean.department_id, start, end),
+        'budget': _budget(dean.pk, start, end),
+        'decisions': _decisions(dean.pk, start, end),
+        'generated_at': timezone.now(),
+    })
+
+
+def reports_for_period(report_type, report_period, deans=None):
+    """One report per active dean for the period, reusing any that already exist"""
+    deans = list((deans if deans is not None else Dean.objects.filter(status='active')).select_related('department'))
+    existing = {report.dean_id: report for report in DeanshipReport.objects.filter(
+        dean__in=deans, report_type=report_type, report_period=report_period).order_by('created_at')}
+    created = DeanshipReport.objects.bulk_create([
+        DeanshipReport(dean=dean, report_type=report_type, report_period=report_period,
+                       title=f'{dean.department.name} {report_period} {report_type} report', content='')
+        for dean in deans if dean.pk not in existing
+    ])
+    return list(existing.values()) + created
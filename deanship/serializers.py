@@ -1,6 +1,9 @@
 from rest_framework import serializers
+from django.db import transaction
 from django.contrib.auth.models import User
-from .models import Dean, DeanshipDecision, DeanshipMeeting, DepartmentBudget, DeanshipReport
+from .ledger import LedgerError, post_transaction, sync_period_fields
+from .reports import parse_period
+from .models import Dean, DeanshipDecision, DeanshipMeeting, DepartmentBudget, BudgetTransaction, DeanshipReport
 
 
 class DeanSerializer(serializers.ModelSerializer):
@@ -51,7 +54,18 @@ class DepartmentBudgetSerializer(serializers.ModelSerializer):
                  'title', 'description', 'requested_amount', 'approved_amount', 'spent_amount',
                  'remaining_amount', 'status', 'justification', 'supporting_documents',
                  'approved_by', 'approved_by_name', 'approved_date', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        # spent_amount is the ledger's running balance; it only moves through budget transactions
+        read_only_fields = ['id', 'spent_amount', 'created_at', 'updated_at']
+    
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        # Write only the submitted columns, so a ledger posting committed meanwhile keeps its spent_amount
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        if {'dean', 'fiscal_year', 'budget_type'} & set(validated_data):
+            sync_period_fields(instance)
+        return instance
     
     def get_remaining_amount(self, obj):
         if obj.approved_amount:
@@ -59,6 +73,49 @@ class DepartmentBudgetSerializer(serializers.ModelSerializer):
         return 0
 
 
+class BudgetTransactionSerializer(serializers.ModelSerializer):
+    budget_title = serializers.CharField(source='budget.title', read_only=True)
+    created_by_name = serializers.CharField(source='created_by.first_name', read_only=True)
+    allow_overspend = serializers.BooleanField(default=False, write_only=True)
+    
+    class Meta:
+        model = BudgetTransaction
+        fields = ['id', 'budget', 'budget_title', 'dean', 'fiscal_year', 'budget_type', 'transaction_type',
+                 'amount', 'balance_after', 'description', 'reference', 'allow_overspend', 'posted_on',
+                 'created_by', 'created_by_name', 'created_at']
+        read_only_fields = ['id', 'dean', 'fiscal_year', 'budget_type', 'balance_after', 'posted_on',
+                           'created_by', 'created_at']
+    
+    def validate(self, attrs):
+        if attrs['transaction_type'] == 'adjustment':
+            if attrs['amount'] == 0:
+                raise serializers.ValidationError({'amount': 'Adjustments cannot be zero.'})
+        elif attrs['amount'] <= 0:
+            raise serializers.ValidationError({'amount': 'Spend and refund amounts must be positive.'})
+        return attrs
+    
+    def create(self, validated_data):
+        try:
+            return post_transaction(
+                validated_data['budget'].pk, validated_data['transaction_type'], validated_data['amount'],
+                user=validated_data.get('created_by'), description=validated_data.get('description', ''),
+                reference=validated_data.get('reference', ''), allow_overspend=validated_data['allow_overspend'],
+            )
+        except LedgerError as error:
+            raise serializers.ValidationError({'amount': str(error)})
+
+
+class BudgetPeriodSerializer(serializers.Serializer):
+    dean = serializers.UUIDField(source='dean_id')
+    fiscal_year = serializers.CharField()
+    budget_type = serializers.CharField()
+    spent = serializers.DecimalField(max_digits=14, decimal_places=2)
+    refunded = serializers.DecimalField(max_digits=14, decimal_places=2)
+    adjusted = serializers.DecimalField(max_digits=14, decimal_places=2)
+    net = serializers.DecimalField(max_digits=14, decimal_places=2)
+    transactions = serializers.IntegerField()
+
+
 class DeanshipReportSerializer(serializers.ModelSerializer):
     dean_name = serializers.CharField(source='dean.faculty.first_name', read_only=True)
     department_name = serializers.CharField(source='dean.department.name', read_only=True)
@@ -67,6 +124,20 @@ class DeanshipReportSerializer(serializers.ModelSerializer):
         model = DeanshipReport
         fields = ['id', 'dean', 'dean_name', 'department_name', 'report_type', 'title',
                  'report_period', 'content', 'statistics', 'achievements', 'challenges',
+                 'statistics_status', 'statistics_error', 'statistics_generated_at',
                  'recommendations', 'attachments', 'submitted_to', 'submission_date',
                  'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['id', 'statistics_status', 'statistics_error', 'statistics_generated_at',
+                            'created_at', 'updated_at']
+
+
+class ReportGenerationSerializer(serializers.Serializer):
+    report_type = serializers.ChoiceField(choices=DeanshipReport.REPORT_TYPES)
+    report_period = serializers.CharField(max_length=50)
+    
+    def validate_report_period(self, value):
+        try:
+            parse_period(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+        return value
\ No newline at end of file
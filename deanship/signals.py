@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from faculty.models import Faculty, FacultyLeave
+from university_erp.responsecache import track_generations
+from .dashboard import invalidate_dashboards
+from .models import BudgetTransaction, Dean, DeanshipDecision, DeanshipMeeting, DeanshipReport, DepartmentBudget
+
+DASHBOARD_MODELS = [DeanshipDecision, DeanshipMeeting, DepartmentBudget]
+
+track_generations(Dean, DeanshipDecision, DeanshipMeeting, DeanshipMeeting.attendees.through, DepartmentBudget,
+                  BudgetTransaction, DeanshipReport)
+
+
+def invalidate_dean_dashboard(sender, instance, **kwargs):
+    # After commit, so a concurrent read cannot cache the pre-write state again
+    transaction.on_commit(lambda: invalidate_dashboards([instance.dean_id]))
+
+
+def invalidate_department_dashboards(sender, instance, **kwargs):
+    def invalidate():
+        departments = Faculty.objects.filter(pk=instance.faculty_id).values('department_id')
+        invalidate_dashboards(Dean.objects.filter(department_id__in=departments).values_list('pk', flat=True))
+    transaction.on_commit(invalidate)
+
+
+def invalidate_own_dashboard(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_dashboards([instance.pk]))
+
+
+for model in DASHBOARD_MODELS:
+    post_save.connect(invalidate_dean_dashboard, sender=model, dispatch_uid=f'dean_dashboard_save_{model.__name__}')
+    post_delete.connect(invalidate_dean_dashboard, sender=model, dispatch_uid=f'dean_dashboard_delete_{model.__name__}')
+
+# Pending leave requests are shown to the deans of the faculty member's department
+post_save.connect(invalidate_department_dashboards, sender=FacultyLeave, dispatch_uid='dean_dashboard_save_FacultyLeave')
+post_delete.connect(invalidate_department_dashboards, sender=FacultyLeave, dispatch_uid='dean_dashboard_delete_FacultyLeave')
+post_save.connect(invalidate_own_dashboard, sender=Dean, dispatch_uid='dean_dashboard_save_Dean')
@@ -0,0 +1,51 @@
+from celery import group, shared_task
+from django.db import connection, transaction
+from django.utils import timezone
+from django_tenants.utils import schema_context
+
+from .models import DeanshipReport
+from .reports import compute_statistics
+
+
+def run_report_statistics(report):
+    """Compute the report's statistics snapshot and store it on the report"""
+    report.statistics_status = 'running'
+    report.save(update_fields=['statistics_status', 'updated_at'])
+    try:
+        statistics = compute_statistics(report.dean, report.report_period)
+    except Exception as error:
+        report.statistics_status = 'failed'
+        report.statistics_error = str(error)
+    else:
+        report.statistics_status = 'completed'
+        report.statistics_error = ''
+        report.statistics = statistics
+        report.statistics_generated_at = timezone.now()
+    report.save(update_fields=['statistics', 'statistics_status', 'statistics_error', 'statistics_generated_at',
+                               'updated_at'])
+    return report
+
+
+@shared_task
+def generate_report_statistics(schema_name, report_id):
+    with schema_context(schema_name):
+        report = DeanshipReport.objects.select_related('dean').get(pk=report_id)
+        run_report_statistics(report)
+        return report.statistics_status
+
+
+def queue_report_statistics(report_ids):
+    """
+    Mark the reports pending and, once the transaction commits, generate
+    them as one Celery group so workers build them in parallel
+    """
+    report_ids = [str(pk) for pk in report_ids]
+    if not report_ids:
+        return 0
+    DeanshipReport.objects.filter(pk__in=report_ids).update(statistics_status='pending', statistics_error='',
+                                                            updated_at=timezone.now())
+    schema_name = connection.schema_name
+    jobs = group(generate_report_statistics.s(schema_name, pk) for pk in report_ids)
+    transaction.on_commit(jobs.delay)
+    return len(report_ids)
+
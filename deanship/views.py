@@ -1,17 +1,36 @@
-from rest_framework import viewsets, permissions, status
+from rest_framework import mixins, viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Sum
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import RestrictedError
 from django.utils import timezone
-from .models import Dean, DeanshipDecision, DeanshipMeeting, DepartmentBudget, DeanshipReport
+from faculty.models import Faculty
+from students.models import Department
+from university_erp.mixins import (ConditionalRequestMixin, KeysetPaginationMixin, QueryPlan, QueryPlanMixin,
+                                   StreamingExportMixin)
+from .dashboard import get_dashboard
+from .ledger import period_summary
+from .models import Dean, DeanshipDecision, DeanshipMeeting, DepartmentBudget, BudgetTransaction, DeanshipReport
 from .serializers import (DeanSerializer, DeanshipDecisionSerializer, DeanshipMeetingSerializer,
-                         DepartmentBudgetSerializer, DeanshipReportSerializer)
+                         DepartmentBudgetSerializer, BudgetTransactionSerializer, BudgetPeriodSerializer,
+                         DeanshipReportSerializer, ReportGenerationSerializer)
+from .reports import reports_for_period
+from .tasks import queue_report_statistics
 
 
-class DeanViewSet(viewsets.ModelViewSet):
+class DeanViewSet(ConditionalRequestMixin, StreamingExportMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Dean.objects.all()
     serializer_class = DeanSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['faculty', 'department'])
+    cache_models = [Dean, Faculty, Department]
+    action_query_plans = {
+        'decisions': QueryPlan(select_related=['dean__faculty', 'dean__department']),
+        'meetings': QueryPlan(select_related=['dean__faculty', 'dean__department'], prefetch_related=['attendees']),
+        'budgets': QueryPlan(select_related=['dean__faculty', 'dean__department', 'approved_by']),
+        'dashboard': QueryPlan(),
+    }
     
     def get_queryset(self):
         queryset = Dean.objects.all()
@@ -29,7 +48,7 @@ class DeanViewSet(viewsets.ModelViewSet):
     def decisions(self, request, pk=None):
         """Get dean's decisions"""
         dean = self.get_object()
-        decisions = DeanshipDecision.objects.filter(dean=dean).order_by('-decision_date')
+        decisions = self.plan_queryset(DeanshipDecision.objects.filter(dean=dean)).order_by('-decision_date')
         serializer = DeanshipDecisionSerializer(decisions, many=True)
         return Response(serializer.data)
     
@@ -37,7 +56,7 @@ class DeanViewSet(viewsets.ModelViewSet):
     def meetings(self, request, pk=None):
         """Get dean's meetings"""
         dean = self.get_object()
-        meetings = DeanshipMeeting.objects.filter(dean=dean).order_by('-meeting_date')
+        meetings = self.plan_queryset(DeanshipMeeting.objects.filter(dean=dean)).order_by('-meeting_date')
         serializer = DeanshipMeetingSerializer(meetings, many=True)
         return Response(serializer.data)
     
@@ -45,28 +64,25 @@ class DeanViewSet(viewsets.ModelViewSet):
     def budgets(self, request, pk=None):
         """Get department budgets"""
         dean = self.get_object()
-        budgets = DepartmentBudget.objects.filter(dean=dean).order_by('-fiscal_year')
+        budgets = self.plan_queryset(DepartmentBudget.objects.filter(dean=dean)).order_by('-fiscal_year')
         serializer = DepartmentBudgetSerializer(budgets, many=True)
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
     def dashboard(self, request, pk=None):
-        """Get dean dashboard statistics"""
+        """Get dean dashboard statistics, cached per dean until the next relevant write"""
         dean = self.get_object()
-        stats = {
-            'total_decisions': DeanshipDecision.objects.filter(dean=dean).count(),
-            'pending_decisions': DeanshipDecision.objects.filter(dean=dean, status='pending').count(),
-            'upcoming_meetings': DeanshipMeeting.objects.filter(dean=dean, meeting_date__gte=timezone.now()).count(),
-            'total_budget': DepartmentBudget.objects.filter(dean=dean, status='approved').aggregate(total=Sum('approved_amount'))['total'] or 0,
-            'spent_budget': DepartmentBudget.objects.filter(dean=dean, status='approved').aggregate(spent=Sum('spent_amount'))['spent'] or 0,
-        }
-        return Response(stats)
+        return Response(get_dashboard(dean))
 
 
-class DeanshipDecisionViewSet(viewsets.ModelViewSet):
+class DeanshipDecisionViewSet(ConditionalRequestMixin, StreamingExportMixin, KeysetPaginationMixin, QueryPlanMixin,
+                              viewsets.ModelViewSet):
     queryset = DeanshipDecision.objects.all()
     serializer_class = DeanshipDecisionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['dean__faculty', 'dean__department'])
+    cache_models = [DeanshipDecision, Dean, Faculty, Department]
+    cursor_ordering = ('-decision_date',)
     
     def get_queryset(self):
         queryset = DeanshipDecision.objects.all()
@@ -101,10 +117,12 @@ class DeanshipDecisionViewSet(viewsets.ModelViewSet):
         return Response({'status': 'success', 'message': 'Decision marked as implemented'})
 
 
-class DeanshipMeetingViewSet(viewsets.ModelViewSet):
+class DeanshipMeetingViewSet(ConditionalRequestMixin, StreamingExportMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = DeanshipMeeting.objects.all()
     serializer_class = DeanshipMeetingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['dean__faculty', 'dean__department'], prefetch_related=['attendees'])
+    cache_models = [DeanshipMeeting, DeanshipMeeting.attendees.through, Dean, Faculty, Department]
     
     def get_queryset(self):
         queryset = DeanshipMeeting.objects.all()
@@ -140,10 +158,12 @@ class DeanshipMeetingViewSet(viewsets.ModelViewSet):
         return Response({'status': 'success', 'message': 'Meeting completed'})
 
 
-class DepartmentBudgetViewSet(viewsets.ModelViewSet):
+class DepartmentBudgetViewSet(ConditionalRequestMixin, StreamingExportMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = DepartmentBudget.objects.all()
     serializer_class = DepartmentBudgetSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['dean__faculty', 'dean__department', 'approved_by'])
+    cache_models = [DepartmentBudget, Dean, Faculty, Department, User]
     
     def get_queryset(self):
         queryset = DepartmentBudget.objects.all()
@@ -163,6 +183,13 @@ class DepartmentBudgetViewSet(viewsets.ModelViewSet):
             
         return queryset.order_by('-fiscal_year')
     
+    def destroy(self, request, *args, **kwargs):
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except RestrictedError:
+            return Response({'error': 'Budgets with ledger transactions cannot be deleted; reject them instead'},
+                            status=status.HTTP_409_CONFLICT)
+    
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
         """Approve a budget"""
@@ -173,15 +200,66 @@ class DepartmentBudgetViewSet(viewsets.ModelViewSet):
             budget.status = 'approved'
             budget.approved_by = request.user
             budget.approved_date = timezone.now()
-            budget.save()
+            # spent_amount belongs to the ledger; a full save could undo a posting committed since get_object()
+            budget.save(update_fields=['approved_amount', 'status', 'approved_by', 'approved_date', 'updated_at'])
             return Response({'status': 'success', 'message': 'Budget approved'})
         return Response({'error': 'Approved amount required'}, status=400)
 
 
-class DeanshipReportViewSet(viewsets.ModelViewSet):
+class BudgetTransactionViewSet(ConditionalRequestMixin, mixins.CreateModelMixin, KeysetPaginationMixin, QueryPlanMixin,
+                               viewsets.ReadOnlyModelViewSet):
+    queryset = BudgetTransaction.objects.all()
+    serializer_class = BudgetTransactionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['budget', 'created_by'])
+    cache_models = [BudgetTransaction, DepartmentBudget, User]
+    cursor_ordering = ('-posted_on',)
+    # The ledger is append-only, so creation time versions each entry
+    etag_field = 'created_at'
+    action_query_plans = {
+        'summary': QueryPlan(),
+    }
+    
+    def get_queryset(self):
+        queryset = BudgetTransaction.objects.all()
+        budget = self.request.query_params.get('budget')
+        dean = self.request.query_params.get('dean')
+        fiscal_year = self.request.query_params.get('fiscal_year')
+        budget_type = self.request.query_params.get('budget_type')
+        posted_after = self.request.query_params.get('posted_after')
+        posted_before = self.request.query_params.get('posted_before')
+        
+        if budget:
+            queryset = queryset.filter(budget_id=budget)
+        if dean:
+            queryset = queryset.filter(dean_id=dean)
+        if fiscal_year:
+            queryset = queryset.filter(fiscal_year=fiscal_year)
+        if budget_type:
+            queryset = queryset.filter(budget_type=budget_type)
+        if posted_after:
+            queryset = queryset.filter(posted_on__gte=posted_after)
+        if posted_before:
+            queryset = queryset.filter(posted_on__lt=posted_before)
+            
+        return queryset.order_by('-posted_on')
+    
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+    
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Get ledger totals per dean, fiscal year and budget type for the filtered period"""
+        serializer = BudgetPeriodSerializer(period_summary(self.get_queryset()), many=True)
+        return Response(serializer.data)
+
+
+class DeanshipReportViewSet(ConditionalRequestMixin, StreamingExportMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = DeanshipReport.objects.all()
     serializer_class = DeanshipReportSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['dean__faculty', 'dean__department'])
+    cache_models = [DeanshipReport, Dean, Faculty, Department]
     
     def get_queryset(self):
         queryset = DeanshipReport.objects.all()
@@ -202,4 +280,22 @@ class DeanshipReportViewSet(viewsets.ModelViewSet):
         report.submitted_to = request.data.get('submitted_to', '')
         report.submission_date = timezone.now()
         report.save()
-        return Response({'status': 'success', 'message': 'Report submitted'})
\ No newline at end of file
+        return Response({'status': 'success', 'message': 'Report submitted'})
+    
+    @action(detail=True, methods=['post'], url_path='generate-statistics')
+    def generate_statistics(self, request, pk=None):
+        """Queue a background recomputation of the report's statistics for its period"""
+        report = self.get_object()
+        queue_report_statistics([report.pk])
+        return Response({'status': 'pending', 'report': report.pk}, status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=False, methods=['post'], url_path='generate')
+    @transaction.atomic
+    def generate(self, request):
+        """Create or reuse a report per active dean for the period and generate their statistics in parallel"""
+        serializer = ReportGenerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        reports = reports_for_period(serializer.validated_data['report_type'], serializer.validated_data['report_period'])
+        queue_report_statistics([report.pk for report in reports])
+        return Response({'status': 'pending', 'reports': [report.pk for report in reports]},
+                        status=status.HTTP_202_ACCEPTED)
\ No newline at end of file
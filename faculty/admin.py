@@ -1,9 +1,10 @@
 from django.contrib import admin
+from search.admin import FullTextSearchAdminMixin
 from .models import Faculty, FacultyQualification, FacultyLeave
 
 
 @admin.register(Faculty)
-class FacultyAdmin(admin.ModelAdmin):
+class FacultyAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ('faculty_id', 'first_name', 'last_name', 'department', 'position', 'status')
     list_filter = ('department', 'position', 'status', 'gender')
     search_fields = ('faculty_id', 'first_name', 'last_name', 'email')
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class FacultyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'faculty'
-    verbose_name = 'Faculty Management'
\ No newline at end of file
+    verbose_name = 'Faculty Management'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faculty', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='facultyleave',
+            index=models.Index(fields=['-applied_on'], name='leave_applied_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facultyleave',
+            index=models.Index(fields=['faculty', '-applied_on'], name='leave_faculty_applied_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facultyleave',
+            index=models.Index(fields=['status', '-applied_on'], name='leave_status_applied_on_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:11
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faculty', '0002_facultyleave_leave_applied_on_idx_and_more'),
+        ('students', '0003_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='faculty',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('faculty_id', 'first_name', 'last_name', config='english', weight='A'), '||', django.contrib.postgres.search.SearchVector('middle_name', 'email', 'specialization', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('english')), '||', django.contrib.postgres.search.SearchVector('research_interests', config='english', weight='C'), django.contrib.postgres.search.SearchConfig('english')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='faculty',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='faculty_search_idx'),
+        ),
+    ]
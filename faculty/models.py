@@ -1,7 +1,11 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import User
 import uuid
 
+from search.documents import search_document
+
 
 class Faculty(models.Model):
     POSITION_CHOICES = [
@@ -52,6 +56,14 @@ class Faculty(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = models.GeneratedField(
+        expression=search_document(
+            ('A', ['faculty_id', 'first_name', 'last_name']),
+            ('B', ['middle_name', 'email', 'specialization']), ('C', ['research_interests']),
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     
     def __str__(self):
         return f"{self.faculty_id} - {self.first_name} {self.last_name}"
@@ -60,6 +72,9 @@ class Faculty(models.Model):
         verbose_name = 'Faculty Member'
         verbose_name_plural = 'Faculty Members'
         ordering = ['faculty_id']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='faculty_search_idx'),
+        ]
 
 
 class FacultyQualification(models.Model):
@@ -124,4 +139,9 @@ class FacultyLeave(models.Model):
     
     class Meta:
         verbose_name = 'Faculty Leave'
-        verbose_name_plural = 'Faculty Leaves'
\ No newline at end of file
+        verbose_name_plural = 'Faculty Leaves'
+        indexes = [
+            models.Index(fields=['-applied_on'], name='leave_applied_on_idx'),
+            models.Index(fields=['faculty', '-applied_on'], name='leave_faculty_applied_on_idx'),
+            models.Index(fields=['status', '-applied_on'], name='leave_status_applied_on_idx'),
+        ]
\ No newline at end of file
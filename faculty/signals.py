@@ -0,0 +1,6 @@
+from django.contrib.auth.models import User
+
+from university_erp.responsecache import track_generations
+from .models import Faculty
+
+track_generations(Faculty, User)
@@ -3,14 +3,26 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models import Count, Avg
 from django.utils import timezone
+from django.contrib.auth.models import User
+from students.models import Department
+from university_erp.mixins import (ConditionalRequestMixin, KeysetPaginationMixin, QueryPlan, QueryPlanMixin,
+                                   ResponseCacheMixin, StreamingExportMixin)
 from .models import Faculty, FacultyQualification, FacultyLeave
 from .serializers import FacultySerializer, FacultyQualificationSerializer, FacultyLeaveSerializer
 
 
-class FacultyViewSet(viewsets.ModelViewSet):
+class FacultyViewSet(ConditionalRequestMixin, ResponseCacheMixin, StreamingExportMixin, KeysetPaginationMixin,
+                     QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Faculty.objects.all()
     serializer_class = FacultySerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['user', 'department'])
+    cursor_ordering = ('faculty_id',)
+    cache_models = [Faculty, Department, User]
+    action_query_plans = {
+        'qualifications': QueryPlan(select_related=['faculty']),
+        'leaves': QueryPlan(select_related=['faculty', 'approved_by']),
+    }
     
     def get_queryset(self):
         queryset = Faculty.objects.all()
@@ -31,7 +43,7 @@ class FacultyViewSet(viewsets.ModelViewSet):
     def qualifications(self, request, pk=None):
         """Get faculty qualifications"""
         faculty = self.get_object()
-        qualifications = FacultyQualification.objects.filter(faculty=faculty)
+        qualifications = self.plan_queryset(FacultyQualification.objects.filter(faculty=faculty))
         serializer = FacultyQualificationSerializer(qualifications, many=True)
         return Response(serializer.data)
     
@@ -39,7 +51,7 @@ class FacultyViewSet(viewsets.ModelViewSet):
     def leaves(self, request, pk=None):
         """Get faculty leaves"""
         faculty = self.get_object()
-        leaves = FacultyLeave.objects.filter(faculty=faculty).order_by('-applied_on')
+        leaves = self.plan_queryset(FacultyLeave.objects.filter(faculty=faculty)).order_by('-applied_on')
         serializer = FacultyLeaveSerializer(leaves, many=True)
         return Response(serializer.data)
     
@@ -56,10 +68,11 @@ class FacultyViewSet(viewsets.ModelViewSet):
         return Response(stats)
 
 
-class FacultyQualificationViewSet(viewsets.ModelViewSet):
+class FacultyQualificationViewSet(StreamingExportMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = FacultyQualification.objects.all()
     serializer_class = FacultyQualificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['faculty'])
     
     def get_queryset(self):
         queryset = FacultyQualification.objects.all()
@@ -74,10 +87,12 @@ class FacultyQualificationViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class FacultyLeaveViewSet(viewsets.ModelViewSet):
+class FacultyLeaveViewSet(StreamingExportMixin, KeysetPaginationMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = FacultyLeave.objects.all()
     serializer_class = FacultyLeaveSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['faculty', 'approved_by'])
+    cursor_ordering = ('-applied_on',)
     
     def get_queryset(self):
         queryset = FacultyLeave.objects.all()
@@ -26,18 +26,14 @@ const Dashboard: React.FC = () => {
       try {
         setLoading(true);
         
-        // Fetch various statistics
-        const [studentsRes, facultyRes, coursesRes] = await Promise.all([
-          axios.get('/api/students/students/'),
-          axios.get('/api/faculty/faculty/'),
-          axios.get('/api/courses/courses/')
-        ]);
+        // Counters are aggregated and cached server-side
+        const response = await axios.get('/api/dashboard/summary/');
 
         setStats({
-          total_students: studentsRes.data.length,
-          total_faculty: facultyRes.data.length,
-          total_courses: coursesRes.data.length,
-          active_enrollments: 0 // TODO: Implement enrollment count
+          total_students: response.data.total_students,
+          total_faculty: response.data.total_faculty,
+          total_courses: response.data.total_courses,
+          active_enrollments: response.data.active_enrollments
         });
       } catch (error) {
         console.error('Error fetching dashboard stats:', error);
@@ -0,0 +1,23 @@
+from django.db.models import Q
+
+from .engine import search_query
+
+
+class FullTextSearchAdminMixin:
+    """
+    Admin search through the model's search_vector GIN index instead of
+    search_fields' ILIKE scans. fulltext_related names relations whose own
+    search_vector should also match, e.g. 'dean__faculty'.
+    """
+    fulltext_related = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        query = search_query(search_term)
+        if query is None:
+            return queryset.none(), False
+        condition = Q(search_vector=query)
+        for relation in self.fulltext_related:
+            condition |= Q(**{f'{relation}__search_vector': query})
+        return queryset.filter(condition), False
@@ -0,0 +1,16 @@
+from django.contrib.postgres.search import SearchVector
+
+# Text search configuration of every search_vector column and of the queries run against them
+SEARCH_CONFIG = 'english'
+
+
+def search_document(*weighted_fields):
+    """
+    tsvector expression over (weight, [fields]) groups for a model's
+    search_vector GeneratedField, so PostgreSQL keeps it current on every write
+    """
+    document = None
+    for weight, fields in weighted_fields:
+        vector = SearchVector(*fields, weight=weight, config=SEARCH_CONFIG)
+        document = vector if document is None else document + vector
+    return document
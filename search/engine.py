@@ -0,0 +1,107 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import CharField, Count, F, Value
+from django.db.models.functions import Cast, Concat
+
+from courses.models import Course
+from deanship.models import DeanshipDecision, DeanshipMeeting, DeanshipReport
+from faculty.models import Faculty
+from students.models import Student
+from .documents import SEARCH_CONFIG
+
+MAX_LIMIT = 100
+# Terms shorter than this are only matched whole, not as prefixes, so a single letter cannot match half the tenant
+MIN_PREFIX_LENGTH = 2
+TERM = re.compile(r'[^\W_]+')
+# Quoted phrases, -exclusions and "or" are web-search syntax the prefix query cannot honour
+OPERATORS = re.compile(r'"|(?:^|\s)-\w|\bor\b', re.IGNORECASE)
+
+
+class SearchType:
+    """
+    A searchable model: its search_vector column plus the title and subtitle
+    expressions shown for each hit
+    """
+
+    def __init__(self, model, title, subtitle):
+        self.model = model
+        self.title = title
+        self.subtitle = subtitle
+
+
+SEARCH_TYPES = {
+    'students': SearchType(Student, Concat('first_name', Value(' '), 'last_name'), F('student_id')),
+    'faculty': SearchType(Faculty, Concat('first_name', Value(' '), 'last_name'), F('faculty_id')),
+    'courses': SearchType(Course, F('course_name'), F('course_code')),
+    'decisions': SearchType(DeanshipDecision, F('title'), F('decision_type')),
+    'meetings': SearchType(DeanshipMeeting, F('title'), F('meeting_type')),
+    'reports': SearchType(DeanshipReport, F('title'), F('report_period')),
+}
+
+
+def search_query(text):
+    """
+    tsquery for free text. Plain words also match as prefixes, so partial
+    names and codes match while typing; text using web-search syntax
+    ("quoted phrases", -exclusions, or) is searched exactly as written.
+    None when the text has nothing to search for.
+    """
+    if not TERM.search(text):
+        return None
+    query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+    prefixes = [term for term in TERM.findall(text) if len(term) >= MIN_PREFIX_LENGTH]
+    if prefixes and not OPERATORS.search(text):
+        query |= SearchQuery(' & '.join(f'{term}:*' for term in prefixes), search_type='raw', config=SEARCH_CONFIG)
+    return query
+
+
+def facet_counts(query):
+    """Matches per search type, one UNION ALL of GIN index scans"""
+    counts = [
+        search_type.model.objects.filter(search_vector=query).order_by()
+        .annotate(kind=Value(name, output_field=CharField())).values('kind')
+        .annotate(count=Count('pk')).values_list('kind', 'count')
+        for name, search_type in SEARCH_TYPES.items()
+    ]
+    facets = dict.fromkeys(SEARCH_TYPES, 0)
+    facets.update(counts[0].union(*counts[1:], all=True))
+    return facets
+
+
+def ranked_hits(query, types, limit, offset=0):
+    """
+    The best-ranked offset..offset+limit hits across types, from one UNION ALL
+    of each type's own top offset+limit matches
+    """
+    hits = [
+        SEARCH_TYPES[name].model.objects.filter(search_vector=query)
+        .annotate(kind=Value(name, output_field=CharField()), key=Cast('pk', output_field=CharField()),
+                  hit_title=Cast(SEARCH_TYPES[name].title, output_field=CharField()),
+                  hit_subtitle=Cast(SEARCH_TYPES[name].subtitle, output_field=CharField()),
+                  rank=SearchRank(F('search_vector'), query))
+        .order_by('-rank').values_list('kind', 'key', 'hit_title', 'hit_subtitle', 'rank')
+        for name in types
+    ]
+    if len(hits) == 1:
+        rows = hits[0][offset:offset + limit]
+    else:
+        top = [queryset[:offset + limit] for queryset in hits]
+        rows = top[0].union(*top[1:], all=True).order_by('-rank')[offset:offset + limit]
+    return [{'type': kind, 'id': key, 'title': title, 'subtitle': subtitle, 'rank': round(rank, 6)}
+            for kind, key, title, subtitle, rank in rows]
+
+
+def search(text, types=None, limit=20, offset=0):
+    """Ranked hits for text across the requested types, with match counts for every type"""
+    query = search_query(text)
+    types = [name for name in SEARCH_TYPES if not types or name in types]
+    if query is None:
+        return {'query': text, 'total': 0, 'facets': dict.fromkeys(SEARCH_TYPES, 0), 'results': []}
+    facets = facet_counts(query)
+    return {
+        'query': text,
+        'total': sum(facets[name] for name in types),
+        'facets': facets,
+        'results': ranked_hits(query, types, min(limit, MAX_LIMIT), offset),
+    }
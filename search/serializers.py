@@ -0,0 +1,10 @@
+from rest_framework import serializers
+
+from .engine import MAX_LIMIT, SEARCH_TYPES
+
+
+class SearchParamsSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200, trim_whitespace=True)
+    type = serializers.ListField(child=serializers.ChoiceField(choices=list(SEARCH_TYPES)), required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_LIMIT, default=20)
+    offset = serializers.IntegerField(min_value=0, max_value=1000, default=0)
@@ -0,0 +1,21 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .engine import search
+from .serializers import SearchParamsSerializer
+
+
+class SearchView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        """Ranked full-text search over students, faculty, courses and deanship records, with per-type counts"""
+        params = {key: request.query_params.get(key) for key in ('q', 'limit', 'offset') if key in request.query_params}
+        types = [name for value in request.query_params.getlist('type') for name in value.split(',') if name]
+        if types:
+            params['type'] = types
+        serializer = SearchParamsSerializer(data=params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        return Response(search(data['q'], types=data.get('type'), limit=data['limit'], offset=data['offset']))
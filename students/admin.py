@@ -1,4 +1,5 @@
 from django.contrib import admin
+from search.admin import FullTextSearchAdminMixin
 from .models import Department, Student, StudentAcademicRecord
 
 
@@ -10,7 +11,7 @@ class DepartmentAdmin(admin.ModelAdmin):
 
 
 @admin.register(Student)
-class StudentAdmin(admin.ModelAdmin):
+class StudentAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ('student_id', 'first_name', 'last_name', 'department', 'academic_level', 'status')
     list_filter = ('department', 'academic_level', 'status', 'gender')
     search_fields = ('student_id', 'first_name', 'last_name', 'email')
@@ -0,0 +1,164 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, Exists, F, Func, IntegerField, OuterRef, Sum, Value, When, Window
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from django.utils import timezone
+
+from courses.models import StudentEnrollment
+from university_erp.responsecache import bump_generations
+from .models import Student, StudentAcademicRecord
+
+# StudentAcademicRecord.semester numbers terms chronologically within a year
+TERM_NUMBERS = {'spring': 1, 'summer': 2, 'fall': 3}
+GRADED_STATUSES = ['completed', 'failed']
+PROBATION_THRESHOLD = Decimal('2.00')
+DEANS_LIST_THRESHOLD = Decimal('3.50')
+TWO_PLACES = Decimal('0.01')
+
+# Sent after recompute_students rewrites GPAs with bulk_update, which skips post_save
+gpas_recomputed = Signal()
+
+
+class RunningSum(Func):
+    """SUM() usable as a window over an aggregate annotation, e.g. SUM(SUM(x)) OVER (...)"""
+    function = 'SUM'
+    window_compatible = True
+
+
+def _ratio(points, credits):
+    if not credits:
+        return Decimal('0.00')
+    return (Decimal(points) / Decimal(credits)).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+def academic_standing(semester_gpa, cumulative_gpa):
+    if cumulative_gpa < PROBATION_THRESHOLD:
+        return 'Academic Probation'
+    if semester_gpa >= DEANS_LIST_THRESHOLD:
+        return "Dean's List"
+    return 'Good Standing'
+
+
+def term_number():
+    """The TERM_NUMBERS value of an enrollment's offering semester, as an expression"""
+    return Case(*[When(course_offering__semester=name, then=Value(number)) for name, number in TERM_NUMBERS.items()],
+                output_field=IntegerField())
+
+
+def term_totals(queryset):
+    """
+    Per (student, year, term) credit-weighted totals for graded enrollments,
+    with running cumulative totals computed by window functions
+    """
+    credits = F('course_offering__course__credit_hours')
+    term = term_number()
+    window = {
+        'partition_by': [F('student_id')],
+        'order_by': [F('year').asc(), F('term').asc()],
+    }
+    return (queryset.filter(status__in=GRADED_STATUSES, grade_points__isnull=False)
+            .values('student_id', year=F('course_offering__year'), term=term)
+            .annotate(quality_points=Sum(F('grade_points') * credits, output_field=DecimalField()),
+                      attempted=Sum(credits),
+                      earned=Coalesce(Sum(Case(When(status='completed', then=credits), output_field=IntegerField())), 0))
+            .annotate(cumulative_quality_points=Window(RunningSum('quality_points', output_field=DecimalField()), **window),
+                      cumulative_attempted=Window(RunningSum('attempted', output_field=IntegerField()), **window),
+                      cumulative_earned=Window(RunningSum('earned', output_field=IntegerField()), **window))
+            .order_by('student_id', 'year', 'term'))
+
+
+def _records_from_totals(rows):
+    """Turn term_totals rows into StudentAcademicRecord instances and final GPAs per student"""
+    records = []
+    gpas = {}
+    for row in rows:
+        semester_gpa = _ratio(row['quality_points'], row['attempted'])
+        cumulative_gpa = _ratio(row['cumulative_quality_points'], row['cumulative_attempted'])
+        records.append(StudentAcademicRecord(
+            student_id=row['student_id'],
+            semester=row['term'],
+            year=row['year'],
+            semester_gpa=semester_gpa,
+            cumulative_gpa=cumulative_gpa,
+            credits_earned=row['cumulative_earned'],
+            total_credits=row['cumulative_attempted'],
+            academic_standing=academic_standing(semester_gpa, cumulative_gpa),
+        ))
+        gpas[row['student_id']] = cumulative_gpa
+    return records, gpas
+
+
+def _stale_records(records):
+    """
+    Records of terms in which the student has enrollments but none graded any
+    more, which the upsert cannot reach. Records of terms without any
+    enrollment, imported or entered by hand, are not stale.
+    """
+    same_term = StudentEnrollment.objects.annotate(term=term_number()).filter(
+        student_id=OuterRef('student_id'), course_offering__year=OuterRef('year'), term=OuterRef('semester'))
+    graded = same_term.filter(status__in=GRADED_STATUSES, grade_points__isnull=False)
+    return records.filter(Exists(same_term)).exclude(Exists(graded))
+
+
+def _write(records, gpas, batch_size=1000):
+    StudentAcademicRecord.objects.bulk_create(
+        records,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['student', 'semester', 'year'],
+        update_fields=['semester_gpa', 'cumulative_gpa', 'credits_earned', 'total_credits', 'academic_standing'],
+    )
+    # bulk_update does not apply auto_now, and student ETags depend on it
+    now = timezone.now()
+    Student.objects.bulk_update([Student(pk=pk, gpa=gpa, updated_at=now) for pk, gpa in gpas.items()],
+                                ['gpa', 'updated_at'], batch_size=batch_size)
+
+
+def recompute_students(student_ids):
+    """Recompute the term records and GPA of the given students from their graded enrollments"""
+    student_ids = set(student_ids)
+    records, gpas = _records_from_totals(term_totals(StudentEnrollment.objects.filter(student_id__in=student_ids)))
+    with transaction.atomic():
+        _stale_records(StudentAcademicRecord.objects.filter(student_id__in=student_ids)).delete()
+        _write(records, gpas)
+        Student.objects.filter(pk__in=student_ids - set(gpas)).exclude(gpa=None).update(
+            gpa=None, updated_at=timezone.now())
+        bump_generations(Student)
+    gpas_recomputed.send(sender=Student, student_ids=student_ids)
+
+
+def recompute_all(batch_size=1000, progress=None):
+    """
+    Rebuild every student's records and GPA in the current tenant from a
+    single windowed aggregate query, writing in batches. progress(done, total)
+    is called after each batch.
+    """
+    rows = term_totals(StudentEnrollment.objects.all())
+    total = rows.count()
+    done = 0
+    batch = []
+    current_student = None
+    with transaction.atomic():
+        _stale_records(StudentAcademicRecord.objects.all()).delete()
+        graded = StudentEnrollment.objects.filter(status__in=GRADED_STATUSES, grade_points__isnull=False)
+        Student.objects.exclude(pk__in=graded.values('student_id')).exclude(gpa=None).update(
+            gpa=None, updated_at=timezone.now())
+        bump_generations(Student)
+        for row in rows.iterator(chunk_size=batch_size):
+            # Flush on student boundaries so each student's GPA is final
+            if len(batch) >= batch_size and row['student_id'] != current_student:
+                _write(*_records_from_totals(batch), batch_size=batch_size)
+                done += len(batch)
+                batch = []
+                if progress:
+                    progress(done, total)
+            batch.append(row)
+            current_student = row['student_id']
+        if batch:
+            _write(*_records_from_totals(batch), batch_size=batch_size)
+            done += len(batch)
+            if progress:
+                progress(done, total)
+    return done
@@ -0,0 +1,187 @@
+import csv
+import datetime
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import DatabaseError, transaction
+from rest_framework import serializers
+
+from .models import Department, Student
+from .signals import students_bulk_created
+
+MAX_REPORTED_ERRORS = 1000
+
+
+class StudentImportRowSerializer(serializers.ModelSerializer):
+    """Validates one import row; department is given by code and resolved in bulk"""
+    department = serializers.CharField()
+    username = serializers.CharField(required=False, allow_blank=True)
+    password = serializers.CharField(required=False, allow_blank=True)
+
+    class Meta:
+        model = Student
+        fields = ['student_id', 'username', 'password', 'department', 'first_name', 'last_name',
+                 'middle_name', 'date_of_birth', 'gender', 'phone', 'email', 'address',
+                 'academic_level', 'enrollment_date', 'expected_graduation_date', 'current_semester',
+                 'status', 'emergency_contact_name', 'emergency_contact_phone',
+                 'emergency_contact_relationship']
+        # Uniqueness is checked per chunk with one query instead of per row
+        extra_kwargs = {'student_id': {'validators': []}}
+
+
+def _cell(value):
+    # Spreadsheet date cells load as midnight datetimes
+    if isinstance(value, datetime.datetime) and value.time() == datetime.time.min:
+        return value.date()
+    return value
+
+
+def read_rows(fileobj, file_format):
+    """Yield each data row of a CSV or XLSX upload as a dict keyed by header"""
+    if file_format == 'xlsx':
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+        for values in rows:
+            if any(value is not None for value in values):
+                yield {key: _cell(value) for key, value in zip(header, values) if key and value is not None}
+        workbook.close()
+    else:
+        text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+        for row in csv.DictReader(text):
+            yield {key.strip(): value for key, value in row.items() if key and value not in (None, '')}
+
+
+def detect_format(name):
+    return 'xlsx' if os.path.splitext(name)[1].lower() in ('.xlsx', '.xlsm') else 'csv'
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+class StudentImporter:
+    """
+    Loads students in chunks: departments resolve through an in-memory
+    code -> id map, uniqueness is checked with one query per chunk, passwords
+    are hashed in a process pool, and users and students are written with
+    bulk_create. Bad rows are reported and skipped; they never abort the load.
+    """
+
+    def __init__(self, chunk_size=None, hash_workers=None, progress=None):
+        self.chunk_size = chunk_size or getattr(settings, 'STUDENT_IMPORT_CHUNK_SIZE', 1000)
+        self.hash_workers = hash_workers or getattr(settings, 'STUDENT_IMPORT_HASH_WORKERS', 1)
+        self.progress = progress
+        self.departments = dict(Department.objects.values_list('code', 'id'))
+        # One bound serializer validates every row, avoiding per-row field construction
+        self.row_serializer = StudentImportRowSerializer()
+        self.total = 0
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def run(self, rows):
+        # Daemonic processes (e.g. Celery prefork workers) cannot fork a pool
+        if self.hash_workers > 1 and not multiprocessing.current_process().daemon:
+            self.pool = ProcessPoolExecutor(max_workers=self.hash_workers)
+        else:
+            self.pool = None
+        with self.pool or nullcontext():
+            for offset, chunk in enumerate(_chunks(rows, self.chunk_size)):
+                self._import_chunk(chunk, first_row=offset * self.chunk_size + 1)
+                if self.progress:
+                    self.progress(self)
+        return self.report()
+
+    def report(self):
+        return {
+            'total_rows': self.total,
+            'created_count': self.created,
+            'failed_count': self.failed,
+            'errors': self.errors,
+        }
+
+    def _hash_passwords(self, passwords):
+        """Hash given passwords in the pool; rows without one get an unusable password"""
+        hashed = [make_password(None) for _ in passwords]
+        given = [index for index, password in enumerate(passwords) if password]
+        if given:
+            plain = [passwords[index] for index in given]
+            if self.pool is not None:
+                chunksize = max(1, len(plain) // (self.hash_workers * 4))
+                results = self.pool.map(make_password, plain, chunksize=chunksize)
+            else:
+                results = map(make_password, plain)
+            for index, password in zip(given, results):
+                hashed[index] = password
+        return hashed
+
+    def _error(self, row_number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'errors': errors})
+
+    def _import_chunk(self, chunk, first_row):
+        self.total += len(chunk)
+        valid = []
+        for row_number, row in enumerate(chunk, start=first_row):
+            try:
+                data = dict(self.row_serializer.run_validation(row))
+            except serializers.ValidationError as error:
+                detail = serializers.as_serializer_error(error)
+                self._error(row_number, {field: [str(message) for message in messages]
+                                         for field, messages in detail.items()})
+                continue
+            department_id = self.departments.get(data.pop('department'))
+            if department_id is None:
+                self._error(row_number, {'department': ['Unknown department code.']})
+                continue
+            data['department_id'] = department_id
+            data['username'] = data.get('username') or data['student_id']
+            valid.append((row_number, data))
+
+        taken_ids = set(Student.objects.filter(student_id__in=[data['student_id'] for _, data in valid])
+                        .values_list('student_id', flat=True))
+        taken_usernames = set(User.objects.filter(username__in=[data['username'] for _, data in valid])
+                              .values_list('username', flat=True))
+        accepted = []
+        for row_number, data in valid:
+            if data['student_id'] in taken_ids:
+                self._error(row_number, {'student_id': ['Student ID already exists.']})
+            elif data['username'] in taken_usernames:
+                self._error(row_number, {'username': ['Username already exists.']})
+            else:
+                taken_ids.add(data['student_id'])
+                taken_usernames.add(data['username'])
+                accepted.append((row_number, data))
+        if not accepted:
+            return
+
+        hashed = self._hash_passwords([data.pop('password', '') for _, data in accepted])
+        users = [
+            User(username=data.pop('username'), email=data['email'], first_name=data['first_name'],
+                 last_name=data['last_name'], password=password)
+            for (_, data), password in zip(accepted, hashed)
+        ]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                students = Student.objects.bulk_create(
+                    [Student(user=user, **data) for user, (_, data) in zip(users, accepted)])
+        except DatabaseError as error:
+            for row_number, _ in accepted:
+                self._error(row_number, {'non_field_errors': [f'Chunk rejected by database: {error}']})
+            return
+        self.created += len(students)
+        transaction.on_commit(lambda: students_bulk_created.send(sender=Student, students=students))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from students.importer import StudentImporter, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk import students from a CSV or XLSX file (run per tenant via tenant_command)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'xlsx'], help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int)
+        parser.add_argument('--workers', type=int, help='Processes used for password hashing')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or detect_format(options['path'])
+
+        def progress(importer):
+            self.stdout.write(f'{importer.total} rows read, {importer.created} created, {importer.failed} failed')
+
+        importer = StudentImporter(chunk_size=options['chunk_size'], hash_workers=options['workers'], progress=progress)
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                report = importer.run(read_rows(fileobj, file_format))
+        except OSError as error:
+            raise CommandError(error)
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created_count']} of {report['total_rows']} students ({report['failed_count']} failed)"))
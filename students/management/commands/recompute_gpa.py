@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from students.gpa import recompute_all
+
+
+class Command(BaseCommand):
+    help = 'Recompute academic records and GPA for every student (run per tenant via tenant_command)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        def progress(done, total):
+            self.stdout.write(f'{done}/{total} student terms processed')
+
+        done = recompute_all(batch_size=options['batch_size'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(f'GPA recompute finished: {done} student terms'))
@@ -1,7 +1,11 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import User
 import uuid
 
+from search.documents import search_document
+
 
 class Department(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -61,6 +65,13 @@ class Student(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = models.GeneratedField(
+        expression=search_document(
+            ('A', ['student_id', 'first_name', 'last_name']), ('B', ['middle_name', 'email']),
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     
     def __str__(self):
         return f"{self.student_id} - {self.first_name} {self.last_name}"
@@ -69,6 +80,9 @@ class Student(models.Model):
         verbose_name = 'Student'
         verbose_name_plural = 'Students'
         ordering = ['student_id']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='student_search_idx'),
+        ]
 
 
 class StudentAcademicRecord(models.Model):
@@ -89,4 +103,33 @@ class StudentAcademicRecord(models.Model):
     class Meta:
         verbose_name = 'Academic Record'
         verbose_name_plural = 'Academic Records'
-        unique_together = ['student', 'semester', 'year']
\ No newline at end of file
+        unique_together = ['student', 'semester', 'year']
+
+
+class StudentImportJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    file = models.FileField(upload_to='imports/students/')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    total_rows = models.IntegerField(default=0)
+    created_count = models.IntegerField(default=0)
+    failed_count = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Student import {self.created_at:%Y-%m-%d %H:%M} ({self.status})"
+    
+    class Meta:
+        verbose_name = 'Student Import Job'
+        verbose_name_plural = 'Student Import Jobs'
+        ordering = ['-created_at']
\ No newline at end of file
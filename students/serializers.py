@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Department, Student, StudentAcademicRecord
+from .models import Department, Student, StudentAcademicRecord, StudentImportJob
 
 
 class DepartmentSerializer(serializers.ModelSerializer):
@@ -12,6 +12,9 @@ class DepartmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_student_count(self, obj):
+        # Annotated by DepartmentViewSet's query plan; fall back for unannotated instances
+        if hasattr(obj, 'student_count'):
+            return obj.student_count
         return obj.student_set.count()
 
 
@@ -48,4 +51,13 @@ class StudentAcademicRecordSerializer(serializers.ModelSerializer):
         fields = ['id', 'student', 'student_name', 'student_id', 'semester', 'year', 
                  'semester_gpa', 'cumulative_gpa', 'credits_earned', 'total_credits',
                  'academic_standing', 'created_at']
-        read_only_fields = ['id', 'created_at']
\ No newline at end of file
+        read_only_fields = ['id', 'created_at']
+
+
+class StudentImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StudentImportJob
+        fields = ['id', 'file', 'status', 'total_rows', 'created_count', 'failed_count', 'errors',
+                 'created_by', 'finished_at', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'status', 'total_rows', 'created_count', 'failed_count', 'errors',
+                           'created_by', 'finished_at', 'created_at', 'updated_at']
\ No newline at end of file
@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import Signal, receiver
+
+from courses.models import StudentEnrollment
+from university_erp.responsecache import bump_generations, track_generations
+from .gpa import recompute_students
+from .models import Department, Student, StudentImportJob
+
+# Sent after Student rows are written with bulk_create, which skips post_save
+students_bulk_created = Signal()
+
+track_generations(Department, Student, StudentImportJob)
+
+
+@receiver(students_bulk_created)
+def bump_student_generation(sender, students, **kwargs):
+    bump_generations(Student)
+
+
+def _gpa_inputs(enrollment):
+    return (enrollment.status, enrollment.grade_points, enrollment.course_offering_id)
+
+
+@receiver(post_init, sender=StudentEnrollment)
+def remember_gpa_inputs(sender, instance, **kwargs):
+    instance._gpa_inputs = _gpa_inputs(instance)
+
+
+@receiver(post_save, sender=StudentEnrollment)
+def update_gpa_on_save(sender, instance, created, **kwargs):
+    if created or instance._gpa_inputs != _gpa_inputs(instance):
+        instance._gpa_inputs = _gpa_inputs(instance)
+        transaction.on_commit(lambda: recompute_students([instance.student_id]))
+
+
+@receiver(post_delete, sender=StudentEnrollment)
+def update_gpa_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(lambda: recompute_students([instance.student_id]))
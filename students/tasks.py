@@ -0,0 +1,40 @@
+from celery import shared_task
+from django.utils import timezone
+from django_tenants.utils import schema_context
+
+from .importer import StudentImporter, detect_format, read_rows
+from .models import StudentImportJob
+
+
+def run_import_job(job):
+    """Run a StudentImportJob, saving progress after every chunk"""
+    def progress(importer):
+        StudentImportJob.objects.filter(pk=job.pk).update(
+            total_rows=importer.total, created_count=importer.created, failed_count=importer.failed,
+            updated_at=timezone.now())
+
+    job.status = 'running'
+    job.save(update_fields=['status', 'updated_at'])
+    try:
+        with job.file.open('rb') as fileobj:
+            report = StudentImporter(progress=progress).run(read_rows(fileobj, detect_format(job.file.name)))
+    except Exception as error:
+        job.status = 'failed'
+        job.errors = [{'row': None, 'errors': {'non_field_errors': [str(error)]}}]
+    else:
+        job.status = 'completed'
+        job.total_rows = report['total_rows']
+        job.created_count = report['created_count']
+        job.failed_count = report['failed_count']
+        job.errors = report['errors']
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+@shared_task
+def import_students(schema_name, job_id):
+    with schema_context(schema_name):
+        job = StudentImportJob.objects.get(pk=job_id)
+        run_import_job(job)
+        return job.status
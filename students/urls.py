@@ -1,11 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import DepartmentViewSet, StudentViewSet, StudentAcademicRecordViewSet
+from .views import DepartmentViewSet, StudentViewSet, StudentAcademicRecordViewSet, StudentImportJobViewSet
 
 router = DefaultRouter()
 router.register(r'departments', DepartmentViewSet)
 router.register(r'students', StudentViewSet)
 router.register(r'academic-records', StudentAcademicRecordViewSet)
+router.register(r'imports', StudentImportJobViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
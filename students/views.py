@@ -1,41 +1,63 @@
-from rest_framework import viewsets, permissions, status
+from rest_framework import mixins, viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Avg, Count
-from .models import Department, Student, StudentAcademicRecord
-from .serializers import DepartmentSerializer, StudentSerializer, StudentAcademicRecordSerializer
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Count
+from dashboard.models import DepartmentStatistics
+from dashboard.rollups import refresh_departments
+from dashboard.serializers import DepartmentStatisticsSerializer
+from university_erp.mixins import (ConditionalRequestMixin, KeysetPaginationMixin, QueryPlan, QueryPlanMixin,
+                                   ResponseCacheMixin, StreamingExportMixin)
+from .models import Department, Student, StudentAcademicRecord, StudentImportJob
+from .serializers import (DepartmentSerializer, StudentSerializer, StudentAcademicRecordSerializer,
+                         StudentImportJobSerializer)
+from .tasks import import_students
 
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class DepartmentViewSet(ConditionalRequestMixin, ResponseCacheMixin, StreamingExportMixin, QueryPlanMixin,
+                        viewsets.ModelViewSet):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(annotations={'student_count': Count('student')})
+    cache_models = [Department, Student]
+    action_query_plans = {
+        'students': QueryPlan(select_related=['user', 'department']),
+        'statistics': QueryPlan(),
+    }
     
     @action(detail=True, methods=['get'])
     def students(self, request, pk=None):
         """Get all students in a department"""
         department = self.get_object()
-        students = Student.objects.filter(department=department)
+        students = self.plan_queryset(Student.objects.filter(department=department))
         serializer = StudentSerializer(students, many=True)
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
     def statistics(self, request, pk=None):
-        """Get department statistics"""
+        """Get department statistics from the rollup table, rolling it up on first read"""
         department = self.get_object()
-        stats = {
-            'total_students': Student.objects.filter(department=department).count(),
-            'active_students': Student.objects.filter(department=department, status='active').count(),
-            'average_gpa': Student.objects.filter(department=department).aggregate(avg_gpa=Avg('gpa'))['avg_gpa'] or 0,
-            'students_by_level': list(Student.objects.filter(department=department).values('academic_level').annotate(count=Count('id')))
-        }
-        return Response(stats)
+        try:
+            statistics = department.statistics
+        except DepartmentStatistics.DoesNotExist:
+            refresh_departments([department.pk])
+            statistics = DepartmentStatistics.objects.get(department=department)
+        return Response(DepartmentStatisticsSerializer(statistics).data)
 
 
-class StudentViewSet(viewsets.ModelViewSet):
+class StudentViewSet(ConditionalRequestMixin, StreamingExportMixin, KeysetPaginationMixin, QueryPlanMixin,
+                     viewsets.ModelViewSet):
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['user', 'department'])
+    cache_models = [Student, Department, User]
+    cursor_ordering = ('student_id',)
+    action_query_plans = {
+        'academic_records': QueryPlan(select_related=['student']),
+    }
     
     def get_queryset(self):
         queryset = Student.objects.all()
@@ -56,7 +78,7 @@ class StudentViewSet(viewsets.ModelViewSet):
     def academic_records(self, request, pk=None):
         """Get student's academic records"""
         student = self.get_object()
-        records = StudentAcademicRecord.objects.filter(student=student).order_by('-year', '-semester')
+        records = self.plan_queryset(StudentAcademicRecord.objects.filter(student=student)).order_by('-year', '-semester')
         serializer = StudentAcademicRecordSerializer(records, many=True)
         return Response(serializer.data)
     
@@ -72,10 +94,11 @@ class StudentViewSet(viewsets.ModelViewSet):
         return Response({'error': 'Invalid status'}, status=400)
 
 
-class StudentAcademicRecordViewSet(viewsets.ModelViewSet):
+class StudentAcademicRecordViewSet(StreamingExportMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = StudentAcademicRecord.objects.all()
     serializer_class = StudentAcademicRecordSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['student'])
     
     def get_queryset(self):
         queryset = StudentAcademicRecord.objects.all()
@@ -87,4 +110,15 @@ class StudentAcademicRecordViewSet(viewsets.ModelViewSet):
         if year:
             queryset = queryset.filter(year=year)
             
-        return queryset.order_by('-year', '-semester')
\ No newline at end of file
+        return queryset.order_by('-year', '-semester')
+
+
+class StudentImportJobViewSet(ConditionalRequestMixin, mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = StudentImportJob.objects.all()
+    serializer_class = StudentImportJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def perform_create(self, serializer):
+        job = serializer.save(created_by=self.request.user)
+        schema_name = connection.schema_name
+        transaction.on_commit(lambda: import_students.delay(schema_name, str(job.pk)))
\ No newline at end of file
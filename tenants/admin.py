@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django_tenants.admin import TenantAdminMixin
-from .models import Client, Domain
+from .models import Client, Domain, TenantMigrationResult, TenantMigrationRun
 
 
 @admin.register(Client)
@@ -29,4 +29,19 @@ class DomainAdmin(admin.ModelAdmin):
     list_display = ('domain', 'tenant', 'is_primary')
     list_filter = ('is_primary',)
     search_fields = ('domain', 'tenant__name')
-    readonly_fields = ('id',)
\ No newline at end of file
+    readonly_fields = ('id',)
+
+
+class TenantMigrationResultInline(admin.TabularInline):
+    model = TenantMigrationResult
+    extra = 0
+    fields = ('schema_name', 'status', 'applied_count', 'duration', 'finished_at')
+    readonly_fields = fields
+
+
+@admin.register(TenantMigrationRun)
+class TenantMigrationRunAdmin(admin.ModelAdmin):
+    list_display = ('started_at', 'status', 'workers', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('id', 'status', 'workers', 'started_at', 'finished_at')
+    inlines = [TenantMigrationResultInline]
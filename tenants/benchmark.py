@@ -0,0 +1,159 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.test import Client as TestClient
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from courses.models import CourseOffering
+from deanship.models import Dean
+from students.models import Department, Student
+from university_erp.instrumentation import QueryRecorder
+from university_erp.responsecache import response_cache
+
+BYPASS_CACHE_ALIAS = 'benchmark-bypass'
+
+
+class Endpoint:
+    """A GET request to benchmark, named for reports and baselines"""
+
+    def __init__(self, name, url, params=None):
+        self.name = name
+        self.url = url
+        self.params = params or {}
+
+
+def default_endpoints():
+    """The key read endpoints, pointed at sample rows of the current tenant"""
+    student = Student.objects.order_by('student_id').first()
+    department = Department.objects.order_by('code').first()
+    offering = CourseOffering.objects.filter(is_active=True).order_by('-current_enrollment').first()
+    dean = Dean.objects.order_by('appointed_date').first()
+    endpoints = [
+        Endpoint('students.list', reverse('student-list')),
+        Endpoint('students.list.filtered', reverse('student-list'), {'status': 'active', 'academic_level': 'undergraduate'}),
+        Endpoint('faculty.list', reverse('faculty-list')),
+        Endpoint('courses.list', reverse('course-list')),
+        Endpoint('offerings.list', reverse('courseoffering-list'), {'is_active': 'true'}),
+        Endpoint('enrollments.list', reverse('studentenrollment-list')),
+        Endpoint('decisions.list', reverse('deanshipdecision-list')),
+        Endpoint('budget_transactions.summary', reverse('budgettransaction-summary')),
+        Endpoint('dashboard.summary', reverse('dashboard-summary')),
+        Endpoint('search', reverse('search'), {'q': student.first_name if student else 'ahmed'}),
+    ]
+    if student:
+        endpoints += [
+            Endpoint('students.detail', reverse('student-detail', args=[student.pk])),
+            Endpoint('students.academic_records', reverse('student-academic-records', args=[student.pk])),
+        ]
+    if department:
+        endpoints.append(Endpoint('departments.statistics', reverse('department-statistics', args=[department.pk])))
+    if offering:
+        endpoints += [
+            Endpoint('offerings.detail', reverse('courseoffering-detail', args=[offering.pk])),
+            Endpoint('offerings.statistics', reverse('courseoffering-statistics', args=[offering.pk])),
+            Endpoint('offerings.gradebook', reverse('courseoffering-gradebook', args=[offering.pk])),
+            Endpoint('offerings.final_grades', reverse('courseoffering-final-grades', args=[offering.pk])),
+        ]
+    if dean:
+        endpoints.append(Endpoint('deans.dashboard', reverse('dean-dashboard', args=[dean.pk])))
+    return endpoints
+
+
+def _percentile(timings, percent):
+    return round(float(np.percentile(timings, percent)), 2)
+
+
+@contextmanager
+def response_cache_bypassed():
+    """Point the response cache at a dummy backend, so every request builds its response"""
+    alias = response_cache.alias
+    bypass = {BYPASS_CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    with override_settings(CACHES={**settings.CACHES, **bypass}):
+        response_cache.alias = BYPASS_CACHE_ALIAS
+        try:
+            yield
+        finally:
+            response_cache.alias = alias
+
+
+def _timings(client, endpoint, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = client.get(endpoint.url, endpoint.params)
+        timings.append((time.perf_counter() - started) * 1000)
+    return response, timings
+
+
+def run_benchmark(user, host, endpoints, iterations=50, warmup=5, progress=None):
+    """
+    Time each endpoint through the full middleware stack with Django's test
+    client. Latencies come from iterations uninstrumented requests after
+    warmup; query count and peak Python allocation come from one extra
+    request run under a QueryRecorder and tracemalloc, which would
+    otherwise distort the timings. All of these bypass the response cache,
+    so they measure the work a cache miss does; the warm_ latencies repeat
+    the timed requests with the cache in place.
+    """
+    client = TestClient(HTTP_HOST=host, HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    results = []
+    for endpoint in endpoints:
+        with response_cache_bypassed():
+            for _ in range(warmup):
+                client.get(endpoint.url, endpoint.params)
+            response, timings = _timings(client, endpoint, iterations)
+
+            # Not CaptureQueriesContext: request_started resets the query log it takes its offsets in
+            queries = QueryRecorder()
+            tracemalloc.start()
+            try:
+                with connection.execute_wrapper(queries):
+                    client.get(endpoint.url, endpoint.params)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        # One request fills the cache for the ones timed after it
+        client.get(endpoint.url, endpoint.params)
+        _, warm_timings = _timings(client, endpoint, iterations)
+
+        result = {
+            'endpoint': endpoint.name,
+            'status': response.status_code,
+            'bytes': len(response.content),
+            'p50_ms': _percentile(timings, 50),
+            'p95_ms': _percentile(timings, 95),
+            'p99_ms': _percentile(timings, 99),
+            'queries': queries.count,
+            'peak_kb': round(peak / 1024, 1),
+            'warm_p50_ms': _percentile(warm_timings, 50),
+            'warm_p95_ms': _percentile(warm_timings, 95),
+        }
+        results.append(result)
+        if progress:
+            progress(result)
+    return results
+
+
+def regressions(results, baseline, tolerance=0.2):
+    """
+    Messages for endpoints slower at p95 than baseline by more than tolerance,
+    or running more queries than the baseline did
+    """
+    previous = {row['endpoint']: row for row in baseline}
+    messages = []
+    for row in results:
+        before = previous.get(row['endpoint'])
+        if before is None:
+            continue
+        if row['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            messages.append(f"{row['endpoint']}: p95 {row['p95_ms']}ms vs baseline {before['p95_ms']}ms")
+        if row['queries'] > before['queries']:
+            messages.append(f"{row['endpoint']}: {row['queries']} queries vs baseline {before['queries']}")
+    return messages
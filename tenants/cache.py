@@ -0,0 +1,88 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class TenantDomainCache:
+    """
+    Hostname -> tenant cache used by CachedTenantMainMiddleware.
+
+    Entries live in a bounded in-process LRU and, when TENANT_DOMAIN_CACHE_ALIAS
+    names a configured cache, in that shared cache as well. Local entries expire
+    after TENANT_DOMAIN_CACHE_TTL seconds so other processes pick up changes even
+    though signal-driven invalidation only reaches the process that did the write.
+    """
+    key_prefix = 'tenants:domain:'
+
+    def __init__(self, maxsize=None, ttl=None, alias=None):
+        self.maxsize = maxsize if maxsize is not None else getattr(settings, 'TENANT_DOMAIN_CACHE_SIZE', 1024)
+        self.ttl = ttl if ttl is not None else getattr(settings, 'TENANT_DOMAIN_CACHE_TTL', 300)
+        self.alias = alias if alias is not None else getattr(settings, 'TENANT_DOMAIN_CACHE_ALIAS', '')
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _shared(self):
+        return caches[self.alias] if self.alias else None
+
+    def _key(self, hostname):
+        return f"{self.key_prefix}{hostname}"
+
+    def _store_local(self, hostname, tenant):
+        with self._lock:
+            self._entries[hostname] = (tenant, time.monotonic() + self.ttl)
+            self._entries.move_to_end(hostname)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, hostname):
+        """Return a copy of the cached tenant for hostname, or None"""
+        with self._lock:
+            entry = self._entries.get(hostname)
+            if entry is not None:
+                tenant, expires = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(hostname)
+                    return copy.copy(tenant)
+                del self._entries[hostname]
+
+        shared = self._shared()
+        if shared is not None:
+            tenant = shared.get(self._key(hostname))
+            if tenant is not None:
+                self._store_local(hostname, tenant)
+                return copy.copy(tenant)
+        return None
+
+    def set(self, hostname, tenant):
+        tenant = copy.copy(tenant)
+        self._store_local(hostname, tenant)
+        shared = self._shared()
+        if shared is not None:
+            shared.set(self._key(hostname), tenant, self.ttl)
+
+    def invalidate(self, tenant_pk=None, hostnames=()):
+        """Drop the given hostnames and every local entry resolving to tenant_pk"""
+        hostnames = {hostname for hostname in hostnames if hostname}
+        with self._lock:
+            if tenant_pk is not None:
+                hostnames.update(hostname for hostname, (cached, _) in self._entries.items() if cached.pk == tenant_pk)
+            for hostname in hostnames:
+                self._entries.pop(hostname, None)
+        shared = self._shared()
+        if shared is not None and hostnames:
+            shared.delete_many([self._key(hostname) for hostname in hostnames])
+
+    def invalidate_tenant(self, tenant):
+        hostnames = tenant.domains.values_list('domain', flat=True) if self._shared() is not None else ()
+        self.invalidate(tenant.pk, hostnames)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+tenant_cache = TenantDomainCache()
@@ -0,0 +1,65 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django_tenants.utils import schema_context
+
+from tenants.benchmark import default_endpoints, regressions, run_benchmark
+from tenants.models import Domain
+
+
+class Command(BaseCommand):
+    help = ('Benchmark the key API endpoints of a tenant through the full middleware stack, reporting '
+            'p50/p95/p99 latency, query counts and peak memory with the response cache bypassed, and p50/p95 '
+            'latency with it warm; --baseline fails on regressions of the uncached numbers')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', required=True)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--username', default='benchmark',
+                            help='Tenant user the requests authenticate as; created as staff if missing')
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help='Only benchmark endpoints with this name (repeatable)')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed p95 slowdown against the baseline, as a fraction')
+
+    def handle(self, *args, **options):
+        host = Domain.objects.filter(tenant__schema_name=options['schema'], is_primary=True).values_list(
+            'domain', flat=True).first()
+        if host is None:
+            raise CommandError(f"No primary domain for schema {options['schema']!r}.")
+
+        with schema_context(options['schema']):
+            user, _ = User.objects.get_or_create(username=options['username'], defaults={'is_staff': True})
+            endpoints = default_endpoints()
+        if options['endpoints']:
+            endpoints = [endpoint for endpoint in endpoints if endpoint.name in options['endpoints']]
+
+        self.stdout.write(f"{'endpoint':32} {'status':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                          f"{'queries':>7} {'peak KB':>8} {'warm p50':>8} {'warm p95':>8}")
+
+        def progress(row):
+            self.stdout.write(f"{row['endpoint']:32} {row['status']:>6} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+                              f"{row['p99_ms']:>8} {row['queries']:>7} {row['peak_kb']:>8} "
+                              f"{row['warm_p50_ms']:>8} {row['warm_p95_ms']:>8}")
+
+        with override_settings(ALLOWED_HOSTS=['*']):
+            results = run_benchmark(user, host, endpoints, iterations=options['iterations'],
+                                    warmup=options['warmup'], progress=progress)
+
+        if options['output']:
+            with open(options['output'], 'w') as fileobj:
+                json.dump(results, fileobj, indent=2)
+        failed = [row['endpoint'] for row in results if row['status'] >= 400]
+        if failed:
+            raise CommandError(f"Endpoints returned errors: {', '.join(failed)}")
+        if options['baseline']:
+            with open(options['baseline']) as fileobj:
+                messages = regressions(results, json.load(fileobj), tolerance=options['tolerance'])
+            if messages:
+                raise CommandError('Regressions against the baseline:\n' + '\n'.join(messages))
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import schema_context
+
+from students.models import Student
+from tenants.models import Client, Domain
+from tenants.synthetic import SyntheticTenant
+
+
+class Command(BaseCommand):
+    help = ('Fill tenant schemas with a seeded synthetic dataset (departments, students, faculty, courses, '
+            'enrollments, grades and deanship records) for load testing')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', action='append', dest='schemas', required=True,
+                            help='Tenant schema to fill (repeatable); each gets its own seed')
+        parser.add_argument('--create', action='store_true',
+                            help='Create missing tenants, served at <schema>.localhost')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--departments', type=int, default=8)
+        parser.add_argument('--students', type=int, default=50000)
+        parser.add_argument('--faculty', type=int, help='Default: one per 25 students')
+        parser.add_argument('--courses-per-department', type=int, default=24)
+        parser.add_argument('--terms', type=int, default=4, help='Spring/fall terms of history, the last in progress')
+        parser.add_argument('--courses-per-term', type=int, default=5)
+        parser.add_argument('--assignments', type=int, default=4, help='Assessed assignments per offering')
+        parser.add_argument('--year', type=int, help='Year of the term in progress (default: this year)')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        for index, schema_name in enumerate(options['schemas']):
+            tenant = Client.objects.filter(schema_name=schema_name).first()
+            if tenant is None:
+                if not options['create']:
+                    raise CommandError(f'No tenant with schema {schema_name!r}; pass --create to create it.')
+                tenant = Client.objects.create(schema_name=schema_name, name=f'Synthetic University {schema_name}',
+                                               university_code=schema_name.upper()[:20],
+                                               description='Synthetic load-test tenant')
+                Domain.objects.create(tenant=tenant, domain=f'{schema_name}.localhost', is_primary=True)
+                self.stdout.write(f'Created tenant {schema_name}')
+            domain = tenant.domains.filter(is_primary=True).values_list('domain', flat=True).first() or 'example.edu'
+
+            with schema_context(schema_name):
+                if Student.objects.exists():
+                    raise CommandError(f'Schema {schema_name!r} already has students; use an empty tenant.')
+
+                def progress(kind, count):
+                    if options['verbosity'] > 1 or kind in ('students', 'reports'):
+                        self.stdout.write(f'{schema_name}: {count} {kind}')
+
+                counts = SyntheticTenant(
+                    seed=options['seed'] + index, departments=options['departments'], students=options['students'],
+                    faculty=options['faculty'], courses_per_department=options['courses_per_department'],
+                    terms=options['terms'], courses_per_term=options['courses_per_term'],
+                    assignments=options['assignments'], year=options['year'], batch_size=options['batch_size'],
+                    domain=domain, progress=progress,
+                ).run()
+            summary = ', '.join(f'{count} {kind}' for kind, count in counts.items())
+            self.stdout.write(self.style.SUCCESS(f'{schema_name}: {summary}'))
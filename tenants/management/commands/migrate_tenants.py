@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from tenants.models import TenantMigrationRun
+from tenants.provisioning import ensure_template_schema, migrate_tenants, start_run
+
+
+class Command(BaseCommand):
+    help = ('Migrate the shared schema, the template schema and then every tenant schema '
+            'in parallel; --resume retries the schemas a previous run did not finish')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.TENANT_MIGRATION_WORKERS)
+        parser.add_argument('--schema', action='append', dest='schemas',
+                            help='Only migrate this tenant schema (repeatable)')
+        parser.add_argument('--resume', action='store_true',
+                            help='Continue the latest unfinished run instead of starting a new one')
+        parser.add_argument('--skip-shared', action='store_true',
+                            help='Do not migrate the public schema first')
+
+    def handle(self, *args, **options):
+        if not options['skip_shared']:
+            call_command('migrate_schemas', shared=True, executor='standard', interactive=False,
+                         verbosity=options['verbosity'])
+
+        applied = ensure_template_schema(verbosity=options['verbosity'])
+        self.stdout.write(f'Template schema {settings.TENANT_BASE_SCHEMA}: {applied} migrations applied')
+
+        if options['resume']:
+            run = TenantMigrationRun.objects.first()
+            if run is None or run.status == 'succeeded':
+                raise CommandError('No unfinished migration run to resume.')
+        else:
+            run = start_run(options['schemas'], workers=options['workers'])
+
+        def progress(done, total, schema_name, status, applied_count, duration, error):
+            line = f'[{done}/{total}] {schema_name}: {status}, {applied_count} applied in {duration:.1f}s'
+            if status == 'failed':
+                self.stderr.write(self.style.ERROR(line))
+                self.stderr.write(error)
+            else:
+                self.stdout.write(line)
+
+        run = migrate_tenants(run, workers=options['workers'], progress=progress)
+        failed = run.results.filter(status='failed').count()
+        if failed:
+            raise CommandError(f'{failed} schemas failed to migrate; rerun with --resume to retry them.')
+        self.stdout.write(self.style.SUCCESS(f'Migrated {run.results.count()} tenant schemas'))
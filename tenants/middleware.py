@@ -0,0 +1,17 @@
+from django_tenants.middleware.main import TenantMainMiddleware
+
+from .cache import tenant_cache
+
+
+class CachedTenantMainMiddleware(TenantMainMiddleware):
+    """
+    TenantMainMiddleware that resolves hostnames through tenant_cache, so a
+    cache hit selects the tenant schema without touching the public schema
+    """
+
+    def get_tenant(self, domain_model, hostname):
+        tenant = tenant_cache.get(hostname)
+        if tenant is None:
+            tenant = super().get_tenant(domain_model, hostname)
+            tenant_cache.set(hostname, tenant)
+        return tenant
@@ -1,5 +1,6 @@
 from django.db import models
 from django_tenants.models import TenantMixin, DomainMixin
+from django_tenants.utils import schema_exists
 import uuid
 
 
@@ -33,6 +34,14 @@ class Client(TenantMixin):
     
     def __str__(self):
         return self.name
+    
+    def create_schema(self, check_if_exists=False, sync_schema=True, verbosity=1):
+        """Bring the template schema up to date so the new schema is cloned from it"""
+        if sync_schema and not (check_if_exists and schema_exists(self.schema_name)):
+            from .provisioning import ensure_template_schema
+            ensure_template_schema(verbosity=verbosity)
+        return super().create_schema(check_if_exists=check_if_exists, sync_schema=sync_schema,
+                                     verbosity=verbosity)
 
 
 class Domain(DomainMixin):
@@ -46,4 +55,58 @@ class Domain(DomainMixin):
         verbose_name_plural = 'Tenant Domains'
     
     def __str__(self):
-        return self.domain
\ No newline at end of file
+        return self.domain
+
+
+class TenantMigrationRun(models.Model):
+    """
+    One fan-out of tenant schema migrations; failed or unfinished schemas can be resumed
+    """
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    workers = models.PositiveIntegerField(default=1)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Tenant Migration Run'
+        verbose_name_plural = 'Tenant Migration Runs'
+        ordering = ['-started_at']
+    
+    def __str__(self):
+        return f"{self.started_at:%Y-%m-%d %H:%M} ({self.status})"
+
+
+class TenantMigrationResult(models.Model):
+    """
+    Outcome of migrating a single schema within a TenantMigrationRun
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    run = models.ForeignKey(TenantMigrationRun, on_delete=models.CASCADE, related_name='results')
+    schema_name = models.CharField(max_length=63)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    applied_count = models.PositiveIntegerField(default=0)
+    duration = models.FloatField(null=True, blank=True, help_text="Seconds spent migrating the schema")
+    error = models.TextField(blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Tenant Migration Result'
+        verbose_name_plural = 'Tenant Migration Results'
+        unique_together = ['run', 'schema_name']
+    
+    def __str__(self):
+        return f"{self.schema_name} ({self.status})"
@@ -0,0 +1,127 @@
+import multiprocessing
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+from django_tenants.utils import get_public_schema_name, schema_exists
+
+from .models import Client, TenantMigrationResult, TenantMigrationRun
+
+
+def pending_migrations(schema_name):
+    """Return the migrations not yet applied to schema_name"""
+    # Without public on the search path the recorder only sees the schema's own django_migrations
+    connection.set_schema(schema_name, include_public=False)
+    try:
+        executor = MigrationExecutor(connection)
+        return [migration for migration, _ in executor.migration_plan(executor.loader.graph.leaf_nodes())]
+    finally:
+        connection.set_schema_to_public()
+
+
+def migrate_schema(schema_name, verbosity=0):
+    call_command('migrate_schemas', tenant=True, schema_name=schema_name, executor='standard',
+                 interactive=False, verbosity=verbosity)
+
+
+def ensure_template_schema(verbosity=0):
+    """
+    Create and fully migrate TENANT_BASE_SCHEMA, returning the number of
+    migrations applied. An advisory lock keeps concurrent provisioning from
+    migrating the template twice.
+    """
+    template = settings.TENANT_BASE_SCHEMA
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_lock(hashtext(%s))', [template])
+    try:
+        if not schema_exists(template):
+            with connection.cursor() as cursor:
+                cursor.execute(f'CREATE SCHEMA "{template}"')
+        pending = pending_migrations(template)
+        if pending:
+            migrate_schema(template, verbosity=verbosity)
+        return len(pending)
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock(hashtext(%s))', [template])
+
+
+def start_run(schema_names=None, workers=1):
+    """Record a new run covering schema_names (default: every tenant), slowest schemas first"""
+    if schema_names is None:
+        schema_names = Client.objects.exclude(schema_name=get_public_schema_name()).values_list(
+            'schema_name', flat=True)
+    # Starting long migrations first keeps one slow tenant from trailing the whole run
+    last_durations = dict(
+        TenantMigrationResult.objects.filter(status='succeeded', schema_name__in=schema_names)
+        .order_by('schema_name', '-finished_at').distinct('schema_name')
+        .values_list('schema_name', 'duration')
+    )
+    run = TenantMigrationRun.objects.create(workers=workers)
+    TenantMigrationResult.objects.bulk_create([
+        TenantMigrationResult(run=run, schema_name=schema_name)
+        for schema_name in sorted(schema_names, key=lambda name: -(last_durations.get(name) or 0))
+    ])
+    return run
+
+
+def _migrate_result(result_pk):
+    """Pool worker: migrate one schema and record the outcome itself"""
+    result = TenantMigrationResult.objects.get(pk=result_pk)
+    result.status = 'running'
+    result.save(update_fields=['status'])
+    started = time.monotonic()
+    try:
+        pending = pending_migrations(result.schema_name)
+        if pending:
+            migrate_schema(result.schema_name)
+    except Exception:
+        result.status = 'failed'
+        result.error = traceback.format_exc()
+    else:
+        result.status = 'succeeded'
+        result.applied_count = len(pending)
+        result.error = ''
+    result.duration = time.monotonic() - started
+    result.finished_at = timezone.now()
+    result.save()
+    return result.schema_name, result.status, result.applied_count, result.duration, result.error
+
+
+def _pool_context():
+    # Workers inherit the configured app registry, which only happens with fork
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def migrate_tenants(run, workers=None, progress=None):
+    """
+    Migrate every schema of run that has not yet succeeded across a pool of
+    worker processes. Workers write their own results, so an interrupted run
+    can be resumed by calling this again with the same run.
+    """
+    workers = workers or run.workers
+    result_pks = list(run.results.exclude(status='succeeded').values_list('pk', flat=True))
+    run.status = 'running'
+    run.workers = workers
+    run.finished_at = None
+    run.save()
+
+    # Forked workers must open their own connections rather than share the parent's socket
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        futures = [pool.submit(_migrate_result, pk) for pk in result_pks]
+        for done, future in enumerate(as_completed(futures), start=1):
+            if progress:
+                progress(done, len(futures), *future.result())
+
+    run.status = 'failed' if run.results.exclude(status='succeeded').exists() else 'succeeded'
+    run.finished_at = timezone.now()
+    run.save()
+    return run
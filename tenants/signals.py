@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import tenant_cache
+from .models import Client, Domain
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def invalidate_client(sender, instance, **kwargs):
+    tenant_cache.invalidate_tenant(instance)
+
+
+@receiver(pre_save, sender=Domain)
+def remember_previous_hostname(sender, instance, **kwargs):
+    instance._previous_hostname = Domain.objects.filter(pk=instance.pk).values_list('domain', flat=True).first()
+
+
+@receiver(post_save, sender=Domain)
+@receiver(post_delete, sender=Domain)
+def invalidate_domain(sender, instance, **kwargs):
+    hostnames = [instance.domain, getattr(instance, '_previous_hostname', None)]
+    tenant_cache.invalidate(instance.tenant_id, hostnames)
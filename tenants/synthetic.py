@@ -0,0 +1,427 @@
+import datetime
+import random
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from courses.grading import grade_scale, letter_grade
+from courses.models import Assignment, Course, CourseOffering, StudentAssignment, StudentEnrollment
+from courses.prerequisites import PrerequisiteEdge, rebuild_closure
+from courses.solver import term_dates
+from dashboard.rollups import rebuild_all
+from dashboard.summary import invalidate_summary
+from deanship.dashboard import invalidate_dashboards
+from deanship.models import (BudgetTransaction, Dean, DeanshipDecision, DeanshipMeeting, DeanshipReport,
+                             DepartmentBudget)
+from faculty.models import Faculty, FacultyLeave
+from students.gpa import recompute_all
+from students.models import Department, Student
+
+DEPARTMENTS = [
+    ('Computer Science', 'CS'), ('Mathematics', 'MATH'), ('Physics', 'PHYS'), ('Chemistry', 'CHEM'),
+    ('Biology', 'BIO'), ('Civil Engineering', 'CE'), ('Electrical Engineering', 'EE'),
+    ('Mechanical Engineering', 'ME'), ('Business Administration', 'BUS'), ('Economics', 'ECON'),
+    ('English Literature', 'ENG'), ('Islamic Studies', 'ISL'), ('Medicine', 'MED'), ('Pharmacy', 'PHAR'),
+    ('Law', 'LAW'), ('Architecture', 'ARCH'),
+]
+FIRST_NAMES = [
+    'Ahmed', 'Mohammed', 'Ali', 'Omar', 'Khalid', 'Yousef', 'Hassan', 'Ibrahim', 'Saleh', 'Abdullah',
+    'Fatima', 'Aisha', 'Maryam', 'Noor', 'Huda', 'Sara', 'Layla', 'Amal', 'Reem', 'Zainab',
+    'John', 'Maria', 'David', 'Elena', 'James', 'Priya', 'Wei', 'Yuki', 'Carlos', 'Amina',
+]
+LAST_NAMES = [
+    'Al-Ahmadi', 'Al-Hamdani', 'Al-Yemeni', 'Saeed', 'Nasser', 'Qasim', 'Haidar', 'Mansour', 'Othman',
+    'Al-Sharabi', 'Al-Maqtari', 'Bin Salem', 'Al-Eryani', 'Zubairi', 'Basha', 'Smith', 'Garcia', 'Chen',
+    'Kumar', 'Tanaka', 'Okafor', 'Novak', 'Rossi', 'Hughes',
+]
+COURSE_TOPICS = [
+    'Foundations', 'Principles', 'Methods', 'Theory', 'Systems', 'Analysis', 'Design', 'Applications',
+    'Laboratory', 'Research Methods', 'Seminar', 'Advanced Topics', 'Professional Practice', 'Ethics',
+]
+# (assignment_type, title, weight) templates; an offering takes the first n, reweighted to 100
+ASSIGNMENT_TEMPLATES = [
+    ('final', 'Final Exam', 40), ('midterm', 'Midterm Exam', 25), ('homework', 'Homework', 15),
+    ('project', 'Term Project', 10), ('quiz', 'Quizzes', 5), ('lab', 'Lab Reports', 5),
+]
+SECTION_CAPACITIES = [30, 40, 50, 60]
+LEVEL_NAMES = {1: 'Introduction to', 2: 'Intermediate', 3: 'Applied', 4: 'Advanced'}
+PASSWORD = 'synthetic'
+
+
+def academic_terms(year, count):
+    """The last count spring/fall terms up to and including fall of year, oldest first"""
+    terms = []
+    semester = 'fall'
+    while len(terms) < count:
+        terms.append((semester, year))
+        semester, year = ('spring', year) if semester == 'fall' else ('fall', year - 1)
+    return terms[::-1]
+
+
+def _aware(day, hour=9):
+    return datetime.datetime.combine(day, datetime.time(hour), tzinfo=datetime.timezone.utc)
+
+
+class SyntheticTenant:
+    """
+    Seeded generator of a realistic tenant dataset, written with bulk inserts.
+
+    Students are generated in chunks of batch_size together with their users,
+    enrollments and assignment submissions, so memory stays flat however many
+    students are requested. Course sections open on demand as seats fill.
+    Derived data (prerequisite closure, GPAs, statistics rollups) is rebuilt
+    at the end with the same functions the maintenance commands use.
+    """
+
+    def __init__(self, seed=0, departments=8, students=50000, faculty=None, courses_per_department=24,
+                 terms=4, courses_per_term=5, assignments=4, year=None, batch_size=2000, domain='example.edu',
+                 progress=None):
+        self.rng = random.Random(seed)
+        self.department_count = departments
+        self.student_count = students
+        self.faculty_count = faculty if faculty is not None else max(departments * 4, students // 25)
+        self.courses_per_department = courses_per_department
+        self.terms = academic_terms(year or datetime.date.today().year, terms)
+        self.courses_per_term = courses_per_term
+        self.assignment_templates = ASSIGNMENT_TEMPLATES[:max(1, min(assignments, len(ASSIGNMENT_TEMPLATES)))]
+        self.batch_size = batch_size
+        self.domain = domain
+        self.progress = progress
+        self.counts = {}
+        self.password = make_password(PASSWORD)
+        self.scale = grade_scale()
+
+    def _uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _name(self):
+        return self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+
+    def _date_between(self, start, end):
+        return start + datetime.timedelta(days=self.rng.randint(0, max(0, (end - start).days)))
+
+    def _created(self, key, objects):
+        self.counts[key] = self.counts.get(key, 0) + len(objects)
+        if self.progress:
+            self.progress(key, self.counts[key])
+
+    def _users(self, prefix, start, count):
+        users = [User(username=f'{prefix}{start + index:06d}', password=self.password,
+                      email=f'{prefix}{start + index:06d}@{self.domain}') for index in range(count)]
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        self._created('users', users)
+        # bulk_create leaves pks unset on backends without RETURNING; read them back by username
+        if users and users[0].pk is None:
+            ids = dict(User.objects.filter(username__in=[user.username for user in users]).values_list('username', 'pk'))
+            for user in users:
+                user.pk = ids[user.username]
+        return users
+
+    def run(self):
+        """Generate the whole dataset in the current tenant schema and return row counts per model"""
+        with transaction.atomic():
+            self.departments()
+            self.faculty()
+            self.courses()
+            self.students()
+            self.deanship()
+        rebuild_closure()
+        recompute_all(batch_size=self.batch_size)
+        rebuild_all(batch_size=self.batch_size)
+        invalidate_summary()
+        invalidate_dashboards(self.deans_by_department.values())
+        return self.counts
+
+    def departments(self):
+        rows = []
+        for index in range(self.department_count):
+            name, code = DEPARTMENTS[index % len(DEPARTMENTS)]
+            if index >= len(DEPARTMENTS):
+                name, code = f'{name} {index // len(DEPARTMENTS) + 1}', f'{code}{index // len(DEPARTMENTS) + 1}'
+            rows.append(Department(id=self._uuid(), name=name, code=code,
+                                   description=f'Department of {name}: teaching and research in {name.lower()}.'))
+        self.department_list = Department.objects.bulk_create(rows)
+        self._created('departments', rows)
+
+    def faculty(self):
+        users = self._users('f', 0, self.faculty_count)
+        positions = [choice for choice, _ in Faculty.POSITION_CHOICES]
+        rows = []
+        for index, user in enumerate(users):
+            department = self.department_list[index % len(self.department_list)]
+            first_name, last_name = self._name()
+            hire_date = self._date_between(datetime.date(1995, 1, 1), datetime.date(2022, 12, 31))
+            rows.append(Faculty(
+                id=self._uuid(), user=user, faculty_id=f'F{index:06d}', department=department,
+                first_name=first_name, last_name=last_name,
+                date_of_birth=self._date_between(datetime.date(1955, 1, 1), datetime.date(1992, 12, 31)),
+                gender=self.rng.choice(['male', 'female']), phone=f'+967{self.rng.randint(700000000, 799999999)}',
+                email=user.email, address=f'{self.rng.randint(1, 300)} University Street',
+                # The first member of each department is the professor who serves as dean
+                position='professor' if index < len(self.department_list) else self.rng.choice(positions),
+                hire_date=hire_date, specialization=f'{department.name} {self.rng.choice(COURSE_TOPICS)}',
+                education_qualifications=f'PhD in {department.name}',
+                experience_years=max(0, self.terms[-1][1] - hire_date.year),
+                status=self.rng.choices(['active', 'on_leave', 'retired'], weights=[92, 5, 3])[0],
+                research_interests=', '.join(self.rng.sample(COURSE_TOPICS, 3)),
+            ))
+        Faculty.objects.bulk_create(rows, batch_size=self.batch_size)
+        self._created('faculty', rows)
+        self.faculty_by_department = {}
+        for member in rows:
+            self.faculty_by_department.setdefault(member.department_id, []).append(member)
+
+    def courses(self):
+        rows, edges = [], []
+        self.courses_by_department = {}
+        for department in self.department_list:
+            by_level = {}
+            for index in range(self.courses_per_department):
+                level = index * 4 // self.courses_per_department + 1
+                topic = COURSE_TOPICS[index % len(COURSE_TOPICS)]
+                course = Course(
+                    id=self._uuid(), course_code=f'{department.code}{level * 100 + index + 1}',
+                    course_name=f'{LEVEL_NAMES[level]} {department.name} {topic}', department=department,
+                    course_type=self.rng.choices(['core', 'elective', 'laboratory', 'seminar'], weights=[60, 25, 10, 5])[0],
+                    credit_hours=self.rng.choice([2, 3, 3, 3, 4]), contact_hours=self.rng.choice([3, 4]),
+                    description=f'{topic} of {department.name.lower()} at level {level}, '
+                                f'covering {", ".join(self.rng.sample(COURSE_TOPICS, 3)).lower()}.',
+                )
+                # Prerequisites only point at lower levels, so the graph is a DAG
+                lower = [candidate for lower_level in range(1, level) for candidate in by_level.get(lower_level, [])]
+                for prerequisite in self.rng.sample(lower, min(len(lower), self.rng.randint(0, 2))):
+                    edges.append(PrerequisiteEdge(from_course_id=course.id, to_course_id=prerequisite.id))
+                by_level.setdefault(level, []).append(course)
+                rows.append(course)
+            self.courses_by_department[department.id] = by_level
+        Course.objects.bulk_create(rows, batch_size=self.batch_size)
+        PrerequisiteEdge.objects.bulk_create(edges, batch_size=self.batch_size)
+        self._created('courses', rows)
+        self._created('prerequisites', edges)
+        self.sections = {}
+
+    def _section(self, course, term):
+        """An offering of course in term with a free seat, opening a new section when the last one is full"""
+        sections = self.sections.setdefault((course.id, term), [])
+        if not sections or sections[-1][1] >= sections[-1][0].max_enrollment:
+            semester, year = term
+            offering = CourseOffering(
+                id=self._uuid(), course=course, semester=semester, year=year, section=f'{len(sections) + 1:02d}',
+                instructor=self.rng.choice(self.faculty_by_department[course.department_id]),
+                max_enrollment=self.rng.choice(SECTION_CAPACITIES), classroom=f'{course.course_code[:2]}-{self.rng.randint(100, 399)}',
+                is_active=term == self.terms[-1],
+            )
+            start, end = term_dates(semester, year)
+            total = sum(weight for _, _, weight in self.assignment_templates)
+            offering.assignment_list = [
+                Assignment(
+                    id=self._uuid(), course_offering=offering, title=f'{course.course_code} {title}',
+                    description=f'{title} for {course.course_name}', assignment_type=assignment_type,
+                    total_marks=100 if assignment_type in ('final', 'midterm') else 20,
+                    weight_percentage=(Decimal(weight * 100) / total).quantize(Decimal('0.01')),
+                    due_date=_aware(start + (end - start) * (index + 1) // (len(self.assignment_templates) + 1)),
+                ) for index, (assignment_type, title, weight) in enumerate(reversed(self.assignment_templates))
+            ]
+            self.new_offerings.append(offering)
+            sections.append([offering, 0])
+        sections[-1][1] += 1
+        return sections[-1][0]
+
+    def _grade(self, ability):
+        percentage = min(100.0, max(15.0, self.rng.gauss(ability, 9)))
+        return percentage, letter_grade(Decimal(str(round(percentage, 2))), self.scale)
+
+    def _submissions(self, student, offering, percentage, current, now):
+        rows = []
+        for assignment in offering.assignment_list:
+            marks = Decimal(str(round(assignment.total_marks * min(100.0, max(0.0, self.rng.gauss(percentage, 6))) / 100, 2)))
+            if current and assignment.due_date > now:
+                rows.append(StudentAssignment(id=self._uuid(), student=student, assignment=assignment, status='pending'))
+            elif self.rng.random() < 0.03:
+                rows.append(StudentAssignment(id=self._uuid(), student=student, assignment=assignment, status='missing'))
+            else:
+                submitted = assignment.due_date - datetime.timedelta(hours=self.rng.randint(-24, 96))
+                rows.append(StudentAssignment(
+                    id=self._uuid(), student=student, assignment=assignment, submission_date=submitted,
+                    submission_text='Submitted online', marks_obtained=marks, status='graded',
+                    graded_by_id=offering.instructor.user_id, graded_on=submitted + datetime.timedelta(days=7),
+                ))
+        return rows
+
+    def students(self):
+        levels = [choice for choice, _ in Student.ACADEMIC_LEVELS]
+        term_starts = [term_dates(*term)[0] for term in self.terms]
+        now = _aware(term_starts[-1] + datetime.timedelta(days=45))
+        for start in range(0, self.student_count, self.batch_size):
+            users = self._users('s', start, min(self.batch_size, self.student_count - start))
+            students, enrollments, submissions = [], [], []
+            self.new_offerings = []
+            for index, user in enumerate(users, start):
+                department = self.department_list[index % len(self.department_list)]
+                # Year of study at the latest term; each year spans two terms
+                year_of_study = self.rng.choices([1, 2, 3, 4], weights=[30, 27, 23, 20])[0]
+                attended = min(len(self.terms), year_of_study * 2)
+                entry_date = term_starts[len(self.terms) - attended]
+                first_name, last_name = self._name()
+                student = Student(
+                    id=self._uuid(), user=user, student_id=f'{entry_date.year}{index:06d}', department=department,
+                    first_name=first_name, last_name=last_name, middle_name=self.rng.choice(FIRST_NAMES),
+                    date_of_birth=self._date_between(datetime.date(entry_date.year - 21, 1, 1),
+                                                     datetime.date(entry_date.year - 17, 12, 31)),
+                    gender=self.rng.choice(['male', 'female']), phone=f'+967{self.rng.randint(700000000, 799999999)}',
+                    email=user.email, address=f'{self.rng.randint(1, 500)} {self.rng.choice(LAST_NAMES)} Street',
+                    academic_level=self.rng.choices(levels, weights=[85, 8, 5, 2])[0],
+                    enrollment_date=entry_date, current_semester=attended,
+                    expected_graduation_date=datetime.date(entry_date.year + 4, 6, 30),
+                    status=self.rng.choices(['active', 'inactive', 'suspended'], weights=[95, 4, 1])[0],
+                    emergency_contact_name=' '.join(self._name()), emergency_contact_relationship='Parent',
+                    emergency_contact_phone=f'+967{self.rng.randint(700000000, 799999999)}',
+                )
+                students.append(student)
+                ability = self.rng.gauss(78, 10)
+                by_level = self.courses_by_department[department.id]
+                for offset, term in enumerate(self.terms[len(self.terms) - attended:]):
+                    current = term == self.terms[-1]
+                    level = min(4, offset // 2 + 1)
+                    choices = by_level.get(level) or [course for courses in by_level.values() for course in courses]
+                    for course in self.rng.sample(choices, min(self.courses_per_term, len(choices))):
+                        offering = self._section(course, term)
+                        roll = self.rng.random()
+                        enrollment = StudentEnrollment(id=self._uuid(), student=student, course_offering=offering,
+                                                       attendance_percentage=Decimal(self.rng.randint(60, 100)))
+                        if roll < 0.03:
+                            enrollment.status = 'dropped'
+                        elif roll < 0.05 and not current:
+                            enrollment.status = 'withdrawn'
+                        else:
+                            percentage, (letter, points) = self._grade(ability)
+                            if not current:
+                                enrollment.final_grade, enrollment.grade_points = letter, points
+                                enrollment.status = 'failed' if points == 0 else 'completed'
+                            submissions.extend(self._submissions(student, offering, percentage, current, now))
+                        enrollments.append(enrollment)
+
+            for offering in self.new_offerings:
+                offering.current_enrollment = 0
+            CourseOffering.objects.bulk_create(self.new_offerings, batch_size=self.batch_size)
+            assignments = [assignment for offering in self.new_offerings for assignment in offering.assignment_list]
+            Assignment.objects.bulk_create(assignments, batch_size=self.batch_size)
+            Student.objects.bulk_create(students, batch_size=self.batch_size)
+            StudentEnrollment.objects.bulk_create(enrollments, batch_size=self.batch_size)
+            StudentAssignment.objects.bulk_create(submissions, batch_size=self.batch_size)
+            for key, objects in (('offerings', self.new_offerings), ('assignments', assignments), ('students', students),
+                                 ('enrollments', enrollments), ('submissions', submissions)):
+                self._created(key, objects)
+
+        # Seat counts of the current term, as adjust_enrollment_counts would have kept them
+        current = StudentEnrollment.objects.filter(status='enrolled').values_list('course_offering_id', flat=True)
+        counts = {}
+        for offering_id in current.iterator(chunk_size=self.batch_size):
+            counts[offering_id] = counts.get(offering_id, 0) + 1
+        offerings = [CourseOffering(id=offering_id, current_enrollment=count) for offering_id, count in counts.items()]
+        CourseOffering.objects.bulk_update(offerings, ['current_enrollment'], batch_size=self.batch_size)
+
+    def deanship(self):
+        first_day, last_day = term_dates(*self.terms[0])[0], term_dates(*self.terms[-1])[1]
+        deans = [Dean(id=self._uuid(), faculty=self.faculty_by_department[department.id][0], department=department,
+                      appointed_date=self._date_between(first_day - datetime.timedelta(days=1500), first_day),
+                      status='active', responsibilities='Academic leadership of the department')
+                 for department in self.department_list]
+        Dean.objects.bulk_create(deans)
+        self._created('deans', deans)
+        self.deans_by_department = {dean.department_id: dean.pk for dean in deans}
+
+        decisions, meetings, budgets, transactions, reports = [], [], [], [], []
+        decision_types = [choice for choice, _ in DeanshipDecision.DECISION_TYPES]
+        meeting_types = [choice for choice, _ in DeanshipMeeting.MEETING_TYPES]
+        for dean in deans:
+            name = dean.department.name
+            for _ in range(40):
+                decided = _aware(self._date_between(first_day, last_day), hour=self.rng.randint(8, 16))
+                status = self.rng.choices(['implemented', 'approved', 'pending', 'rejected', 'under_review'],
+                                          weights=[45, 25, 15, 10, 5])[0]
+                decision_type = self.rng.choice(decision_types)
+                decisions.append(DeanshipDecision(
+                    id=self._uuid(), dean=dean, decision_type=decision_type, decision_date=decided, status=status,
+                    title=f'{name} {decision_type.replace("_", " ")} decision on {self.rng.choice(COURSE_TOPICS).lower()}',
+                    description=f'The dean of {name} ruled on a {decision_type.replace("_", " ")} matter.',
+                    affected_parties=self.rng.choice(['Students', 'Faculty', 'Staff', 'Students and faculty']),
+                    implementation_date=decided + datetime.timedelta(days=self.rng.randint(2, 60))
+                    if status == 'implemented' else None,
+                ))
+            for _ in range(24):
+                meeting_date = _aware(self._date_between(first_day, last_day), hour=self.rng.randint(9, 15))
+                past = meeting_date.date() < last_day - datetime.timedelta(days=60)
+                meeting_type = self.rng.choice(meeting_types)
+                meetings.append(DeanshipMeeting(
+                    id=self._uuid(), dean=dean, meeting_type=meeting_type, meeting_date=meeting_date,
+                    title=f'{name} {meeting_type.replace("_", " ")} meeting',
+                    description=f'Regular {meeting_type.replace("_", " ")} meeting of {name}.',
+                    location=f'{dean.department.code} board room', agenda='Reports; curriculum; budget; any other business',
+                    status='completed' if past else self.rng.choice(['scheduled', 'postponed']),
+                    minutes='Minutes recorded and approved.' if past else '',
+                ))
+            for fiscal_year in sorted({year for _, year in self.terms}):
+                for budget_type, _ in DepartmentBudget.BUDGET_TYPES:
+                    requested = Decimal(self.rng.randrange(20000, 500000, 1000))
+                    approved = self.rng.random() < 0.85
+                    budget = DepartmentBudget(
+                        id=self._uuid(), dean=dean, budget_type=budget_type, fiscal_year=str(fiscal_year),
+                        title=f'{name} {budget_type} budget {fiscal_year}', description=f'{budget_type} spending plan',
+                        requested_amount=requested, justification='Projected departmental needs',
+                        status='approved' if approved else self.rng.choice(['pending_approval', 'rejected', 'draft']),
+                        approved_amount=(requested * Decimal(self.rng.uniform(0.7, 1.0))).quantize(Decimal('1'))
+                        if approved else None,
+                        approved_date=_aware(datetime.date(fiscal_year, 1, 15)) if approved else None,
+                    )
+                    balance = Decimal('0.00')
+                    if approved:
+                        for posted in sorted(_aware(self._date_between(datetime.date(fiscal_year, 2, 1),
+                                                                       datetime.date(fiscal_year, 12, 31)))
+                                             for _ in range(self.rng.randint(5, 25))):
+                            refund = balance > 0 and self.rng.random() < 0.1
+                            amount = (min(balance, budget.approved_amount / 20) if refund
+                                      else min(budget.approved_amount - balance, budget.approved_amount / 20))
+                            amount = (amount * Decimal(self.rng.uniform(0.2, 1.0))).quantize(Decimal('0.01'))
+                            if amount <= 0:
+                                continue
+                            balance += -amount if refund else amount
+                            transactions.append(BudgetTransaction(
+                                id=self._uuid(), budget=budget, dean=dean, fiscal_year=budget.fiscal_year,
+                                budget_type=budget_type, transaction_type='refund' if refund else 'spend',
+                                amount=-amount if refund else amount, balance_after=balance, posted_on=posted,
+                                description='Supplier refund' if refund else f'{budget_type} expense',
+                                reference=f'INV-{self.rng.randint(100000, 999999)}',
+                            ))
+                    budget.spent_amount = balance
+                    budgets.append(budget)
+                for quarter in range(1, 5):
+                    reports.append(DeanshipReport(
+                        id=self._uuid(), dean=dean, report_type='quarterly', report_period=f'{fiscal_year}-Q{quarter}',
+                        title=f'{name} quarterly report {fiscal_year} Q{quarter}',
+                        content=f'Summary of teaching, research and administration in {name}.',
+                        achievements='Curriculum review completed', challenges='Growing enrollment',
+                        recommendations='Expand teaching staff',
+                    ))
+
+        leaves = []
+        leave_types = [choice for choice, _ in FacultyLeave.LEAVE_TYPES]
+        for members in self.faculty_by_department.values():
+            for member in members:
+                for _ in range(self.rng.choices([0, 1, 2], weights=[50, 35, 15])[0]):
+                    start = self._date_between(first_day, last_day)
+                    leaves.append(FacultyLeave(
+                        id=self._uuid(), faculty=member, leave_type=self.rng.choice(leave_types), start_date=start,
+                        end_date=start + datetime.timedelta(days=self.rng.randint(1, 20)), reason='Personal',
+                        status=self.rng.choices(['approved', 'pending', 'rejected'], weights=[75, 15, 10])[0],
+                    ))
+
+        for model, key, rows in ((DeanshipDecision, 'decisions', decisions), (DeanshipMeeting, 'meetings', meetings),
+                                 (DepartmentBudget, 'budgets', budgets),
+                                 (BudgetTransaction, 'budget_transactions', transactions),
+                                 (DeanshipReport, 'reports', reports), (FacultyLeave, 'leaves', leaves)):
+            model.objects.bulk_create(rows, batch_size=self.batch_size)
+            self._created(key, rows)
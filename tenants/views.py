@@ -1,6 +1,8 @@
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from university_erp.mixins import QueryPlan, QueryPlanMixin
+from .cache import tenant_cache
 from .models import Client, Domain
 from .serializers import ClientSerializer, DomainSerializer
 
@@ -23,20 +25,22 @@ class ClientViewSet(viewsets.ModelViewSet):
         tenant = self.get_object()
         tenant.is_active = not tenant.is_active
         tenant.save()
+        tenant_cache.invalidate_tenant(tenant)
         return Response({'status': 'success', 'is_active': tenant.is_active})
 
 
-class DomainViewSet(viewsets.ModelViewSet):
+class DomainViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Domain.objects.all()
     serializer_class = DomainSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_plan = QueryPlan(select_related=['tenant'])
     
     @action(detail=False, methods=['get'])
     def by_tenant(self, request):
         """Get domains for a specific tenant"""
         tenant_id = request.query_params.get('tenant_id')
         if tenant_id:
-            domains = self.queryset.filter(tenant_id=tenant_id)
+            domains = self.plan_queryset(self.queryset.filter(tenant_id=tenant_id))
             serializer = self.get_serializer(domains, many=True)
             return Response(serializer.data)
         return Response({'error': 'tenant_id parameter required'}, status=400)
\ No newline at end of file
@@ -0,0 +1,16 @@
+"""
+Celery application for university_erp.
+
+Tasks that touch tenant data take the tenant's schema_name as an argument
+and run inside django_tenants.utils.schema_context.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "university_erp.settings")
+
+app = Celery("university_erp")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
@@ -0,0 +1,274 @@
+"""
+Per-request timing and SQL instrumentation.
+
+RequestMetricsMiddleware times every request. A sampled fraction of them
+(REQUEST_METRICS_SAMPLE_RATE) also runs under a connection.execute_wrapper
+that counts queries, SQL time and repeated statement shapes. Sampled
+requests get a Server-Timing header and one structured log line. All
+requests feed the in-process registry that /api/_metrics renders in
+Prometheus text format. Counters and histograms are cumulative, as
+Prometheus expects, so rate() and histogram_quantile() give rolling
+windows. Each worker process reports its own series.
+"""
+import json
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework import authentication, permissions
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from .querydetector import fingerprint, query_origin, query_report, write_report
+
+logger = logging.getLogger('university_erp.requests')
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+# Labels that replace schema and view once REQUEST_METRICS_MAX_SERIES label sets exist
+OVERFLOW_LABEL = '_other'
+SCRAPE_TOKEN = 'metrics-scrape'
+
+
+class QueryRecorder:
+    """
+    connection.execute_wrapper callable counting queries, their total time
+    and how often each statement ran. Statements are fingerprinted only
+    when duplicates() is asked for, keeping the per-query cost to a dict update.
+    A statement reaching repeat_threshold runs, or any query taking at least
+    slow_threshold seconds, also gets its origin recorded for query_report().
+    """
+
+    def __init__(self, repeat_threshold=None, slow_threshold=None):
+        self.repeat_threshold = repeat_threshold
+        self.slow_threshold = slow_threshold
+        self.count = 0
+        self.duration = 0.0
+        self.statements = {}
+        self.origins = {}
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.duration += duration
+            self.count += 1
+            sql = sql if isinstance(sql, str) else str(sql)
+            runs = self.statements[sql] = self.statements.get(sql, 0) + 1
+            if runs == self.repeat_threshold:
+                self.origins[sql] = query_origin()
+            if self.slow_threshold is not None and duration >= self.slow_threshold:
+                self.slow.append((duration, sql, query_origin()))
+
+    def duplicates(self):
+        """{fingerprint: (count, shape)} of statement shapes that ran more than once"""
+        shapes = {}
+        for sql, count in self.statements.items():
+            key, shape = fingerprint(sql)
+            shapes[key] = (shapes.get(key, (0, shape))[0] + count, shape)
+        return {key: value for key, value in shapes.items() if value[0] > 1}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels)
+
+
+class MetricsRegistry:
+    """Thread-safe in-process counters and histograms keyed by label set"""
+
+    def __init__(self, max_series=None):
+        self.max_series = max_series if max_series is not None else getattr(settings, 'REQUEST_METRICS_MAX_SERIES', 2000)
+        self._lock = threading.Lock()
+        self._metrics = {}  # name -> (type, help, buckets, {labels: value})
+
+    def _series(self, name, kind, help_text, labels, buckets=None):
+        metric = self._metrics.setdefault(name, (kind, help_text, buckets, {}))
+        series = metric[3]
+        key = tuple(labels.items())
+        if key not in series and len(series) >= self.max_series:
+            key = tuple((label, OVERFLOW_LABEL if label in ('schema', 'view') else value)
+                        for label, value in labels.items())
+        if key not in series:
+            series[key] = [[0] * len(buckets), 0.0, 0] if buckets else 0
+        return series, key
+
+    def increment(self, name, help_text, labels, amount=1):
+        with self._lock:
+            series, key = self._series(name, 'counter', help_text, labels)
+            series[key] += amount
+
+    def observe(self, name, help_text, labels, value, buckets=DURATION_BUCKETS):
+        with self._lock:
+            series, key = self._series(name, 'histogram', help_text, labels, buckets)
+            counts, _, _ = series[key]
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            series[key][1] += value
+            series[key][2] += 1
+
+    def render(self):
+        """Every metric in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, buckets, series) in sorted(self._metrics.items()):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+                for key, value in sorted(series.items()):
+                    labels = _labels(key)
+                    if kind == 'counter':
+                        lines.append(f'{name}{{{labels}}} {value}')
+                        continue
+                    counts, total, count = value
+                    cumulative = 0
+                    for bound, bucket in zip(buckets, counts):
+                        cumulative += bucket
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+                    lines.append(f'{name}_sum{{{labels}}} {round(total, 6)}')
+                    lines.append(f'{name}_count{{{labels}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+registry = MetricsRegistry()
+
+
+def view_name(view_func, method):
+    """'ViewSet.action' for DRF viewsets, else the view's dotted name"""
+    cls = getattr(view_func, 'cls', None)
+    if cls is not None:
+        action = (getattr(view_func, 'actions', None) or {}).get(method.lower())
+        return f'{cls.__name__}.{action}' if action else cls.__name__
+    return f"{view_func.__module__}.{getattr(view_func, '__qualname__', type(view_func).__name__)}"
+
+
+class RequestMetricsMiddleware:
+    """
+    Records per-request schema, view, timings and SQL statistics; see the
+    module docstring. With REQUEST_METRICS_SAMPLE_RATE = 0 it passes
+    requests straight through.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 1.0)
+        self.server_timing = getattr(settings, 'REQUEST_METRICS_SERVER_TIMING', True)
+        self.repeat_threshold = getattr(settings, 'QUERY_REPEAT_THRESHOLD', 5)
+        self.slow_threshold = getattr(settings, 'QUERY_SLOW_MS', 200) / 1000
+
+    def __call__(self, request):
+        if self.sample_rate <= 0:
+            return self.get_response(request)
+        started = time.perf_counter()
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            response = self.get_response(request)
+            self.record(request, response, time.perf_counter() - started)
+            return response
+
+        recorder = request.query_recorder = QueryRecorder(self.repeat_threshold, self.slow_threshold)
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        duplicates = recorder.duplicates()
+        serialize = getattr(request, 'serialize_duration', None)
+        labels = self.record(request, response, duration)
+        self.record_sampled(labels, recorder, duplicates, serialize)
+
+        if self.server_timing:
+            timings = [f'app;dur={duration * 1000:.1f}', f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"']
+            if serialize is not None:
+                timings.append(f'serialize;dur={serialize * 1000:.1f}')
+            if duplicates:
+                timings.append(f'dup;desc="{sum(count for count, _ in duplicates.values())} queries in {len(duplicates)} repeated shapes"')
+            response['Server-Timing'] = ', '.join(timings)
+        logger.info(json.dumps({
+            **labels,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'queries': recorder.count,
+            'db_ms': round(recorder.duration * 1000, 2),
+            'serialize_ms': round(serialize * 1000, 2) if serialize is not None else None,
+            'duplicates': {key: {'count': count, 'sql': shape[:300]} for key, (count, shape) in duplicates.items()},
+        }))
+        report = query_report(recorder)
+        if report is not None:
+            write_report(labels['schema'], labels['view'], request.path, report)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_view = view_name(view_func, request.method)
+
+    def process_template_response(self, request, response):
+        # DRF responses render after every middleware's process_template_response; time that rendering
+        if hasattr(request, 'query_recorder'):
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: setattr(request, 'serialize_duration', time.perf_counter() - started))
+        return response
+
+    def record(self, request, response, duration):
+        tenant = getattr(request, 'tenant', None)
+        labels = {
+            'schema': getattr(tenant, 'schema_name', None) or getattr(connection, 'schema_name', 'public'),
+            'view': getattr(request, 'metrics_view', 'unresolved'),
+        }
+        registry.increment('ums_http_requests_total', 'Requests handled.',
+                           {**labels, 'method': request.method, 'status': str(response.status_code)})
+        registry.observe('ums_http_request_duration_seconds', 'Time from middleware entry to response.',
+                         labels, duration)
+        return labels
+
+    def record_sampled(self, labels, recorder, duplicates, serialize):
+        registry.observe('ums_db_queries_per_request', 'SQL queries per sampled request.',
+                         labels, recorder.count, QUERY_BUCKETS)
+        registry.observe('ums_db_duration_seconds', 'SQL time per sampled request.', labels, recorder.duration)
+        if serialize is not None:
+            registry.observe('ums_serialize_duration_seconds', 'Response rendering time per sampled request.',
+                             labels, serialize)
+        registry.increment('ums_db_duplicate_queries_total',
+                           'Queries in sampled requests repeating a statement shape already run in the request.',
+                           labels, sum(count - 1 for count, _ in duplicates.values()))
+
+
+class ScrapeTokenAuthentication(authentication.BaseAuthentication):
+    """Accepts 'Bearer <REQUEST_METRICS_TOKEN>' as an anonymous scraper before JWT authentication sees it"""
+
+    def authenticate(self, request):
+        token = getattr(settings, 'REQUEST_METRICS_TOKEN', '')
+        if token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return AnonymousUser(), SCRAPE_TOKEN
+        return None
+
+
+class MetricsScrapePermission(permissions.BasePermission):
+    """Staff users, or a scraper authenticated with the metrics token"""
+
+    def has_permission(self, request, view):
+        return request.auth == SCRAPE_TOKEN or bool(request.user and request.user.is_staff)
+
+
+class MetricsView(APIView):
+    """This worker's request metrics in Prometheus text format"""
+    authentication_classes = [ScrapeTokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    permission_classes = [MetricsScrapePermission]
+    
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
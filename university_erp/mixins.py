@@ -0,0 +1,289 @@
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.generics import GenericAPIView
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .pagination import KeysetPagination
+from .renderers import CSVRenderer, NDJSONRenderer
+from .responsecache import is_tracked, response_cache
+
+logger = logging.getLogger(__name__)
+
+
+class QueryPlan:
+    """
+    Declarative select_related / prefetch_related / annotate plan for a queryset
+    """
+
+    def __init__(self, select_related=(), prefetch_related=(), annotations=None):
+        self.select_related = tuple(select_related)
+        self.prefetch_related = tuple(prefetch_related)
+        self.annotations = annotations or {}
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.annotations:
+            queryset = queryset.annotate(**self.annotations)
+        return queryset
+
+
+class QueryPlanMixin:
+    """
+    Applies `query_plan` to the viewset's own queryset for list, detail and
+    write actions, and `action_query_plans[action]` to querysets built inside
+    custom @action methods via plan_queryset(). Actions listed in
+    action_query_plans skip the main plan when looking up their object, since
+    they serialize a different queryset.
+    """
+    query_plan = QueryPlan()
+    action_query_plans = {}
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in self.action_query_plans:
+            queryset = self.query_plan.apply(queryset)
+        return queryset
+
+    def plan_queryset(self, queryset):
+        """Apply the plan declared for the current action to queryset"""
+        plan = self.action_query_plans.get(self.action, self.query_plan)
+        return plan.apply(queryset)
+
+
+class KeysetPaginationMixin:
+    """
+    Opt-in keyset pagination: when the request carries `?pagination=cursor`,
+    list endpoints page over `cursor_ordering` instead of using OFFSET pages
+    """
+    cursor_ordering = None
+    pagination_query_param = 'pagination'
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            request = getattr(self, 'request', None)
+            if self.cursor_ordering and request is not None and request.query_params.get(self.pagination_query_param) == 'cursor':
+                self._paginator = KeysetPagination(self.cursor_ordering)
+            else:
+                return super().paginator
+        return self._paginator
+
+
+class StreamingExportMixin:
+    """
+    `?format=csv` / `?format=ndjson` on list endpoints streams every row
+    matching the query-param filters, reading through a server-side cursor
+    so memory stays flat regardless of row count
+    """
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [CSVRenderer, NDJSONRenderer]
+    export_filename = None
+
+    def list(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, (CSVRenderer, NDJSONRenderer)):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+        rows = (serializer.to_representation(obj) for obj in queryset.iterator(chunk_size=chunk_size))
+        response = StreamingHttpResponse(renderer.stream(rows), content_type=f"{renderer.media_type}; charset=utf-8")
+        filename = self.export_filename or queryset.model._meta.model_name
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{renderer.format}"'
+        return response
+
+
+class ResponseCacheMixin:
+    """
+    Serves list and retrieve from the tenant-aware response cache. Keys cover
+    the schema, the caller's permission scope, the full path with its query
+    string, the negotiated format and the generations of cache_models, which
+    must list every model the serialized response reads. Only 200 responses
+    are stored; streamed exports pass straight through.
+    """
+    cache_models = ()
+    cache_actions = ('list', 'retrieve')
+
+    def get_cache_scope(self):
+        """Part of the key separating callers who may see different data"""
+        user = self.request.user
+        return 'superuser' if user.is_superuser else 'staff' if user.is_staff else 'user'
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if self.action not in self.cache_actions:
+            return handler(request, *args, **kwargs)
+        try:
+            key = response_cache.key(f'{type(self).__name__}.{self.action}', self.get_cache_scope(),
+                                     self.cache_models or [self.queryset.model],
+                                     f'{request.accepted_renderer.format}|{request.get_full_path()}')
+            data = response_cache.get(key)
+        except Exception:
+            logger.exception('Response cache lookup failed')
+            return handler(request, *args, **kwargs)
+        if data is not None:
+            return Response(data)
+
+        response = handler(request, *args, **kwargs)
+        if isinstance(response, Response) and response.status_code == 200:
+            try:
+                response_cache.set(key, response.data)
+            except Exception:
+                logger.exception('Response cache store failed')
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class NotModified(Exception):
+    """Raised from initial() when If-None-Match matches; answered with an empty 304"""
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource has changed since it was read; fetch it again before updating.'
+    default_code = 'precondition_failed'
+
+
+def _opaque(tag):
+    return tag.removeprefix('W/').strip('"')
+
+
+class ConditionalRequestMixin:
+    """
+    Weak ETag and Last-Modified validators for list and retrieve, taken from
+    one aggregate query before anything is serialized: max(etag_field) of the
+    filtered queryset plus, to notice deletes, the model's response cache
+    generation for lists, the object's etag_field for details. Lists fall
+    back to an exact count unless the model is covered by track_generations
+    and the response cache backend is shared between processes; a
+    per-process or dummy cache would miss deletes made elsewhere.
+    A matching If-None-Match gets an empty 304.
+
+    A tag is "<version>.<context>". The version covers the rows themselves.
+    The context covers the URL, the negotiated format and, where cache_models is
+    declared, the generations of the related rows the response embeds.
+    PUT and PATCH honour If-Match against the version alone and answer 412
+    when the object changed since the client read it, so edits to related
+    rows never fail an update. The check and the write share a transaction
+    with the row locked, so two edits made from the same tag cannot both
+    succeed. "If-Match: *" only requires the object to exist.
+
+    etag_field defaults to updated_at. Models without one get no
+    validators, and created_at only suits append-only models. Writes that
+    skip save() must set etag_field themselves, and bulk deletes must call
+    bump_generations.
+    """
+    etag_field = 'updated_at'
+    conditional_actions = ('list', 'retrieve')
+
+    def _unplanned_queryset(self):
+        # The viewset's filters without QueryPlanMixin's joins and annotations, which the aggregate does not need
+        return GenericAPIView.filter_queryset(self, self.get_queryset()).order_by()
+
+    def _version(self, modified, count):
+        return hashlib.md5(f"{modified.isoformat() if modified else ''}|{count}".encode()).hexdigest()[:16]
+
+    def _has_etag_field(self):
+        model = self.get_queryset().model
+        return bool(self.etag_field) and self.etag_field in {field.name for field in model._meta.concrete_fields}
+
+    def get_validators(self):
+        """(version, context, last_modified) of what the current action reads, or None without a version"""
+        model = self.get_queryset().model
+        if not self._has_etag_field():
+            return None
+        queryset = self._unplanned_queryset()
+        if self.detail:
+            lookup = self.lookup_url_kwarg or self.lookup_field
+            try:
+                rows = list(queryset.filter(**{self.lookup_field: self.kwargs[lookup]}).values_list(self.etag_field)[:1])
+            except (KeyError, TypeError, ValueError, ValidationError):
+                return None
+            if not rows:
+                return None
+            modified, count = rows[0][0], 1
+        elif is_tracked(model) and response_cache.shared:
+            # Saves move max(etag_field) and deletes move the generation, so no COUNT over the whole filter
+            modified = queryset.aggregate(modified=Max(self.etag_field))['modified']
+            try:
+                count = f'g{response_cache.generations([model])[0]}'
+            except Exception:
+                logger.exception('Could not read the response cache generation for an ETag')
+                return None
+        else:
+            aggregate = queryset.aggregate(modified=Max(self.etag_field), count=Count('pk'))
+            modified, count = aggregate['modified'], aggregate['count']
+        version = self._version(modified, count)
+        context = [self.request.get_full_path(), self.request.accepted_renderer.format]
+        if getattr(self, 'cache_models', ()):
+            try:
+                context += response_cache.generations(self.cache_models)
+            except Exception:
+                logger.exception('Could not read response cache generations for an ETag')
+        context = hashlib.md5('|'.join(map(str, context)).encode()).hexdigest()[:8]
+        return version, context, modified
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._validators = None
+        if self.action in self.conditional_actions and request.method in ('GET', 'HEAD'):
+            self._validators = self.get_validators()
+            if_none_match = request.headers.get('If-None-Match')
+            if self._validators and if_none_match:
+                current = '.'.join(self._validators[:2])
+                if any(tag == '*' or _opaque(tag) == current for tag in parse_etags(if_none_match)):
+                    raise NotModified()
+
+    def perform_update(self, serializer):
+        if_match = self.request.headers.get('If-Match')
+        if not if_match:
+            return super().perform_update(serializer)
+        tags = parse_etags(if_match)
+        with transaction.atomic():
+            if '*' not in tags:
+                if not self._has_etag_field():
+                    raise PreconditionFailed()
+                # Lock the row until the write commits, so a concurrent edit made from the same tag waits, then fails
+                instance = serializer.instance
+                rows = (type(instance)._base_manager.select_for_update().filter(pk=instance.pk)
+                        .values_list(self.etag_field)[:1])
+                if not rows or not any(_opaque(tag).split('.')[0] == self._version(rows[0][0], 1) for tag in tags):
+                    raise PreconditionFailed()
+                # Write over the row as locked, not as get_object() read it before the lock
+                instance.refresh_from_db()
+            return super().perform_update(serializer)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.action in ('update', 'partial_update') and response.status_code == status.HTTP_200_OK:
+            self._validators = self.get_validators()
+        validators = getattr(self, '_validators', None)
+        if validators and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            version, context, modified = validators
+            response['ETag'] = f"W/{quote_etag(f'{version}.{context}')}"
+            if modified is not None:
+                response['Last-Modified'] = http_date(modified.timestamp())
+            response['Cache-Control'] = 'private, no-cache'
+        return response
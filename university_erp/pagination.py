@@ -0,0 +1,82 @@
+import json
+
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+
+COUNT_QUERY_PARAM = 'count'
+
+
+def estimate_count(queryset):
+    """
+    Planner row estimate for queryset instead of an exact COUNT(*).
+    Unfiltered querysets read pg_class.reltuples; filtered ones use EXPLAIN.
+    """
+    queryset = queryset.order_by()
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 until the table has been analyzed
+            if row and row[0] >= 0:
+                return row[0]
+            return queryset.count()
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        return estimate_count(self.object_list)
+
+
+class PageNumberCountPagination(PageNumberPagination):
+    """
+    Default page-number pagination; `?count=estimate` replaces the exact
+    COUNT(*) with a planner estimate
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(COUNT_QUERY_PARAM) == 'estimate':
+            self.django_paginator_class = EstimatedCountPaginator
+        return super().paginate_queryset(queryset, request, view)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over a stable ordering. No total is computed unless the
+    client asks for `?count=exact` or `?count=estimate`.
+    """
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        count_mode = request.query_params.get(COUNT_QUERY_PARAM)
+        self.count = None
+        if count_mode == 'exact':
+            self.count = queryset.count()
+        elif count_mode == 'estimate':
+            self.count = estimate_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.count is None:
+            return super().get_paginated_response(data)
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
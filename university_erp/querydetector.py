@@ -0,0 +1,113 @@
+"""
+Slow-query and N+1 detection on top of instrumentation.QueryRecorder.
+
+The recorder asks query_origin() where a statement came from the moment it
+repeats QUERY_REPEAT_THRESHOLD times in one request, and for every query
+slower than QUERY_SLOW_MS, so the stack walk is only paid for offending
+statements. query_report() groups those findings by statement shape;
+RequestMetricsMiddleware passes reports of sampled requests to
+write_report(), which logs them and appends them to a JSON-lines file per
+tenant schema under QUERY_REPORT_DIR.
+"""
+import datetime
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+
+from django.conf import settings
+from rest_framework.serializers import Serializer
+
+logger = logging.getLogger('university_erp.queries')
+
+_write_lock = threading.Lock()
+_SKIPPED_FILES = (os.path.join(os.path.dirname(__file__), 'instrumentation.py'), __file__)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))+\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """(short hash, normalized shape) of a statement, with literals and IN lists collapsed"""
+    shape = _SPACE.sub(' ', _IN_LIST.sub('(...)', _LITERALS.sub('?', sql))).strip()
+    return hashlib.sha1(shape.encode()).hexdigest()[:12], shape
+
+
+def _project_file(filename):
+    return (filename.startswith(str(settings.BASE_DIR)) and 'site-packages' not in filename
+            and filename not in _SKIPPED_FILES)
+
+
+def query_origin():
+    """
+    {'serializer_field', 'location'} of the statement being executed: the
+    innermost 'Serializer.field' DRF was resolving, and the innermost
+    project line on the stack
+    """
+    serializer_field = location = None
+    frame = sys._getframe(1)
+    while frame is not None and (serializer_field is None or location is None):
+        code = frame.f_code
+        if serializer_field is None and code.co_name == 'to_representation':
+            field, owner = frame.f_locals.get('field'), frame.f_locals.get('self')
+            if field is not None and isinstance(owner, Serializer):
+                serializer_field = f'{type(owner).__name__}.{field.field_name}'
+        if location is None and _project_file(code.co_filename):
+            path = os.path.relpath(code.co_filename, settings.BASE_DIR)
+            location = f'{path}:{frame.f_lineno} in {code.co_name}'
+        frame = frame.f_back
+    return {'serializer_field': serializer_field, 'location': location}
+
+
+def query_report(recorder):
+    """
+    Repeated statement shapes and slow queries the recorder saw, or None when
+    there are neither
+    """
+    repeated = {}
+    for sql, origin in recorder.origins.items():
+        key, shape = fingerprint(sql)
+        entry = repeated.setdefault(key, {'fingerprint': key, 'count': 0, 'sql': shape[:500], **origin})
+        entry['count'] += recorder.statements[sql]
+    slow = []
+    for duration, sql, origin in recorder.slow:
+        key, shape = fingerprint(sql)
+        slow.append({'fingerprint': key, 'ms': round(duration * 1000, 2), 'sql': shape[:500], **origin})
+    if not repeated and not slow:
+        return None
+    return {
+        'queries': recorder.count,
+        'db_ms': round(recorder.duration * 1000, 2),
+        'repeated': sorted(repeated.values(), key=lambda entry: -entry['count']),
+        'slow': slow,
+    }
+
+
+def describe(report):
+    """One line per finding, for log messages and test failures"""
+    lines = [f"{entry['count']}x {entry['sql'][:120]} <- {entry['serializer_field'] or entry['location']}"
+             for entry in report['repeated']]
+    lines += [f"{entry['ms']}ms {entry['sql'][:120]} <- {entry['serializer_field'] or entry['location']}"
+              for entry in report['slow']]
+    return '\n'.join(lines)
+
+
+def write_report(schema, view, path, report):
+    """Log a request's query report and append it to QUERY_REPORT_DIR/<schema>/<date>.jsonl"""
+    record = {'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(), 'schema': schema,
+              'view': view, 'path': path, **report}
+    logger.warning('%s %s: %d queries with findings\n%s', schema, view, report['queries'], describe(report),
+                   extra={'query_report': record})
+    directory = getattr(settings, 'QUERY_REPORT_DIR', '')
+    if not directory:
+        return
+    directory = os.path.join(directory, schema)
+    filename = os.path.join(directory, f"{record['timestamp'][:10]}.jsonl")
+    with _write_lock:
+        os.makedirs(directory, exist_ok=True)
+        with open(filename, 'a', encoding='utf-8') as handle:
+            handle.write(json.dumps(record) + '\n')
@@ -0,0 +1,126 @@
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+# Models whose generation track_generations keeps current on every ORM write
+_tracked_models = set()
+
+
+class ResponseCache:
+    """
+    Tenant-aware store for serialized list/retrieve responses.
+
+    Every tracked model has a generation counter per tenant schema, and a
+    response's key includes the generations of the models it was built from.
+    A write bumps its model's generation once the transaction commits, so
+    every response depending on it becomes unreachable and the next read
+    goes to the database; stale entries simply age out. The backing cache is
+    RESPONSE_CACHE_ALIAS: Redis when REDIS_CACHE_URL is set, otherwise each
+    process's memory, where a bump only reaches the process that made the
+    write and RESPONSE_CACHE_TTL bounds how stale other processes can be.
+    Cache errors are logged and treated as misses.
+    """
+    key_prefix = 'responsecache:'
+
+    def __init__(self, alias=None, ttl=None):
+        self.alias = alias if alias is not None else getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+        self.ttl = ttl if ttl is not None else getattr(settings, 'RESPONSE_CACHE_TTL', 300)
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def shared(self):
+        """Whether every process reads and bumps the same generations"""
+        return not isinstance(self.cache, (LocMemCache, DummyCache))
+
+    def _generation_key(self, schema_name, model):
+        return f"{self.key_prefix}{schema_name}:generation:{model._meta.label_lower}"
+
+    def generations(self, models, schema_name=None):
+        """Current generation of each model, starting missing counters at a fresh value"""
+        schema_name = schema_name or connection.schema_name
+        keys = [self._generation_key(schema_name, model) for model in models]
+        found = self.cache.get_many(keys)
+        for key in keys:
+            if key not in found:
+                # A nanosecond clock never restarts a counter at a value an evicted one already used
+                self.cache.add(key, time.time_ns(), None)
+                found[key] = self.cache.get(key)
+        return [found[key] for key in keys]
+
+    def bump(self, *models, schema_name=None):
+        schema_name = schema_name or connection.schema_name
+        for model in models:
+            key = self._generation_key(schema_name, model)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.set(key, time.time_ns(), None)
+
+    def key(self, name, scope, models, path, schema_name=None):
+        schema_name = schema_name or connection.schema_name
+        generations = '.'.join(str(generation) for generation in self.generations(models, schema_name))
+        digest = hashlib.md5(f"{generations}|{path}".encode()).hexdigest()
+        return f"{self.key_prefix}{schema_name}:{name}:{scope}:{digest}"
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, data):
+        self.cache.set(key, data, self.ttl)
+
+
+response_cache = ResponseCache()
+
+
+def bump_generations(*models):
+    """
+    Invalidate cached responses built from models in the current schema once
+    the surrounding transaction commits; for writes that skip model signals
+    """
+    schema_name = connection.schema_name
+
+    def bump():
+        try:
+            response_cache.bump(*models, schema_name=schema_name)
+        except Exception:
+            logger.exception('Could not bump response cache generations of %s', models)
+
+    transaction.on_commit(bump)
+
+
+def _bump_on_write(sender, **kwargs):
+    bump_generations(sender)
+
+
+def _bump_on_m2m_change(sender, instance, action, model, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_generations(sender, type(instance), model)
+
+
+def track_generations(*models):
+    """Bump each model's generation on post_save, post_delete and, for m2m through models, m2m_changed"""
+    for model in models:
+        _tracked_models.add(model)
+        label = model._meta.label_lower
+        if model._meta.auto_created:
+            m2m_changed.connect(_bump_on_m2m_change, sender=model, dispatch_uid=f'response_cache_m2m_{label}')
+        else:
+            post_save.connect(_bump_on_write, sender=model, dispatch_uid=f'response_cache_save_{label}')
+            post_delete.connect(_bump_on_write, sender=model, dispatch_uid=f'response_cache_delete_{label}')
+
+
+def is_tracked(model):
+    """Whether model's generation moves on every ORM save and delete, making it a change validator"""
+    return model in _tracked_models
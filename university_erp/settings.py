@@ -72,6 +72,8 @@ TENANT_APPS = [
     'hostel',
     'academic_calendar',
     'deanship',
+    'dashboard',
+    'search',
 ]
 
 INSTALLED_APPS = list(SHARED_APPS) + [app for app in TENANT_APPS if app not in SHARED_APPS]
@@ -79,8 +81,21 @@ INSTALLED_APPS = list(SHARED_APPS) + [app for app in TENANT_APPS if app not in S
 TENANT_MODEL = "tenants.Client"
 TENANT_DOMAIN_MODEL = "tenants.Domain"
 
+# Hostname -> tenant resolution cache used by CachedTenantMainMiddleware
+TENANT_DOMAIN_CACHE_SIZE = config('TENANT_DOMAIN_CACHE_SIZE', default=1024, cast=int)
+TENANT_DOMAIN_CACHE_TTL = config('TENANT_DOMAIN_CACHE_TTL', default=300, cast=int)
+TENANT_DOMAIN_CACHE_ALIAS = config('TENANT_DOMAIN_CACHE_ALIAS', default='')
+
+# New tenants are cloned from this pre-migrated schema instead of migrating from scratch
+TENANT_BASE_SCHEMA = config('TENANT_BASE_SCHEMA', default='tenant_template')
+TENANT_CREATION_FAKES_MIGRATIONS = True
+
+# Worker processes used by the migrate_tenants command
+TENANT_MIGRATION_WORKERS = config('TENANT_MIGRATION_WORKERS', default=4, cast=int)
+
 MIDDLEWARE = [
-    'django_tenants.middleware.main.TenantMainMiddleware',
+    'tenants.middleware.CachedTenantMainMiddleware',
+    'university_erp.instrumentation.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -183,10 +198,58 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'university_erp.pagination.PageNumberCountPagination',
     'PAGE_SIZE': 20,
 }
 
+# Rows fetched per server-side cursor round trip by ?format=csv/ndjson exports
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Shared cache: Redis when REDIS_CACHE_URL is set, otherwise per-process memory
+REDIS_CACHE_URL = config('REDIS_CACHE_URL', default='')
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_CACHE_URL}
+    if REDIS_CACHE_URL else {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+
+# Department, course, offering and faculty list/retrieve response cache: cache alias and lifetime in seconds;
+# writes invalidate it sooner
+RESPONSE_CACHE_ALIAS = config('RESPONSE_CACHE_ALIAS', default='default')
+RESPONSE_CACHE_TTL = config('RESPONSE_CACHE_TTL', default=300, cast=int)
+
+# Dashboard summary cache lifetime in seconds; writes invalidate it sooner
+DASHBOARD_SUMMARY_CACHE_TTL = config('DASHBOARD_SUMMARY_CACHE_TTL', default=60, cast=int)
+
+# Per-dean dashboard cache lifetime in seconds; decision, meeting, budget and leave writes invalidate it sooner
+DEAN_DASHBOARD_CACHE_TTL = config('DEAN_DASHBOARD_CACHE_TTL', default=300, cast=int)
+
+# Request metrics: fraction of requests sampled for SQL statistics, Server-Timing and log lines
+# (0 disables the middleware), label sets kept per metric, and the bearer token /api/_metrics accepts
+REQUEST_METRICS_SAMPLE_RATE = config('REQUEST_METRICS_SAMPLE_RATE', default=1.0 if DEBUG else 0.1, cast=float)
+REQUEST_METRICS_SERVER_TIMING = config('REQUEST_METRICS_SERVER_TIMING', default=True, cast=bool)
+REQUEST_METRICS_MAX_SERIES = config('REQUEST_METRICS_MAX_SERIES', default=2000, cast=int)
+REQUEST_METRICS_TOKEN = config('REQUEST_METRICS_TOKEN', default='')
+
+# Query detector for sampled requests: runs of one statement that flag an N+1 shape, the slow query
+# threshold in milliseconds, and the directory for per-schema JSON-lines reports ('' only logs them)
+QUERY_REPEAT_THRESHOLD = config('QUERY_REPEAT_THRESHOLD', default=5, cast=int)
+QUERY_SLOW_MS = config('QUERY_SLOW_MS', default=200, cast=int)
+QUERY_REPORT_DIR = config('QUERY_REPORT_DIR', default='')
+
+# Celery Configuration
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='redis://localhost:6379/0')
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+
+# Bulk student import
+STUDENT_IMPORT_CHUNK_SIZE = config('STUDENT_IMPORT_CHUNK_SIZE', default=1000, cast=int)
+STUDENT_IMPORT_HASH_WORKERS = config('STUDENT_IMPORT_HASH_WORKERS', default=os.cpu_count() or 1, cast=int)
+
+# Timetable solver: default search budget in seconds and teaching days (0 = Monday)
+TIMETABLE_SOLVER_TIME_BUDGET = config('TIMETABLE_SOLVER_TIME_BUDGET', default=60, cast=int)
+TIMETABLE_TEACHING_DAYS = [int(day) for day in config('TIMETABLE_TEACHING_DAYS', default='6,0,1,2,3').split(',')]
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='http://localhost:3000,http://127.0.0.1:3000').split(',')
 
@@ -0,0 +1,53 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .instrumentation import QueryRecorder
+from .querydetector import describe, query_report
+
+
+class QueryCountAssertionsMixin:
+    """
+    TestCase mixin asserting that an endpoint's query count does not grow with
+    the number of rows it returns, i.e. that its query plan has no N+1 shapes
+    """
+    # {url: maximum queries} checked by assertQueryBudgets
+    query_budgets = {}
+
+    def count_queries(self, url, **extra):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, **extra)
+        self.assertLess(response.status_code, 400, response.content)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, url, populate, sizes=(2, 10), **extra):
+        """
+        Call populate(n) to bring the data set up to n rows for each size in
+        sizes, request url after each step and require identical query counts
+        """
+        counts = []
+        for size in sizes:
+            populate(size)
+            counts.append(self.count_queries(url, **extra))
+        self.assertEqual(len(set(counts)), 1, f"Query count for {url} varies with row count: {dict(zip(sizes, counts))}")
+        return counts[0]
+
+    def assertQueryBudget(self, url, budget, repeat_threshold=2, **extra):
+        """
+        Require url to answer in at most budget queries; a failure lists the
+        repeated statements with the serializer field or line issuing them
+        """
+        recorder = QueryRecorder(repeat_threshold=repeat_threshold)
+        with connection.execute_wrapper(recorder):
+            response = self.client.get(url, **extra)
+        self.assertLess(response.status_code, 400, response.content)
+        if recorder.count > budget:
+            report = query_report(recorder)
+            self.fail(f"{url} ran {recorder.count} queries, over its budget of {budget}"
+                      + (f"\n{describe(report)}" if report else ''))
+        return recorder.count
+
+    def assertQueryBudgets(self, budgets=None, **extra):
+        """assertQueryBudget for every {url: budget}, defaulting to query_budgets"""
+        for url, budget in (budgets if budgets is not None else self.query_budgets).items():
+            with self.subTest(url=url):
+                self.assertQueryBudget(url, budget, **extra)
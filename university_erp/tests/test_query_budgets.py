@@ -0,0 +1,150 @@
+import datetime
+import itertools
+
+from django.contrib.auth.models import User
+from django.test import Client, override_settings
+from django_tenants.test.cases import TenantTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from courses.models import Course, CourseOffering, StudentEnrollment
+from deanship.models import Dean
+from faculty.models import Faculty
+from students.models import Department, Student
+from university_erp.testing import QueryCountAssertionsMixin
+
+_numbers = itertools.count()
+
+
+def _department():
+    number = next(_numbers)
+    return Department.objects.create(name=f'Department {number}', code=f'D{number}')
+
+
+def _student(department):
+    number = next(_numbers)
+    user = User.objects.create_user(f'student{number}')
+    return Student.objects.create(
+        user=user, student_id=f'S{number:06d}', department=department, first_name='Sam', last_name=f'Student{number}',
+        date_of_birth=datetime.date(2002, 1, 1), gender='male', phone='555-0100', email=f'student{number}@example.com',
+        address='Campus', academic_level='undergraduate', enrollment_date=datetime.date(2021, 9, 1),
+        emergency_contact_name='Contact', emergency_contact_phone='555-0101', emergency_contact_relationship='parent')
+
+
+def _faculty(department):
+    number = next(_numbers)
+    user = User.objects.create_user(f'faculty{number}')
+    return Faculty.objects.create(
+        user=user, faculty_id=f'F{number:06d}', department=department, first_name='Fay', last_name=f'Faculty{number}',
+        date_of_birth=datetime.date(1975, 1, 1), gender='female', phone='555-0200', email=f'faculty{number}@example.com',
+        address='Campus', position='lecturer', hire_date=datetime.date(2010, 9, 1), specialization='Algebra',
+        education_qualifications='PhD')
+
+
+def _course(department, prerequisites=()):
+    number = next(_numbers)
+    course = Course.objects.create(course_code=f'C{number}', course_name=f'Course {number}', department=department,
+                                   course_type='core', credit_hours=3, contact_hours=3, description='Course')
+    course.prerequisites.set(prerequisites)
+    return course
+
+
+def _offering(course, instructor):
+    return CourseOffering.objects.create(course=course, instructor=instructor, semester='fall', year=2024,
+                                         section=str(next(_numbers)), max_enrollment=40)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class ListQueryBudgetTests(QueryCountAssertionsMixin, TenantTestCase):
+    """
+    List endpoints must answer within their query budgets, in a number of
+    queries that does not grow with the rows they serialize. The dummy cache
+    keeps response caching out of the counts.
+    """
+    # Each includes the JWT user lookup, the ETag aggregate where the viewset has one, the page COUNT and the page
+    query_budgets = {
+        '/api/students/departments/': 4,
+        '/api/students/students/': 4,
+        '/api/faculty/faculty/': 4,
+        '/api/courses/courses/': 5,
+        '/api/courses/offerings/': 5,
+        '/api/courses/enrollments/': 3,
+        '/api/deanship/deans/': 4,
+    }
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Query Budget University'
+        tenant.university_code = 'QBU'
+
+    def setUp(self):
+        user = User.objects.create_user('budget-tester', is_staff=True)
+        # The domain as a plain header: TenantClient looks it up with a query per request
+        self.client = Client(HTTP_HOST=self.domain.domain, HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        self.department = _department()
+        self.instructor = _faculty(self.department)
+        # The first request resolves and caches the tenant's domain; keep that lookup out of every count
+        self.client.get('/api/students/departments/')
+
+    def populate_departments(self, size):
+        while Department.objects.count() < size:
+            department = _department()
+            _student(department)
+            _student(department)
+
+    def populate_students(self, size):
+        while Student.objects.count() < size:
+            _student(_department())
+
+    def populate_faculty(self, size):
+        while Faculty.objects.count() < size:
+            _faculty(_department())
+
+    def populate_courses(self, size):
+        while Course.objects.count() < size:
+            _course(self.department, prerequisites=Course.objects.all()[:2])
+
+    def populate_offerings(self, size):
+        while CourseOffering.objects.count() < size:
+            _offering(_course(_department()), _faculty(self.department))
+
+    def populate_enrollments(self, size):
+        offering = _offering(_course(self.department), self.instructor)
+        while StudentEnrollment.objects.count() < size:
+            StudentEnrollment.objects.create(student=_student(self.department), course_offering=offering)
+
+    def populate_deans(self, size):
+        while Dean.objects.count() < size:
+            department = _department()
+            Dean.objects.create(faculty=_faculty(department), department=department,
+                                appointed_date=datetime.date(2020, 7, 1))
+
+    def test_list_budgets(self):
+        self.populate_departments(3)
+        self.populate_students(8)
+        self.populate_faculty(5)
+        self.populate_courses(4)
+        self.populate_offerings(4)
+        self.populate_enrollments(4)
+        self.populate_deans(3)
+        self.assertQueryBudgets()
+
+    def test_department_student_counts_are_annotated(self):
+        self.assertConstantQueries('/api/students/departments/', self.populate_departments)
+
+    def test_student_list(self):
+        self.assertConstantQueries('/api/students/students/', self.populate_students)
+
+    def test_faculty_list(self):
+        self.assertConstantQueries('/api/faculty/faculty/', self.populate_faculty)
+
+    def test_course_prerequisites_are_prefetched(self):
+        self.assertConstantQueries('/api/courses/courses/', self.populate_courses)
+
+    def test_offering_course_codes_are_joined(self):
+        self.assertConstantQueries('/api/courses/offerings/', self.populate_offerings)
+
+    def test_enrollment_list(self):
+        self.assertConstantQueries('/api/courses/enrollments/', self.populate_enrollments)
+
+    def test_dean_list(self):
+        self.assertConstantQueries('/api/deanship/deans/', self.populate_deans)
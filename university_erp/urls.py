@@ -20,6 +20,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .instrumentation import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('djoser.urls')),
@@ -29,6 +31,9 @@ urlpatterns = [
     path('api/faculty/', include('faculty.urls')),
     path('api/courses/', include('courses.urls')),
     path('api/deanship/', include('deanship.urls')),
+    path('api/dashboard/', include('dashboard.urls')),
+    path('api/search/', include('search.urls')),
+    path('api/_metrics', MetricsView.as_view(), name='metrics'),
 ]
 
 if settings.DEBUG: